@@ -0,0 +1,294 @@
+"""
+Daisyworld 성능 벤치마크 모듈
+시뮬레이터 처리량/메모리 증가량과 두 시각화(pygame 프레임, matplotlib 애니메이션 콜백/그래프 저장) 시간을 측정하여
+JSON 파일로 저장하고, 저장된 기준값(baseline)과 비교하여 임계값을 넘는 성능 저하를 표시
+"""
+import os
+
+# 화면 없는 환경에서도 실행되도록 시각화 모듈을 불러오기 전에 백엔드 지정
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import matplotlib
+matplotlib.use('Agg')
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+import matplotlib.pyplot as plt
+from simulator import DaisyworldSimulator
+from visualizer_pygame import run_pygame_visualization
+from visualizer_matplotlib import create_live_graphs, save_graphs
+
+
+# 벤치마크 설정
+BENCHMARK_OUTPUT = 'results/benchmark.json'             # 결과 파일
+BENCHMARK_BASELINE = 'results/benchmark_baseline.json'  # 기준값 파일
+BENCHMARK_THRESHOLD = 0.2          # 기준값 대비 이 비율 이상 나빠지면 성능 저하로 표시
+BENCHMARK_REPEATS = 3              # 반복 측정 횟수 (가장 좋은 값 사용)
+
+# 측정 규모 (괄호 안은 --quick)
+BENCHMARK_STEPS = (200000, 20000)                        # 처리량 측정 스텝 수
+BENCHMARK_MEMORY_STEPS = (1000000, 100000)               # 메모리 증가량 측정 스텝 수
+BENCHMARK_MEMORY_SLACK = 1 << 20                         # 메모리 비교 시 허용하는 절대 오차 (바이트/백만 스텝)
+BENCHMARK_FRAMES = (600, 120)                            # pygame 측정 프레임 수
+BENCHMARK_WARMUP_FRAMES = (60, 20)                       # 초기화 비용을 빼기 위한 짧은 실행의 프레임 수
+BENCHMARK_DAISY_COUNTS = ((300, 100000), (300, 20000))   # pygame 데이지 개수 (원 그리기 / 픽셀 모드)
+BENCHMARK_HISTORY_LENGTHS = ((1000, 10000, 100000, 1000000), (1000, 10000, 100000))  # animate 측정 기록 길이
+BENCHMARK_ANIMATE_CALLS = (50, 10)                       # 기록 길이마다 animate 호출 횟수
+BENCHMARK_SAVE_STEPS = ((10000, 100000, 1000000), (10000, 100000))  # save_graphs 측정 스텝 수
+
+
+def _result(name, value, unit, better, slack=0.0):
+    """
+    측정 결과 한 항목
+
+    Args:
+        name: 항목 이름
+        value: 측정값
+        unit: 단위
+        better: 'higher' (클수록 좋음) 또는 'lower' (작을수록 좋음)
+        slack: 비교 시 허용하는 절대 오차 (기준값이 0에 가까운 항목용)
+    """
+    return {'name': name, 'value': float(value), 'unit': unit, 'better': better, 'slack': float(slack)}
+
+
+def _best_time(func, repeats):
+    """func를 repeats번 실행한 시간 중 최솟값 (초)"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _resident_memory():
+    """
+    현재 프로세스의 상주 메모리(RSS, 바이트)
+
+    /proc이 없는 환경에서는 최대 상주 메모리로 대신함
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _seeded_simulator(**kwargs):
+    """난수 시드를 고정하여 실행마다 같은 데이지 배치로 시뮬레이터 생성"""
+    return DaisyworldSimulator(seed=0, **kwargs)
+
+
+def bench_simulator(scale, repeats):
+    """DaisyworldSimulator.step()/run() 처리량과 백만 스텝당 메모리 증가량"""
+    num_steps = BENCHMARK_STEPS[scale]
+
+    def step_loop():
+        simulator = _seeded_simulator()
+        step = simulator.step
+        for _ in range(num_steps):
+            step()
+
+    def run_batch():
+        _seeded_simulator().run(num_steps)
+
+    results = [
+        _result('simulator.step', num_steps / _best_time(step_loop, repeats), 'steps/s', 'higher'),
+        _result('simulator.run', num_steps / _best_time(run_batch, repeats), 'steps/s', 'higher'),
+    ]
+
+    # 기록 저장소 확장을 포함한 실제 메모리 증가량 (준비 구간 뒤부터 측정)
+    memory_steps = BENCHMARK_MEMORY_STEPS[scale]
+    simulator = _seeded_simulator()
+    simulator.run(1000)
+    gc.collect()
+    before = _resident_memory()
+    simulator.run(memory_steps)
+    gc.collect()
+    growth = (_resident_memory() - before) * 1e6 / memory_steps
+    results.append(_result('simulator.memory_per_million_steps', growth / (1 << 20), 'MiB', 'lower',
+                           slack=BENCHMARK_MEMORY_SLACK / (1 << 20)))
+    return results
+
+
+def bench_pygame(scale, repeats):
+    """run_pygame_visualization의 프레임 시간 (SDL dummy 드라이버, 프레임 제한 없음)"""
+    frames = BENCHMARK_FRAMES[scale]
+    warmup = BENCHMARK_WARMUP_FRAMES[scale]
+    results = []
+    for num_daisies in BENCHMARK_DAISY_COUNTS[scale]:
+        def run_frames(count):
+            simulator = _seeded_simulator(num_daisies=num_daisies)
+            return _best_time(lambda: run_pygame_visualization(simulator, max_frames=count, fps=None), repeats)
+
+        # 창/지형 생성 비용은 짧은 실행과의 차이로 제거
+        frame_time = (run_frames(frames) - run_frames(warmup)) / (frames - warmup)
+        results.append(_result(f'pygame.frame[daisies={num_daisies}]', frame_time * 1e3, 'ms', 'lower'))
+    return results
+
+
+def bench_matplotlib(scale, repeats):
+    """animate 콜백 비용(기록 길이별)과 save_graphs 시간(스텝 수별)"""
+    results = []
+    calls = BENCHMARK_ANIMATE_CALLS[scale]
+
+    simulator = _seeded_simulator(num_daisies=0)
+    fig, init, animate = create_live_graphs(simulator)
+    init()
+    for length in BENCHMARK_HISTORY_LENGTHS[scale]:
+        simulator.run(length - simulator.current_time)
+
+        def animate_calls():
+            for frame in range(calls):
+                animate(frame)
+
+        def animate_and_draw():
+            for frame in range(calls):
+                animate(frame)
+                fig.canvas.draw()
+
+        results.append(_result(f'matplotlib.animate[history={length}]',
+                               _best_time(animate_calls, repeats) / calls * 1e3, 'ms', 'lower'))
+        results.append(_result(f'matplotlib.animate_draw[history={length}]',
+                               _best_time(animate_and_draw, repeats) / calls * 1e3, 'ms', 'lower'))
+    plt.close(fig)
+
+    simulator = _seeded_simulator(num_daisies=0)
+    with tempfile.TemporaryDirectory() as output_dir:
+        for num_steps in BENCHMARK_SAVE_STEPS[scale]:
+            simulator.run(num_steps - simulator.current_time)
+            with contextlib.redirect_stdout(io.StringIO()):
+                elapsed = _best_time(lambda: save_graphs(simulator, output_dir), repeats)
+            results.append(_result(f'matplotlib.save_graphs[steps={num_steps}]', elapsed, 's', 'lower'))
+    return results
+
+
+# 이름 → 벤치마크 함수 (--only로 일부만 실행)
+BENCHMARKS = {
+    'simulator': bench_simulator,
+    'pygame': bench_pygame,
+    'matplotlib': bench_matplotlib,
+}
+
+
+def run_benchmarks(names=None, quick=False, repeats=BENCHMARK_REPEATS):
+    """
+    벤치마크 실행
+
+    Args:
+        names: 실행할 벤치마크 이름 목록 (None이면 전부)
+        quick: True면 작은 규모로 측정
+        repeats: 반복 측정 횟수
+
+    Returns:
+        결과 딕셔너리 (환경 정보 + 항목 이름별 측정값)
+    """
+    scale = 1 if quick else 0
+    results = {}
+    for name in names or BENCHMARKS:
+        print(f"Running {name} benchmarks...", flush=True)
+        for result in BENCHMARKS[name](scale, repeats):
+            results[result['name']] = result
+            print(f"  {result['name']:<45} {result['value']:>12.4g} {result['unit']}", flush=True)
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'quick': quick,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'machine': f'{platform.system()} {platform.machine()} ({os.cpu_count()} CPU)',
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=BENCHMARK_THRESHOLD):
+    """
+    기준값과 비교
+
+    Args:
+        current: 이번 결과 딕셔너리
+        baseline: 기준 결과 딕셔너리
+        threshold: 성능 저하로 판단하는 상대 변화량
+
+    Returns:
+        (이름, 기준값, 현재값, 변화율, 성능 저하 여부) 목록 (두 결과에 모두 있는 항목만)
+    """
+    rows = []
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        base = baseline['results'][name]['value']
+        value = result['value']
+        change = (value - base) / base if base else 0.0
+        allowance = max(abs(base) * threshold, result.get('slack', 0.0))
+        if result['better'] == 'higher':
+            regressed = value < base - allowance
+        else:
+            regressed = value > base + allowance
+        rows.append((name, base, value, change, regressed))
+    return rows
+
+
+def _write_json(data, path):
+    """JSON 파일 저장 (디렉토리 자동 생성)"""
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def main():
+    """벤치마크 실행 진입점"""
+    parser = argparse.ArgumentParser(description='Benchmark the Daisyworld simulator and visualizers.')
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS),
+                        help='run only this benchmark group (repeatable)')
+    parser.add_argument('--quick', action='store_true', help='smaller problem sizes for a fast check')
+    parser.add_argument('--repeats', type=int, default=BENCHMARK_REPEATS, help='repetitions per measurement (best is kept)')
+    parser.add_argument('--output', default=BENCHMARK_OUTPUT, help='machine-readable results file')
+    parser.add_argument('--baseline', default=BENCHMARK_BASELINE, help='baseline results to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=BENCHMARK_THRESHOLD,
+                        help='relative slowdown that counts as a regression')
+    args = parser.parse_args()
+
+    current = run_benchmarks(args.only, quick=args.quick, repeats=args.repeats)
+    _write_json(current, args.output)
+    print(f"Results saved: {args.output}")
+
+    if args.save_baseline:
+        _write_json(current, args.baseline)
+        print(f"Baseline saved: {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline} (use --save-baseline to create one).")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('quick') != current['quick']:
+        print("Warning: baseline was measured with a different --quick setting.")
+    rows = compare(current, baseline, args.threshold)
+    print(f"\nComparison against {args.baseline} (threshold {args.threshold:.0%}):")
+    for name, base, value, change, regressed in rows:
+        flag = 'REGRESSION' if regressed else ''
+        print(f"  {name:<45} {base:>12.4g} -> {value:>12.4g} ({change:+.1%}) {flag}")
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}.")
+        sys.exit(1)
+    print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
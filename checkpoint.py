@@ -0,0 +1,175 @@
+"""
+시뮬레이터 체크포인트 저장/복원 모듈
+장시간 실행을 중단한 지점에서 그대로 이어서 실행할 수 있도록 전체 상태를 바이너리로 저장
+"""
+import json
+import os
+import queue
+import threading
+import numpy as np
+from simulator import DaisyworldSimulator, STATE_FLOAT_FIELDS, STATE_INT_FIELDS
+from trajectory import TrajectoryWriter
+
+
+CHECKPOINT_VERSION = 2               # 체크포인트 형식 버전 (1: 전역 np.random 상태, 2: 인스턴스 Generator 상태)
+DEFAULT_CHECKPOINT_INTERVAL = 100000 # 기본 체크포인트 주기 (스텝 단위)
+
+
+def capture_checkpoint(simulator):
+    """
+    시뮬레이터의 현재 상태를 체크포인트 데이터로 캡처 (디스크 쓰기 없음)
+    궤적 파일 작성기가 연결되어 있으면 파일 경로, 스텝 수, 아직 쓰이지 않은 버퍼도 포함
+
+    Args:
+        simulator: DaisyworldSimulator 인스턴스
+
+    Returns:
+        np.savez로 저장할 배열 딕셔너리
+    """
+    state = simulator.get_state()
+
+    meta = {
+        'version': CHECKPOINT_VERSION,
+        'float_fields': list(STATE_FLOAT_FIELDS),
+        'int_fields': list(STATE_INT_FIELDS),
+        'rng_state': state['rng_state'],   # Generator.bit_generator.state (정수만 담긴 딕셔너리)
+        'params': simulator.params,
+        'trajectory_path': None,
+        'trajectory_steps': 0,
+    }
+    arrays = {
+        'floats': np.array([state[name] for name in STATE_FLOAT_FIELDS], dtype=np.float64),
+        'ints': np.array([state[name] for name in STATE_INT_FIELDS], dtype=np.int64),
+        'daisy_positions': state['daisy_positions'],
+        'daisy_order': state['daisy_order'],
+    }
+
+    writer = simulator.trajectory_writer
+    if writer is not None:
+        meta['trajectory_path'] = os.path.abspath(writer.path)
+        meta['trajectory_steps'] = writer.num_steps
+        arrays['trajectory_pending'] = writer.pending()
+
+    arrays['meta'] = np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)
+    return arrays
+
+
+def write_checkpoint(arrays, path):
+    """
+    캡처한 체크포인트를 파일로 기록 (임시 파일에 쓴 뒤 교체하여 중간에 죽어도 이전 파일 보존)
+
+    Args:
+        arrays: capture_checkpoint()의 반환값
+        path: 저장할 파일 경로
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(temporary_path, path)
+
+
+def save_checkpoint(simulator, path):
+    """
+    시뮬레이터의 전체 상태를 체크포인트 파일로 저장
+
+    Args:
+        simulator: DaisyworldSimulator 인스턴스
+        path: 저장할 파일 경로
+    """
+    write_checkpoint(capture_checkpoint(simulator), path)
+
+
+def load_checkpoint(path, simulator=None, resume_trajectory=True, history=None):
+    """
+    체크포인트 파일에서 시뮬레이터 상태 복원
+
+    Args:
+        path: 체크포인트 파일 경로
+        simulator: 상태를 덮어쓸 시뮬레이터 (None이면 새로 생성)
+        resume_trajectory: True면 체크포인트에 기록된 궤적 파일에 이어서 기록하도록 연결
+        history: 새로 생성하는 시뮬레이터의 기록 저장소 (SimulationHistory, None이면 기본 설정)
+
+    Returns:
+        복원된 DaisyworldSimulator 인스턴스
+    """
+    with np.load(path) as data:
+        meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+        if meta['version'] not in (1, CHECKPOINT_VERSION):
+            raise ValueError(f"지원하지 않는 체크포인트 버전입니다: {meta['version']}")
+
+        state = dict(zip(meta['float_fields'], data['floats'].tolist()))
+        state.update(zip(meta['int_fields'], data['ints'].tolist()))
+        state['daisy_positions'] = data['daisy_positions']
+        if 'daisy_order' in data:
+            state['daisy_order'] = data['daisy_order']
+        # 버전 1은 전역 np.random 상태를 저장했으므로 난수 상태는 복원하지 않음 (물리 상태와 무관)
+        state['rng_state'] = meta.get('rng_state')
+        pending = data['trajectory_pending'] if 'trajectory_pending' in data else None
+
+    if simulator is None:
+        simulator = DaisyworldSimulator(params=meta['params'], history=history)
+    simulator.set_state(state)
+
+    if resume_trajectory and meta['trajectory_path'] is not None:
+        simulator.trajectory_writer = TrajectoryWriter.resume(
+            meta['trajectory_path'], meta['trajectory_steps'], pending,
+        )
+    return simulator
+
+
+class BackgroundCheckpointer:
+    """
+    주기적으로 체크포인트를 저장하는 백그라운드 작성기
+    상태 캡처는 호출한 스레드에서 즉시(일관된 시점) 수행하고,
+    디스크 쓰기는 별도 스레드에서 처리하여 시뮬레이션을 멈추지 않음
+    """
+
+    def __init__(self, simulator, path, interval=DEFAULT_CHECKPOINT_INTERVAL):
+        """
+        Args:
+            simulator: DaisyworldSimulator 인스턴스
+            path: 체크포인트 파일 경로 (매번 덮어씀)
+            interval: 체크포인트 주기 (스텝 단위)
+        """
+        self.simulator = simulator
+        self.path = path
+        self.interval = interval
+        self.last_checkpoint_time = simulator.current_time
+        self.checkpoints_written = 0
+
+        # 대기 중인 체크포인트는 최대 1개 (쓰기가 밀리면 최신 것만 유지)
+        self._queue = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def _worker(self):
+        """백그라운드 쓰기 루프"""
+        while True:
+            arrays = self._queue.get()
+            if arrays is None:
+                break
+            write_checkpoint(arrays, self.path)
+            self.checkpoints_written += 1
+
+    def maybe_checkpoint(self):
+        """마지막 체크포인트 이후 interval 스텝이 지났으면 체크포인트 요청"""
+        if self.simulator.current_time - self.last_checkpoint_time >= self.interval:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """현재 상태를 캡처하여 백그라운드 쓰기 요청"""
+        arrays = capture_checkpoint(self.simulator)
+        self.last_checkpoint_time = self.simulator.current_time
+        try:
+            self._queue.get_nowait()   # 아직 쓰이지 않은 이전 요청은 버림
+        except queue.Empty:
+            pass
+        self._queue.put(arrays)
+
+    def close(self):
+        """대기 중인 체크포인트를 모두 기록하고 스레드 종료"""
+        self._queue.put(None)
+        self._thread.join()
@@ -0,0 +1,457 @@
+"""
+태양 광도 연속법(numerical continuation) 모듈
+DaisyworldSimulator.step()이 정의하는 모델의 평형(낮/밤 한 주기 뒤 같은 상태로 돌아오는 고정점)을
+태양 광도를 올리고 내리며 추적하여 히스테리시스 곡선과 접힘점(fold)을 계산
+"""
+import argparse
+import os
+import time
+import numpy as np
+from simulator import DaisyworldSimulator, compute_astronomical_forcing, resolve_parameters
+from ensemble import DaisyworldEnsemble
+from history import SimulationHistory
+from equilibrium import EQUILIBRIUM_FIELDS, EQUILIBRIUM_SCALE_FLOOR
+
+
+# 연속법 설정
+CONTINUATION_LUMINOSITY_RANGE = (300.0, 800.0)   # 기본 광도 범위
+CONTINUATION_STEP = 5.0                          # 기본 광도 간격
+CONTINUATION_MIN_STEP = 0.05                     # 접힘점 위치 정밀도 (이보다 작은 간격에서도 실패하면 접힘점)
+CONTINUATION_BATCH = 16                          # 한 번에 보정하는 점 수 (예측점 × 야코비안 섭동을 한 앙상블로 계산)
+CONTINUATION_MAX_AREA_CHANGE = 0.05              # 이웃한 두 점 사이 데이지 면적 변화 한계 (넘으면 다른 가지로 건너간 것으로 판단)
+
+# 뉴턴법 / 이완 설정
+CONTINUATION_NEWTON_TOLERANCE = 1e-8             # 고정점 잔차 허용 오차 (값 규모 대비)
+CONTINUATION_NEWTON_MAX_ITERATIONS = 16          # 최대 반복 횟수 (감쇠로 다시 시도한 횟수 포함)
+CONTINUATION_JACOBIAN_STEP = 1e-6                # 유한 차분 상대 섭동 크기
+CONTINUATION_MIN_DAMPING = 1.0 / 64             # 감쇠 뉴턴법의 최소 이동 비율 (이보다 줄어들면 실패)
+CONTINUATION_RELAX_CYCLES = 500                  # 접힘점을 지난 뒤 새 가지로 이완할 때 뉴턴 보정 사이의 최대 주기 수
+CONTINUATION_RELAX_ATTEMPTS = 20                 # 이완 후 뉴턴 보정 시도 횟수
+CONTINUATION_RELAX_TOLERANCE = 1e-5              # 이완 종료 판정 (주기당 상대 변화, 이후는 뉴턴법이 마무리)
+CONTINUATION_WARMUP_CYCLES = 20                  # 주기 시작 시점의 태양 강도를 구할 때 반복하는 주기 수
+
+# 상태 변수 범위 (EQUILIBRIUM_FIELDS 순서, simulator의 면적/기체 농도 제한과 동일)
+# 뉴턴 갱신을 이 범위로 투영하여 제한에 걸린 고정점(예: CO2 800 ppm)에서 발산하지 않도록 함
+CONTINUATION_LOWER_BOUNDS = np.array([0.0, 0.0, 0.0, 0.0, 0.0, 50.0, 0.5, 1000.0])
+CONTINUATION_UPPER_BOUNDS = np.array([1.0, 1.0, np.inf, np.inf, np.inf, 800.0, 5.0, 25000.0])
+
+# 가지(branch)에 저장하는 주기 평균값
+BRANCH_MEAN_FIELDS = ('temperature', 'black_daisy', 'white_daisy')
+
+
+class ContinuationBranch:
+    """광도 한 방향으로 추적한 평형 점들 (광도 순서대로, 접힘점에서 끊긴 구간 포함)"""
+
+    def __init__(self, direction):
+        self.direction = direction      # +1 = 광도 증가, -1 = 광도 감소
+        self.luminosity = []
+        self.states = []                # 주기 시작 시점의 고정점 (EQUILIBRIUM_FIELDS 순서)
+        self.means = []                 # 고정점 주기의 평균값 (BRANCH_MEAN_FIELDS 순서)
+        self.stable = []                # 주기 사상의 스펙트럼 반지름 < 1
+        self.folds = []                 # 접힘점 광도 (이 광도를 넘으면 가지가 사라져 다른 가지로 건너감)
+
+    def append(self, luminosity, state, means, stable):
+        self.luminosity.append(float(luminosity))
+        self.states.append(state)
+        self.means.append(means)
+        self.stable.append(bool(stable))
+
+    def arrays(self):
+        """
+        배열 형태로 변환
+
+        Returns:
+            luminosity, states, 주기 평균 필드별 배열, stable을 담은 딕셔너리
+        """
+        means = np.array(self.means).reshape(-1, len(BRANCH_MEAN_FIELDS))
+        result = {
+            'luminosity': np.array(self.luminosity),
+            'states': np.array(self.states).reshape(-1, len(EQUILIBRIUM_FIELDS)),
+            'stable': np.array(self.stable, dtype=bool),
+            'folds': np.array(self.folds),
+        }
+        for i, name in enumerate(BRANCH_MEAN_FIELDS):
+            result[name] = means[:, i]
+        return result
+
+
+class ContinuationSolver:
+    """
+    태양 광도에 대한 자연 매개변수 연속법
+
+    - 평형: 기준 시각 start_time에 시작하는 낮/밤 한 주기의 사상 P(x)의 고정점 P(x) = x
+      (x = EQUILIBRIUM_FIELDS, O2는 다른 변수에 영향을 주지 않으므로 초기값으로 고정)
+    - 예측: 직전 두 점의 할선(secant)으로 다음 batch_size개 광도의 초기값을 외삽 (첫 점은 직전 점 그대로)
+    - 보정: 모든 예측점과 유한 차분 섭동을 하나의 DaisyworldEnsemble로 묶어 한 번에 한 주기 진행하고,
+      점마다 뉴턴 갱신 (앙상블 멤버 수 = batch_size × (변수 수 + 1))
+    - 접힘점: 보정이 실패하거나 데이지 면적이 크게 건너뛰면 간격을 줄여 다시 시도하고,
+      최소 간격에서도 실패하면 그 광도를 접힘점으로 기록한 뒤 시간 진행으로 새 가지에 이완하여 계속
+    """
+
+    def __init__(self, params=None, start_time=0, batch_size=CONTINUATION_BATCH):
+        """
+        Args:
+            params: 물리 파라미터 덮어쓰기 딕셔너리
+            start_time: 고정점을 정의하는 주기의 시작 시각 (밀란코비치 강제력 기준)
+            batch_size: 한 번에 보정하는 점 수
+        """
+        self.params = resolve_parameters(params)
+        self.start_time = start_time
+        self.batch_size = batch_size
+        self.cycle_steps = 2 * self.params['DAY_NIGHT_CYCLE_DURATION']
+        self.cycle_evaluations = 0      # 주기 사상 계산 횟수 (앙상블 멤버 수 합계)
+
+        # 주기 시작 시점(타이머 0, 낮)의 태양 강도는 주기마다 반복되는 값으로 사용
+        forcing = compute_astronomical_forcing(0, CONTINUATION_WARMUP_CYCLES * self.cycle_steps, 0, True, 1.0, self.params)
+        self.solar_intensity = float(forcing['solar_intensity'][-1])
+
+        # 접힘점 이후 이완용 시뮬레이터
+        self._scratch = DaisyworldSimulator(
+            history=SimulationHistory(capacity=1, index=False), params=self.params, num_daisies=0)
+
+    def evaluate(self, states, luminosities):
+        """
+        여러 (상태, 광도) 쌍의 주기 사상을 앙상블로 한 번에 계산
+
+        Args:
+            states: (M, 변수 수) 주기 시작 상태
+            luminosities: (M,) 태양 광도
+
+        Returns:
+            ((M, 변수 수) 한 주기 뒤 상태, (M, 평균 필드 수) 주기 평균)
+        """
+        p = self.params
+        num_members = len(states)
+        ensemble = DaisyworldEnsemble(
+            num_members,
+            area_black_daisy=states[:, 0],
+            area_white_daisy=states[:, 1],
+            co2_concentration=states[:, 5],
+            ch4_concentration=states[:, 6],
+            h2o_concentration=states[:, 7],
+            solar_luminosity=luminosities,
+            params=p,
+        )
+        ensemble.temperature_atmosphere = states[:, 2].copy()
+        ensemble.temperature_ocean = states[:, 3].copy()
+        ensemble.temperature_land = states[:, 4].copy()
+        ensemble.temperature_planet = (
+            ensemble.temperature_atmosphere * 0.3 +
+            ensemble.temperature_ocean * p['OCEAN_RATIO'] * 0.7 +
+            ensemble.temperature_land * p['LAND_RATIO'] * 0.7
+        )
+        ensemble.current_time = self.start_time
+        ensemble.solar_intensity[:] = self.solar_intensity
+
+        sums = np.zeros((len(BRANCH_MEAN_FIELDS), num_members))
+        for _ in range(self.cycle_steps):
+            ensemble.step()
+            sums[0] += ensemble.temperature_planet
+            sums[1] += ensemble.area_black_daisy
+            sums[2] += ensemble.area_white_daisy
+        self.cycle_evaluations += num_members
+
+        mapped = np.column_stack([getattr(ensemble, name) for name in EQUILIBRIUM_FIELDS])
+        return mapped, sums.T / self.cycle_steps
+
+    def correct(self, guesses, luminosities):
+        """
+        여러 광도의 고정점을 동시에 뉴턴법으로 보정
+
+        Args:
+            guesses: (K, 변수 수) 초기값
+            luminosities: (K,) 태양 광도
+
+        Returns:
+            (고정점 (K, 변수 수), 주기 평균 (K, 평균 필드 수), 수렴 여부 (K,), 안정 여부 (K,))
+        """
+        num_points, num_fields = guesses.shape
+        x = np.array(guesses, dtype=np.float64)
+        scale = np.maximum(np.abs(x), EQUILIBRIUM_SCALE_FLOOR)
+        converged = np.zeros(num_points, dtype=bool)
+        failed = np.zeros(num_points, dtype=bool)      # 감쇠를 최소로 줄여도 잔차가 줄지 않은 점
+        stable = np.zeros(num_points, dtype=bool)
+        means = np.zeros((num_points, len(BRANCH_MEAN_FIELDS)))
+        identity = np.eye(num_fields)
+
+        # 점마다 마지막으로 받아들인 상태(anchor)와 그 뉴턴 방향을 기억하고,
+        # 새 상태의 잔차가 더 크면 방향을 절반씩 줄여 다시 시도 (감쇠 뉴턴법, 제한/꺾임이 있는 사상 대응)
+        anchor = x.copy()
+        anchor_error = np.full(num_points, np.inf)
+        direction = np.zeros_like(x)
+        damping = np.ones(num_points)
+
+        for _ in range(CONTINUATION_NEWTON_MAX_ITERATIONS):
+            active = np.flatnonzero(~converged & ~failed)
+            if len(active) == 0:
+                break
+            # 점마다 [기준 상태, 변수별 섭동 상태]를 이어 붙여 한 번에 계산
+            base = x[active]
+            steps = CONTINUATION_JACOBIAN_STEP * scale[active]
+            perturbed = base[:, None, :] + steps[:, :, None] * identity[None, :, :]
+            members = np.concatenate([base[:, None, :], perturbed], axis=1).reshape(-1, num_fields)
+            mapped, cycle_means = self.evaluate(members, np.repeat(luminosities[active], num_fields + 1))
+            mapped = mapped.reshape(len(active), num_fields + 1, num_fields)
+            cycle_means = cycle_means.reshape(len(active), num_fields + 1, -1)
+
+            residual = mapped[:, 0] - base
+            derivative = (mapped[:, 1:] - mapped[:, :1]) / steps[:, :, None]    # (점, 섭동 변수, 출력 변수)
+            jacobian = derivative.transpose(0, 2, 1)                           # dP/dx
+            finite = np.all(np.isfinite(residual), axis=1) & np.all(np.isfinite(jacobian), axis=(1, 2))
+            error = np.where(finite, np.max(np.abs(residual) / scale[active], axis=1), np.inf)
+
+            for i, point in enumerate(active):
+                if error[i] >= anchor_error[point]:
+                    # 잔차 증가: 직전 상태에서 더 짧게 이동
+                    damping[point] *= 0.5
+                    if damping[point] < CONTINUATION_MIN_DAMPING:
+                        failed[point] = True
+                        x[point] = anchor[point]
+                        continue
+                    x[point] = np.clip(anchor[point] + damping[point] * direction[point],
+                                       CONTINUATION_LOWER_BOUNDS, CONTINUATION_UPPER_BOUNDS)
+                    continue
+                if error[i] <= CONTINUATION_NEWTON_TOLERANCE:
+                    converged[point] = True
+                    means[point] = cycle_means[i, 0]
+                    stable[point] = np.max(np.abs(np.linalg.eigvals(jacobian[i]))) < 1.0
+                    continue
+                try:
+                    delta = np.linalg.solve(jacobian[i] - identity, -residual[i])
+                except np.linalg.LinAlgError:
+                    delta = np.linalg.lstsq(jacobian[i] - identity, -residual[i], rcond=None)[0]
+                anchor[point] = base[i]
+                anchor_error[point] = error[i]
+                direction[point] = delta
+                damping[point] = 1.0
+                x[point] = np.clip(base[i] + delta, CONTINUATION_LOWER_BOUNDS, CONTINUATION_UPPER_BOUNDS)
+        return x, means, converged, stable
+
+    def relax(self, state, luminosity, tolerance=CONTINUATION_RELAX_TOLERANCE):
+        """
+        접힘점을 지난 뒤 시간 진행으로 새 평형 가지에 이완
+
+        Args:
+            state: 시작 상태
+            luminosity: 태양 광도
+            tolerance: 주기당 상대 변화가 이보다 작아지면 종료 (0이면 최대 주기 수까지 진행)
+
+        Returns:
+            이완된 주기 시작 상태
+        """
+        scratch = self._scratch
+        p = self.params
+        x = np.array(state, dtype=np.float64)
+        for _ in range(CONTINUATION_RELAX_CYCLES):
+            for name, value in zip(EQUILIBRIUM_FIELDS, x.tolist()):
+                setattr(scratch, name, value)
+            scratch.temperature_planet = (
+                scratch.temperature_atmosphere * 0.3 +
+                scratch.temperature_ocean * p['OCEAN_RATIO'] * 0.7 +
+                scratch.temperature_land * p['LAND_RATIO'] * 0.7
+            )
+            scratch.o2_concentration = p['INITIAL_O2_CONCENTRATION']
+            scratch.solar_luminosity = luminosity
+            scratch.current_time = self.start_time
+            scratch.day_night_timer = 0
+            scratch.is_daytime = True
+            scratch.solar_intensity = self.solar_intensity
+            scratch.run(self.cycle_steps, record=False)
+            mapped = np.array([getattr(scratch, name) for name in EQUILIBRIUM_FIELDS])
+            change = np.abs(mapped - x) / np.maximum(np.abs(x), EQUILIBRIUM_SCALE_FLOOR)
+            x = mapped
+            if change.max() <= tolerance:
+                break
+        return x
+
+    def settle(self, state, luminosity):
+        """
+        시간 진행 이완과 뉴턴 보정을 번갈아 하여 state가 끌려가는 평형을 구함
+
+        Args:
+            state: 시작 상태
+            luminosity: 태양 광도
+
+        Returns:
+            (고정점, 주기 평균, 안정 여부)
+        """
+        x = np.array(state, dtype=np.float64)
+        tolerance = CONTINUATION_RELAX_TOLERANCE
+        for _ in range(CONTINUATION_RELAX_ATTEMPTS):
+            x = self.relax(x, luminosity, tolerance)
+            # 사라진 가지의 흔적 근처에서는 변화가 매우 느리므로 실패 후에는 끝까지 진행
+            tolerance = 0.0
+            solution, means, converged, stable = self.correct(x[None, :], np.array([luminosity]))
+            if converged[0]:
+                return solution[0], means[0], stable[0]
+        raise RuntimeError(f"광도 {luminosity}에서 평형을 찾지 못했습니다")
+
+    def initial_state(self):
+        """모델 초기값 (DaisyworldSimulator 생성 직후 상태)"""
+        p = self.params
+        return np.array([0.01, 0.01, 250.0, 250.0, 250.0,
+                         p['INITIAL_CO2_CONCENTRATION'], p['INITIAL_CH4_CONCENTRATION'], p['INITIAL_H2O_CONCENTRATION']])
+
+    def trace(self, start, stop, step=CONTINUATION_STEP, initial_state=None):
+        """
+        광도 start에서 stop까지 평형 가지 추적
+
+        Args:
+            start: 시작 광도
+            stop: 끝 광도 (start보다 작으면 광도를 내리며 추적)
+            step: 기본 광도 간격
+            initial_state: 시작 상태 (None이면 모델 초기값에서 이완)
+
+        Returns:
+            ContinuationBranch
+        """
+        direction = 1.0 if stop >= start else -1.0
+        branch = ContinuationBranch(int(direction))
+        if initial_state is None:
+            initial_state = self.initial_state()
+        x, means, stable = self.settle(initial_state, start)
+        branch.append(start, x, means, stable)
+
+        current_step = step
+        previous = None      # 할선 예측용 직전 점 (광도, 상태)
+        luminosity, state = start, x
+        while direction * (stop - luminosity) > 1e-9:
+            remaining = abs(stop - luminosity)
+            count = min(self.batch_size, int(np.ceil(remaining / current_step - 1e-9)))
+            offsets = np.minimum(current_step * np.arange(1, count + 1), remaining)
+            targets = luminosity + direction * offsets
+            if previous is not None:
+                slope = (state - previous[1]) / (luminosity - previous[0])
+                guesses = state + slope[None, :] * (targets - luminosity)[:, None]
+                guesses = np.clip(guesses, CONTINUATION_LOWER_BOUNDS, CONTINUATION_UPPER_BOUNDS)
+            else:
+                guesses = np.repeat(state[None, :], count, axis=0)
+
+            solutions, point_means, converged, point_stable = self.correct(guesses, targets)
+
+            # 앞에서부터 연속으로 수렴하고 가지를 벗어나지 않은 점만 채택
+            accepted = 0
+            last_areas = state[:2]
+            for i in range(count):
+                if not converged[i] or np.abs(solutions[i, :2] - last_areas).max() > CONTINUATION_MAX_AREA_CHANGE:
+                    break
+                last_areas = solutions[i, :2]
+                accepted += 1
+            for i in range(accepted):
+                branch.append(targets[i], solutions[i], point_means[i], point_stable[i])
+            if accepted:
+                if accepted >= 2:
+                    previous = (targets[accepted - 2], solutions[accepted - 2])
+                else:
+                    previous = (luminosity, state)
+                luminosity, state = targets[accepted - 1], solutions[accepted - 1]
+
+            if accepted == count:
+                current_step = min(current_step * 2, step)
+                continue
+            if current_step > CONTINUATION_MIN_STEP:
+                # 다음 점에서 실패: 간격을 줄여 가지 끝(접힘점)에 다가감
+                current_step = max(current_step / 4, CONTINUATION_MIN_STEP)
+                continue
+
+            # 최소 간격에서도 실패 → 접힘점, 새 가지로 이완한 뒤 기본 간격으로 계속
+            branch.folds.append(float(luminosity))
+            target = luminosity + direction * min(current_step, abs(stop - luminosity))
+            x, means, stable = self.settle(state, target)
+            branch.append(target, x, means, stable)
+            luminosity, state = target, x
+            previous = None
+            current_step = step
+        return branch
+
+
+def hysteresis(low=CONTINUATION_LUMINOSITY_RANGE[0], high=CONTINUATION_LUMINOSITY_RANGE[1],
+               step=CONTINUATION_STEP, params=None, start_time=0):
+    """
+    광도를 low → high로 올린 뒤 high → low로 내리며 평형 가지를 추적 (히스테리시스 곡선)
+
+    Args:
+        low: 최저 광도
+        high: 최고 광도
+        step: 기본 광도 간격
+        params: 물리 파라미터 덮어쓰기 딕셔너리
+        start_time: 고정점을 정의하는 주기의 시작 시각
+
+    Returns:
+        (올리는 가지, 내리는 가지, ContinuationSolver)
+    """
+    solver = ContinuationSolver(params=params, start_time=start_time)
+    upward = solver.trace(low, high, step)
+    downward = solver.trace(high, low, step, initial_state=upward.states[-1])
+    return upward, downward, solver
+
+
+def save_diagram(upward, downward, path):
+    """
+    히스테리시스 그림(.png)과 데이터(.npz) 저장
+
+    Args:
+        upward: 광도를 올리며 추적한 ContinuationBranch
+        downward: 광도를 내리며 추적한 ContinuationBranch
+        path: 그림 파일 경로 (같은 이름의 .npz도 저장)
+    """
+    # pyplot/전역 백엔드를 건드리지 않도록 독립 Figure와 Agg 캔버스에 직접 그림
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    up = upward.arrays()
+    down = downward.arrays()
+    np.savez(os.path.splitext(path)[0] + '.npz',
+             **{f'up_{name}': values for name, values in up.items()},
+             **{f'down_{name}': values for name, values in down.items()})
+
+    fig = Figure(figsize=(10, 8))
+    FigureCanvasAgg(fig)
+    ax_area, ax_temperature = fig.subplots(2, 1, sharex=True)
+    for data, style, label in ((up, '-', 'increasing L'), (down, '--', 'decreasing L')):
+        ax_area.plot(data['luminosity'], data['black_daisy'], style, color='black', label=f'black ({label})')
+        ax_area.plot(data['luminosity'], data['white_daisy'], style, color='gray', label=f'white ({label})')
+        ax_temperature.plot(data['luminosity'], data['temperature'], style, color='tab:red', label=label)
+    for fold in list(upward.folds) + list(downward.folds):
+        ax_area.axvline(fold, color='tab:blue', alpha=0.4, linewidth=1)
+        ax_temperature.axvline(fold, color='tab:blue', alpha=0.4, linewidth=1)
+    ax_area.set_ylabel('Daisy area (cycle mean)')
+    ax_area.legend(fontsize=8)
+    ax_area.grid(True, alpha=0.3)
+    ax_temperature.set_xlabel('Solar luminosity')
+    ax_temperature.set_ylabel('Temperature (K, cycle mean)')
+    ax_temperature.legend(fontsize=8)
+    ax_temperature.grid(True, alpha=0.3)
+    fig.suptitle('Daisyworld equilibrium branches')
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+
+
+def main():
+    """연속법 실행 진입점"""
+    parser = argparse.ArgumentParser(description='Trace Daisyworld equilibrium branches against solar luminosity.')
+    parser.add_argument('--low', type=float, default=CONTINUATION_LUMINOSITY_RANGE[0], help='lowest luminosity')
+    parser.add_argument('--high', type=float, default=CONTINUATION_LUMINOSITY_RANGE[1], help='highest luminosity')
+    parser.add_argument('--step', type=float, default=CONTINUATION_STEP, help='luminosity step')
+    parser.add_argument('--output', default='results/hysteresis.png', help='output figure (.npz saved alongside)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    upward, downward, solver = hysteresis(args.low, args.high, args.step)
+    elapsed = time.perf_counter() - start
+    save_diagram(upward, downward, args.output)
+
+    points = len(upward.luminosity) + len(downward.luminosity)
+    print(f"{points} equilibrium points in {elapsed:.1f} s "
+          f"({solver.cycle_evaluations * solver.cycle_steps:,} member-steps evaluated)")
+    print(f"Folds (increasing L): {', '.join(f'{fold:.2f}' for fold in upward.folds) or 'none'}")
+    print(f"Folds (decreasing L): {', '.join(f'{fold:.2f}' for fold in downward.folds) or 'none'}")
+    print(f"Diagram saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Daisyworld 앙상블 시뮬레이션 모듈
+여러 행성(멤버)의 상태를 NumPy 배열로 묶어 한 번에 벡터화하여 진행
+"""
+import numpy as np
+from simulator import resolve_parameters
+
+
+def _member_array(value, num_members, dtype=np.float64):
+    """스칼라 또는 (N,) 배열을 멤버 수에 맞는 독립적인 배열로 변환"""
+    array = np.empty(num_members, dtype=dtype)
+    array[...] = value
+    return array
+
+
+class DaisyworldEnsemble:
+    """
+    여러 DaisyworldSimulator 멤버를 한꺼번에 진행하는 벡터화 엔진
+
+    모든 상태 변수는 (N,) 형태의 NumPy 배열로 저장되며, step()은
+    DaisyworldSimulator.step()과 동일한 물리(클램프, 최소 면적, 성장률 하한 포함)를
+    모든 멤버에 대해 한 번에 계산한다.
+    밀란코비치 주기는 current_time에만 의존하므로 모든 멤버가 공유한다.
+    (NumPy 배열 연산의 SIMD pow 구현 차이로 단일 시뮬레이터와 ULP 수준의 오차는 있을 수 있음)
+    """
+
+    def __init__(self, num_members,
+                 area_black_daisy=0.01, area_white_daisy=0.01,
+                 temperature=250.0,
+                 co2_concentration=None,
+                 o2_concentration=None,
+                 ch4_concentration=None,
+                 h2o_concentration=None,
+                 solar_luminosity=None,
+                 params=None):
+        """
+        앙상블 초기화
+
+        Args:
+            num_members: 멤버(행성) 개수
+            area_black_daisy: 초기 검은 데이지 면적 (스칼라 또는 (N,) 배열)
+            area_white_daisy: 초기 흰 데이지 면적 (스칼라 또는 (N,) 배열)
+            temperature: 초기 온도 - 행성/대기/바다/대륙 공통 (스칼라 또는 (N,) 배열)
+            co2_concentration: 초기 CO2 농도 (ppm, None이면 INITIAL_CO2_CONCENTRATION)
+            o2_concentration: 초기 O2 농도 (ppm, None이면 INITIAL_O2_CONCENTRATION)
+            ch4_concentration: 초기 CH4 농도 (ppm, None이면 INITIAL_CH4_CONCENTRATION)
+            h2o_concentration: 초기 H2O 농도 (ppm, None이면 INITIAL_H2O_CONCENTRATION)
+            solar_luminosity: 태양 광도 (스칼라 또는 (N,) 배열, None이면 INITIAL_SOLAR_LUMINOSITY)
+            params: 물리 파라미터 덮어쓰기 딕셔너리
+                    값으로 (N,) 배열을 주면 멤버별로 다른 파라미터를 사용 (브로드캐스팅)
+        """
+        self.params = resolve_parameters(params)
+        p = self.params
+        if co2_concentration is None:
+            co2_concentration = p['INITIAL_CO2_CONCENTRATION']
+        if o2_concentration is None:
+            o2_concentration = p['INITIAL_O2_CONCENTRATION']
+        if ch4_concentration is None:
+            ch4_concentration = p['INITIAL_CH4_CONCENTRATION']
+        if h2o_concentration is None:
+            h2o_concentration = p['INITIAL_H2O_CONCENTRATION']
+        if solar_luminosity is None:
+            solar_luminosity = p['INITIAL_SOLAR_LUMINOSITY']
+
+        n = int(num_members)
+        self.num_members = n
+
+        # 면적 변수
+        self.area_black_daisy = _member_array(area_black_daisy, n)
+        self.area_white_daisy = _member_array(area_white_daisy, n)
+        self.area_bare_ground = np.zeros(n)
+
+        # 온도 변수
+        self.temperature_planet = _member_array(temperature, n)
+        self.temperature_atmosphere = _member_array(temperature, n)
+        self.temperature_ocean = _member_array(temperature, n)
+        self.temperature_land = _member_array(temperature, n)
+        self.temperature_black_daisy = _member_array(temperature, n)
+        self.temperature_white_daisy = _member_array(temperature, n)
+
+        # 성장률 변수
+        self.growth_factor_black = np.zeros(n)
+        self.growth_factor_white = np.zeros(n)
+
+        # 기타 변수
+        self.solar_luminosity = _member_array(solar_luminosity, n)
+        self.planetary_albedo = np.zeros(n)
+        self.current_time = 0
+
+        # 대기 및 온실효과 변수
+        self.co2_concentration = _member_array(co2_concentration, n)
+        self.o2_concentration = _member_array(o2_concentration, n)
+        self.ch4_concentration = _member_array(ch4_concentration, n)
+        self.h2o_concentration = _member_array(h2o_concentration, n)
+        self.greenhouse_effect = np.zeros(n)
+        self.earth_emissivity = _member_array(p['BASE_EARTH_EMISSIVITY'], n)
+
+        # 낮/밤 사이클 변수
+        self.is_daytime = np.ones(n, dtype=bool)
+        self.day_night_timer = np.zeros(n, dtype=np.int64)
+        self.solar_intensity = np.ones(n)
+
+        # 밀란코비치 주기 변수 (모든 멤버 공유)
+        self.eccentricity = 0.0167
+        self.obliquity = p['CURRENT_OBLIQUITY']
+        self.precession_angle = 0.0
+
+    def _update_milankovitch_cycles(self):
+        """밀란코비치 주기 업데이트 (DaisyworldSimulator와 동일, 스칼라)"""
+        p = self.params
+        eccentricity_phase = (2 * np.pi * self.current_time) / p['ECCENTRICITY_CYCLE']
+        self.eccentricity = p['ECCENTRICITY_MIN'] + (p['ECCENTRICITY_MAX'] - p['ECCENTRICITY_MIN']) * \
+                           (0.5 + 0.5 * np.sin(eccentricity_phase))
+
+        obliquity_phase = (2 * np.pi * self.current_time) / p['OBLIQUITY_CYCLE']
+        self.obliquity = p['OBLIQUITY_MIN'] + (p['OBLIQUITY_MAX'] - p['OBLIQUITY_MIN']) * \
+                        (0.5 + 0.5 * np.sin(obliquity_phase))
+
+        precession_phase = (2 * np.pi * self.current_time) / p['PRECESSION_CYCLE']
+        self.precession_angle = precession_phase * (180 / np.pi)
+
+    def _update_day_night_cycle(self):
+        """낮/밤 사이클 업데이트 (멤버별 타이머)"""
+        p = self.params
+        self.day_night_timer += 1
+
+        # 주기가 지난 멤버만 낮/밤 전환
+        switched = self.day_night_timer >= p['DAY_NIGHT_CYCLE_DURATION']
+        self.is_daytime ^= switched
+        self.day_night_timer[switched] = 0
+
+        target_intensity = np.where(self.is_daytime, 1.0, p['NIGHT_SOLAR_REDUCTION'])
+        self.solar_intensity += (target_intensity - self.solar_intensity) * p['TRANSITION_SMOOTHNESS']
+
+    def _update_greenhouse_gases(self):
+        """온실 기체 농도 업데이트 (광합성/호흡, 클램프 포함)"""
+        p = self.params
+        total_daisy_area = self.area_black_daisy + self.area_white_daisy
+
+        # 호흡: 항상 발생
+        respiration_co2 = total_daisy_area * p['RESPIRATION_RATE']
+        respiration_o2 = -total_daisy_area * p['RESPIRATION_RATE']
+
+        # 광합성: 낮인 멤버만
+        temp_celsius = self.temperature_planet - 273.15
+        temp_boost = 1.0 + (temp_celsius * p['PHOTOSYNTHESIS_TEMP_COEFFICIENT'])
+        temp_boost = np.maximum(0.5, np.minimum(temp_boost, 2.0))
+
+        photosynthesis_rate = p['BASE_PHOTOSYNTHESIS_RATE'] * temp_boost * self.solar_intensity
+        photosynthesis_co2 = np.where(self.is_daytime, -total_daisy_area * photosynthesis_rate, 0.0)
+        photosynthesis_o2 = np.where(self.is_daytime, total_daisy_area * photosynthesis_rate, 0.0)
+
+        self.co2_concentration += respiration_co2 + photosynthesis_co2
+        self.o2_concentration += respiration_o2 + photosynthesis_o2
+
+        # CH4: 생물 활동과 자연 분해
+        ch4_production = total_daisy_area * 0.001
+        ch4_decay = self.ch4_concentration * 0.001
+        self.ch4_concentration += ch4_production - ch4_decay
+
+        # H2O: 증발/응결
+        temp_factor = (self.temperature_ocean - 273.15) / 100.0
+        evaporation = np.maximum(0, temp_factor * 30.0)
+        condensation = self.h2o_concentration * 0.002
+        self.h2o_concentration += evaporation - condensation
+
+        # 농도 상한선 및 하한선 (폭주 방지)
+        np.maximum(50.0, np.minimum(self.co2_concentration, 800.0), out=self.co2_concentration)
+        np.maximum(100000.0, np.minimum(self.o2_concentration, 300000.0), out=self.o2_concentration)
+        np.maximum(0.5, np.minimum(self.ch4_concentration, 5.0), out=self.ch4_concentration)
+        np.maximum(1000.0, np.minimum(self.h2o_concentration, 25000.0), out=self.h2o_concentration)
+
+    def _calculate_greenhouse_effect(self):
+        """온실 기체 농도로부터 정규화된 온실효과 계산"""
+        p = self.params
+        co2_contribution = (self.co2_concentration / p['INITIAL_CO2_CONCENTRATION']) * p['CO2_GREENHOUSE_FACTOR']
+        ch4_contribution = (self.ch4_concentration / p['INITIAL_CH4_CONCENTRATION']) * p['CH4_GREENHOUSE_FACTOR']
+        h2o_contribution = (self.h2o_concentration / p['INITIAL_H2O_CONCENTRATION']) * p['H2O_GREENHOUSE_FACTOR']
+
+        total_effect = (co2_contribution + ch4_contribution + h2o_contribution) / 3.0
+        return np.minimum(total_effect, 3.0) / 3.0
+
+    def _update_earth_emissivity(self):
+        """온실효과에 따른 복사 방출 효율 업데이트 (최소 0.3)"""
+        p = self.params
+        emissivity = p['BASE_EARTH_EMISSIVITY'] * (1.0 - self.greenhouse_effect * p['GREENHOUSE_EFFECT_COEFFICIENT'])
+        self.earth_emissivity = np.maximum(emissivity, 0.3)
+
+    def _get_effective_solar_luminosity(self):
+        """낮/밤 및 밀란코비치 효과를 반영한 유효 태양 광도"""
+        p = self.params
+        base_luminosity = self.solar_luminosity * self.solar_intensity
+
+        # 이심률 + 세차운동에 따른 거리 계수
+        cycle_position = self.day_night_timer / p['DAY_NIGHT_CYCLE_DURATION']
+        orbital_angle = self.precession_angle + cycle_position * 360
+        orbital_angle_rad = orbital_angle * (np.pi / 180)
+        distance_factor = (1 - self.eccentricity**2) / (1 + self.eccentricity * np.cos(orbital_angle_rad))
+        solar_factor = 1.0 / (distance_factor ** 2)
+
+        # 자전축 기울기에 따른 계절 계수
+        obliquity_rad = self.obliquity * (np.pi / 180)
+        seasonal_phase = cycle_position * 2 * np.pi
+        seasonal_factor = 1.0 + 0.2 * np.sin(obliquity_rad) * np.cos(seasonal_phase)
+
+        return base_luminosity * solar_factor * seasonal_factor
+
+    def _calculate_terrain_temperatures(self, effective_solar_luminosity):
+        """지형별 온도 계산 (열용량 고려)"""
+        p = self.params
+        radiative_denominator = self.earth_emissivity * p['STEFAN_BOLTZMANN_CONSTANT']
+        base_temp_ocean = (effective_solar_luminosity * (1 - p['ALBEDO_OCEAN']) / radiative_denominator) ** 0.25
+        base_temp_land = (effective_solar_luminosity * (1 - p['ALBEDO_LAND']) / radiative_denominator) ** 0.25
+        base_temp_atmosphere = base_temp_ocean * p['OCEAN_RATIO'] + base_temp_land * p['LAND_RATIO']
+
+        self.temperature_atmosphere = (
+            self.temperature_atmosphere * p['ATMOSPHERE_HEAT_CAPACITY'] +
+            base_temp_atmosphere * (1 - p['ATMOSPHERE_HEAT_CAPACITY'])
+        )
+        self.temperature_ocean = (
+            self.temperature_ocean * p['OCEAN_HEAT_CAPACITY'] +
+            base_temp_ocean * (1 - p['OCEAN_HEAT_CAPACITY'])
+        )
+        self.temperature_land = (
+            self.temperature_land * p['LAND_HEAT_CAPACITY'] +
+            base_temp_land * (1 - p['LAND_HEAT_CAPACITY'])
+        )
+
+        self.temperature_planet = (
+            self.temperature_atmosphere * 0.3 +
+            self.temperature_ocean * p['OCEAN_RATIO'] * 0.7 +
+            self.temperature_land * p['LAND_RATIO'] * 0.7
+        )
+
+    def step(self):
+        """모든 멤버를 한 스텝 진행 (DaisyworldSimulator.step()과 동일한 순서)"""
+        p = self.params
+        self._update_milankovitch_cycles()
+        self._update_day_night_cycle()
+        self._update_greenhouse_gases()
+        self.greenhouse_effect = self._calculate_greenhouse_effect()
+        self._update_earth_emissivity()
+        effective_solar_luminosity = self._get_effective_solar_luminosity()
+
+        # 빈 땅 면적 (최소 면적 보장 전에 계산)
+        self.area_bare_ground = 1 - self.area_black_daisy - self.area_white_daisy
+
+        # 최소 면적 보장
+        self.area_black_daisy = np.where(
+            self.area_black_daisy < p['MIN_AREA_THRESHOLD'], p['MIN_AREA_THRESHOLD'], self.area_black_daisy)
+        self.area_white_daisy = np.where(
+            self.area_white_daisy < p['MIN_AREA_THRESHOLD'], p['MIN_AREA_THRESHOLD'], self.area_white_daisy)
+
+        # 행성 평균 알베도
+        land_albedo = (
+            (self.area_bare_ground * p['ALBEDO_LAND']) +
+            (self.area_black_daisy * p['ALBEDO_BLACK_DAISY']) +
+            (self.area_white_daisy * p['ALBEDO_WHITE_DAISY'])
+        )
+        self.planetary_albedo = p['ALBEDO_OCEAN'] * p['OCEAN_RATIO'] + land_albedo * p['LAND_RATIO']
+
+        self._calculate_terrain_temperatures(effective_solar_luminosity)
+
+        # 데이지 영역 온도 및 성장률
+        self.temperature_white_daisy = p['TEMPERATURE_FEEDBACK_FACTOR'] * (self.planetary_albedo - p['ALBEDO_WHITE_DAISY']) + self.temperature_planet
+        self.temperature_black_daisy = p['TEMPERATURE_FEEDBACK_FACTOR'] * (self.planetary_albedo - p['ALBEDO_BLACK_DAISY']) + self.temperature_planet
+
+        growth_factor_black = 1 - (p['GROWTH_RATE_COEFFICIENT'] * (p['OPTIMAL_TEMPERATURE'] - self.temperature_black_daisy) ** 2)
+        growth_factor_white = 1 - (p['GROWTH_RATE_COEFFICIENT'] * (p['OPTIMAL_TEMPERATURE'] - self.temperature_white_daisy) ** 2)
+        self.growth_factor_black = np.where(growth_factor_black < 0, 0.0, growth_factor_black)
+        self.growth_factor_white = np.where(growth_factor_white < 0, 0.0, growth_factor_white)
+
+        # 면적 업데이트
+        delta_area_black = self.area_black_daisy * (self.area_bare_ground * self.growth_factor_black - p['DEATH_RATE'])
+        delta_area_white = self.area_white_daisy * (self.area_bare_ground * self.growth_factor_white - p['DEATH_RATE'])
+        self.area_black_daisy = self.area_black_daisy + delta_area_black
+        self.area_white_daisy = self.area_white_daisy + delta_area_white
+
+        self.current_time += 1
+        return True
+
+    def run(self, num_steps, stats=None):
+        """
+        여러 스텝을 연속으로 진행
+
+        Args:
+            num_steps: 진행할 스텝 수
+            stats: 스텝마다 모든 멤버의 상태를 넘길 통계 누적기 (ensemble_stats.StreamingEnsembleStats)
+        """
+        for _ in range(num_steps):
+            self.step()
+            if stats is not None:
+                stats.add_ensemble(self)
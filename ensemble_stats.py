@@ -0,0 +1,357 @@
+"""
+앙상블 스트리밍 통계 모듈
+멤버 궤적을 만들어지는 대로 받아 시간 구간별 평균/분산(Welford)/최솟값/최댓값과 근사 분위수(병합형 t-digest)를 누적
+멤버 궤적은 저장하지 않으므로 메모리는 시간 구간 수에만 비례하고 멤버 수와 무관함
+"""
+import argparse
+import os
+import time
+import numpy as np
+from history import HISTORY_FIELDS
+from ensemble import DaisyworldEnsemble
+
+
+ENSEMBLE_STATS_BINS = 200                          # 기본 시간 구간 수
+ENSEMBLE_STATS_CENTROIDS = 32                      # 구간/필드마다 유지하는 분위수 중심점 수
+ENSEMBLE_STATS_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)   # 기본 출력 분위 (팬 차트 띠)
+ENSEMBLE_STATS_BUFFER = 1 << 16                    # 이만큼의 관측이 모이면 한 번에 병합 (고정 크기, 멤버 수와 무관)
+
+# 기록 필드 → DaisyworldEnsemble 속성 (add_ensemble에서 사용)
+ENSEMBLE_FIELD_ATTRIBUTES = {
+    'temperature': 'temperature_planet',
+    'atmosphere_temp': 'temperature_atmosphere',
+    'ocean_temp': 'temperature_ocean',
+    'land_temp': 'temperature_land',
+    'black_daisy': 'area_black_daisy',
+    'white_daisy': 'area_white_daisy',
+    'co2': 'co2_concentration',
+    'o2': 'o2_concentration',
+    'ch4': 'ch4_concentration',
+    'h2o': 'h2o_concentration',
+    'greenhouse_effect': 'greenhouse_effect',
+    'emissivity': 'earth_emissivity',
+}
+
+# 몬테카를로 초기 조건 범위 (균등 분포, 명령행 실행용)
+MONTE_CARLO_RANGES = {
+    'area_black_daisy': (0.001, 0.3),
+    'area_white_daisy': (0.001, 0.3),
+    'temperature': (240.0, 320.0),
+    'co2_concentration': (100.0, 700.0),
+    'ch4_concentration': (0.5, 3.0),
+    'h2o_concentration': (2000.0, 20000.0),
+}
+
+
+class StreamingEnsembleStats:
+    """
+    시간 구간별 스트리밍 통계 (recorder 구독자 형식이므로 simulator.subscribe(stats)로도 연결 가능)
+
+    구간 b는 [start_time + b * width, start_time + (b + 1) * width) 범위의 time을 모든 멤버에 대해 모음
+    범위를 벗어난 time은 무시
+    """
+
+    def __init__(self, start_time, num_steps, num_bins=ENSEMBLE_STATS_BINS, fields=HISTORY_FIELDS,
+                 centroids=ENSEMBLE_STATS_CENTROIDS, buffer_size=ENSEMBLE_STATS_BUFFER):
+        """
+        Args:
+            start_time: 첫 구간의 시작 time
+            num_steps: 전체 구간 길이 (스텝)
+            num_bins: 시간 구간 수
+            fields: 누적할 필드 목록 (HISTORY_FIELDS 중에서)
+            centroids: 구간/필드마다 유지하는 분위수 중심점 수
+            buffer_size: 병합 전에 모아 두는 최대 관측 수
+        """
+        if num_bins < 1 or num_steps < num_bins:
+            raise ValueError("num_bins는 1 이상, num_steps 이하여야 합니다")
+        self.fields = tuple(fields)
+        self.start_time = start_time
+        self.num_steps = num_steps
+        self.num_bins = num_bins
+        self.centroids = centroids
+        self.bin_width = num_steps / num_bins
+
+        shape = (len(self.fields), num_bins)
+        self._count = np.zeros(num_bins, dtype=np.int64)   # 구간별 관측 수 (모든 필드 공통)
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)                         # 편차 제곱합 (Welford/Chan)
+        self._min = np.full(shape, np.inf)
+        self._max = np.full(shape, -np.inf)
+        self._centroid_mean = np.zeros(shape + (centroids,))
+        self._centroid_weight = np.zeros(shape + (centroids,))
+        self.buffer_size = buffer_size
+        self._buffer = []                                  # 병합 전 (times, values) 묶음
+        self._buffered = 0
+
+    @property
+    def count(self):
+        """구간별 관측 수"""
+        self.flush()
+        return self._count
+
+    @property
+    def mean(self):
+        """구간별 평균 ((필드 수, 구간 수))"""
+        self.flush()
+        return self._mean
+
+    @property
+    def min(self):
+        """구간별 최솟값 ((필드 수, 구간 수))"""
+        self.flush()
+        return self._min
+
+    @property
+    def max(self):
+        """구간별 최댓값 ((필드 수, 구간 수))"""
+        self.flush()
+        return self._max
+
+    @property
+    def time(self):
+        """구간 중앙의 time"""
+        return self.start_time + (np.arange(self.num_bins) + 0.5) * self.bin_width
+
+    def add(self, times, values):
+        """
+        관측 추가 (buffer_size만큼 모이면 병합)
+
+        Args:
+            times: (n,) time 배열 (여러 멤버의 같은 time이 섞여 있어도 됨)
+            values: (len(fields), n) 값 배열
+        """
+        times = np.asarray(times, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64).reshape(len(self.fields), -1)
+        self._buffer.append((times, values))
+        self._buffered += len(times)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """모아 둔 관측을 통계에 병합 (결과 조회 전에 자동으로 호출됨)"""
+        if not self._buffer:
+            return
+        times = np.concatenate([times for times, _ in self._buffer])
+        values = np.concatenate([values for _, values in self._buffer], axis=1)
+        self._buffer = []
+        self._buffered = 0
+
+        bins = np.floor((times - self.start_time) / self.bin_width).astype(np.int64)
+        inside = (bins >= 0) & (bins < self.num_bins)
+        if not inside.all():
+            bins = bins[inside]
+            values = values[:, inside]
+        if len(bins) == 0:
+            return
+
+        # 이번 묶음에 들어 있는 구간만 갱신
+        touched, local = np.unique(bins, return_inverse=True)
+        batch_count = np.bincount(local, minlength=len(touched))
+        self._update_moments(touched, local, batch_count, values)
+        self._update_digest(touched, local, batch_count, values)
+        self._count[touched] += batch_count
+
+    def _update_moments(self, touched, local, batch_count, values):
+        """평균/편차 제곱합(묶음 통계를 Chan 방식으로 병합)과 최솟값/최댓값 갱신"""
+        num_touched = len(touched)
+        count = self._count[touched]
+        total = count + batch_count
+        for f in range(len(self.fields)):
+            row = values[f]
+            batch_mean = np.bincount(local, weights=row, minlength=num_touched) / batch_count
+            batch_m2 = np.bincount(local, weights=(row - batch_mean[local]) ** 2, minlength=num_touched)
+            delta = batch_mean - self._mean[f, touched]
+            self._mean[f, touched] += delta * batch_count / total
+            self._m2[f, touched] += batch_m2 + delta ** 2 * count * batch_count / total
+
+            low = np.full(num_touched, np.inf)
+            high = np.full(num_touched, -np.inf)
+            np.minimum.at(low, local, row)
+            np.maximum.at(high, local, row)
+            self._min[f, touched] = np.minimum(self._min[f, touched], low)
+            self._max[f, touched] = np.maximum(self._max[f, touched], high)
+
+    def _update_digest(self, touched, local, batch_count, values):
+        """
+        분위수 중심점 병합 (기존 중심점 + 새 관측을 값 순으로 정렬한 뒤 누적 분위를 arcsine 척도로
+        centroids개 칸에 배정하여 칸별 가중 평균으로 압축, 꼬리 쪽 칸이 더 촘촘함)
+        모든 (필드, 구간) 행을 한 번에 패딩된 2차원 배열로 처리
+        """
+        num_fields = len(self.fields)
+        num_touched = len(touched)
+        width = self.centroids + int(batch_count.max())
+
+        # 행마다 [기존 중심점 | 새 관측 | 가중치 0 패딩]
+        order = np.argsort(local, kind='stable')
+        offsets = np.concatenate(([0], np.cumsum(batch_count)[:-1]))
+        column = self.centroids + np.arange(len(local)) - offsets[local[order]]
+        merged_value = np.full((num_fields, num_touched, width), np.inf)
+        merged_weight = np.zeros((num_fields, num_touched, width))
+        merged_value[:, :, :self.centroids] = self._centroid_mean[:, touched]
+        merged_weight[:, :, :self.centroids] = self._centroid_weight[:, touched]
+        empty = merged_weight[:, :, :self.centroids] == 0
+        merged_value[:, :, :self.centroids][empty] = np.inf
+        merged_value[:, local[order], column] = values[:, order]
+        merged_weight[:, local[order], column] = 1.0
+
+        sort = np.argsort(merged_value, axis=2)
+        merged_value = np.take_along_axis(merged_value, sort, axis=2)
+        merged_weight = np.take_along_axis(merged_weight, sort, axis=2)
+        cumulative = np.cumsum(merged_weight, axis=2)
+        total = cumulative[:, :, -1:]
+        quantile = (cumulative - merged_weight / 2) / total
+        scale = np.arcsin(2 * quantile - 1) / np.pi + 0.5
+        slot = np.minimum((scale * self.centroids).astype(np.int64), self.centroids - 1)
+
+        # 칸별 가중 합 (가중치 0인 패딩은 값이 inf이므로 0을 곱하기 전에 제외)
+        weighted = np.where(merged_weight > 0, merged_value, 0.0) * merged_weight
+        flat = (np.arange(num_fields * num_touched).reshape(num_fields, num_touched, 1) * self.centroids + slot).ravel()
+        weight_sum = np.bincount(flat, weights=merged_weight.ravel(), minlength=num_fields * num_touched * self.centroids)
+        value_sum = np.bincount(flat, weights=weighted.ravel(), minlength=num_fields * num_touched * self.centroids)
+        weight_sum = weight_sum.reshape(num_fields, num_touched, self.centroids)
+        value_sum = value_sum.reshape(num_fields, num_touched, self.centroids)
+        self._centroid_weight[:, touched] = weight_sum
+        self._centroid_mean[:, touched] = np.divide(value_sum, weight_sum, out=np.zeros_like(value_sum),
+                                                    where=weight_sum > 0)
+
+    def record(self, time, values):
+        """한 스텝 추가 (구독자 형식)"""
+        self.add(np.array([time], dtype=np.float64), np.array(values, dtype=np.float64).reshape(-1, 1))
+
+    def extend(self, times, values):
+        """여러 스텝 추가 (구독자 형식)"""
+        self.add(times, values)
+
+    def add_trajectory(self, trajectory):
+        """
+        멤버 하나의 궤적 추가
+
+        Args:
+            trajectory: 필드 이름 → (n,) 배열 딕셔너리 (DaisyworldSimulator.run()의 반환값)
+        """
+        self.add(trajectory['time'], np.array([trajectory[name] for name in self.fields]))
+
+    def add_ensemble(self, ensemble):
+        """
+        DaisyworldEnsemble의 현재 상태(모든 멤버) 추가
+        step() 직후의 상태이므로 DaisyworldSimulator 기록과 같게 time = current_time - 1
+
+        Args:
+            ensemble: DaisyworldEnsemble 인스턴스
+        """
+        values = np.array([getattr(ensemble, ENSEMBLE_FIELD_ATTRIBUTES[name]) for name in self.fields])
+        times = np.full(values.shape[1], ensemble.current_time - 1, dtype=np.float64)
+        self.add(times, values)
+
+    def variance(self):
+        """구간별 표본 분산 ((필드 수, 구간 수), 관측이 2개 미만이면 nan)"""
+        self.flush()
+        count = self._count.astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 1, self._m2 / (count - 1), np.nan)
+
+    def quantiles(self, fractions=ENSEMBLE_STATS_QUANTILES):
+        """
+        구간별 근사 분위수 (중심점 누적 분위 사이 선형 보간, 양끝은 정확한 최솟값/최댓값)
+
+        Args:
+            fractions: 0~1 사이 분위 목록
+
+        Returns:
+            (필드 수, len(fractions), 구간 수) 배열 (관측이 없는 구간은 nan)
+        """
+        self.flush()
+        fractions = np.asarray(fractions, dtype=np.float64)
+        num_fields = len(self.fields)
+        result = np.full((num_fields, len(fractions), self.num_bins), np.nan)
+        for f in range(num_fields):
+            for b in np.flatnonzero(self._count):
+                weight = self._centroid_weight[f, b]
+                used = weight > 0
+                weight = weight[used]
+                cumulative = np.cumsum(weight)
+                positions = np.concatenate(([0.0], (cumulative - weight / 2) / cumulative[-1], [1.0]))
+                points = np.concatenate(([self._min[f, b]], self._centroid_mean[f, b][used], [self._max[f, b]]))
+                result[f, :, b] = np.interp(fractions, positions, points)
+        return result
+
+    def summary(self, fractions=ENSEMBLE_STATS_QUANTILES):
+        """
+        결과 딕셔너리 (time, count, 필드별 mean/std/min/max/quantiles)
+
+        Args:
+            fractions: 출력할 분위 목록
+        """
+        self.flush()
+        std = np.sqrt(self.variance())
+        quantiles = self.quantiles(fractions)
+        result = {'time': self.time, 'count': self._count.copy(), 'quantile_fractions': np.asarray(fractions)}
+        for f, name in enumerate(self.fields):
+            result[f'{name}_mean'] = np.where(self._count > 0, self._mean[f], np.nan)
+            result[f'{name}_std'] = std[f]
+            result[f'{name}_min'] = np.where(self._count > 0, self._min[f], np.nan)
+            result[f'{name}_max'] = np.where(self._count > 0, self._max[f], np.nan)
+            result[f'{name}_quantiles'] = quantiles[f]
+        return result
+
+    def save(self, path, fractions=ENSEMBLE_STATS_QUANTILES):
+        """
+        결과를 .npz 파일로 저장
+
+        Args:
+            path: 저장할 파일 경로
+            fractions: 저장할 분위 목록
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        np.savez(path, fields=np.array(self.fields), **self.summary(fractions))
+
+
+def monte_carlo_ensemble(num_members, seed=None, ranges=MONTE_CARLO_RANGES, params=None):
+    """
+    초기 데이지 면적/온도/기체 농도를 균등 분포로 뽑은 앙상블 생성
+
+    Args:
+        num_members: 멤버 수
+        seed: 난수 시드
+        ranges: 초기 조건 이름 → (최솟값, 최댓값) 딕셔너리 (DaisyworldEnsemble 인자 이름)
+        params: 물리 파라미터 덮어쓰기 딕셔너리
+
+    Returns:
+        DaisyworldEnsemble
+    """
+    rng = np.random.default_rng(seed)
+    initial = {name: rng.uniform(low, high, num_members) for name, (low, high) in ranges.items()}
+    return DaisyworldEnsemble(num_members, params=params, **initial)
+
+
+def main():
+    """몬테카를로 앙상블 통계 실행 진입점 (결과 .npz와 팬 차트 저장)"""
+    parser = argparse.ArgumentParser(description='Run a Monte Carlo Daisyworld ensemble with streaming statistics.')
+    parser.add_argument('--members', type=int, default=1000, help='number of ensemble members')
+    parser.add_argument('--steps', type=int, default=20000, help='steps to run')
+    parser.add_argument('--bins', type=int, default=ENSEMBLE_STATS_BINS, help='number of time bins')
+    parser.add_argument('--seed', type=int, default=None, help='seed for the random initial conditions')
+    parser.add_argument('--output-dir', default='results', help='directory for the statistics and fan chart')
+    args = parser.parse_args()
+
+    # 시각화 모듈은 명령행 실행에서만 필요
+    from visualizer_matplotlib import save_graphs
+
+    ensemble = monte_carlo_ensemble(args.members, args.seed)
+    stats = StreamingEnsembleStats(ensemble.current_time, args.steps, args.bins)
+    start = time.perf_counter()
+    ensemble.run(args.steps, stats=stats)
+    elapsed = time.perf_counter() - start
+    print(f"{args.members} members x {args.steps} steps in {elapsed:.1f} s "
+          f"({args.members * args.steps / elapsed:,.0f} member-steps/s)")
+
+    path = os.path.join(args.output_dir, 'ensemble_stats.npz')
+    stats.save(path)
+    print(f"Statistics saved: {path}")
+    save_graphs(None, args.output_dir, ensemble_stats=stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+평형 고속 진행 모듈
+최근 낮/밤 주기들의 변화가 허용 오차 이하로 수렴하면 주기 단위 고정점(한 주기 뒤 같은 상태로 돌아오는 상태)을
+뉴턴법으로 직접 풀어 여러 주기를 한 번에 건너뛰고, 천문학적 강제력의 변화가 한계를 넘으면 정확한 스텝 진행으로 돌아감
+"""
+import numpy as np
+from simulator import DaisyworldSimulator, STATE_FLOAT_FIELDS
+from history import SimulationHistory
+
+
+# 수렴 판정
+EQUILIBRIUM_TOLERANCE = 1e-2            # 연속한 두 주기의 평균값 상대 변화 허용 오차 (온도, 데이지 면적)
+EQUILIBRIUM_STABLE_CYCLES = 3           # 건너뛰기 전에 연속으로 수렴해야 하는 주기 수
+EQUILIBRIUM_SCALE_FLOOR = 1e-3          # 상대 오차 계산 시 분모의 최솟값 (0에 가까운 면적용)
+
+# 건너뛰기
+EQUILIBRIUM_MAX_DRIFT = 2e-2            # 건너뛸 구간에서 허용하는 주기 평균 강제력의 상대 변화
+EQUILIBRIUM_MAX_JUMP_CYCLES = 499       # 한 번에 건너뛰는 최대 주기 수 (밀란코비치 주기의 배수가 되지 않도록 소수)
+EQUILIBRIUM_MAX_COOLDOWN = 64           # 고정점 계산 실패 후 다시 시도하기까지의 최대 대기 주기 수
+
+# 뉴턴법
+EQUILIBRIUM_NEWTON_TOLERANCE = 1e-8     # 고정점 잔차 허용 오차 (값 규모 대비)
+EQUILIBRIUM_NEWTON_MAX_ITERATIONS = 8   # 최대 반복 횟수
+EQUILIBRIUM_JACOBIAN_STEP = 1e-6        # 유한 차분 야코비안의 상대 섭동 크기
+
+# 고정점으로 푸는 상태 변수 (temperature_planet은 지형별 온도에서 유도)
+# O2는 다른 변수에 영향을 주지 않는 순수 적분 변수이므로 고정점 대신 주기당 변화량으로 선형 외삽
+EQUILIBRIUM_FIELDS = (
+    'area_black_daisy',
+    'area_white_daisy',
+    'temperature_atmosphere',
+    'temperature_ocean',
+    'temperature_land',
+    'co2_concentration',
+    'ch4_concentration',
+    'h2o_concentration',
+)
+# 수렴 판정에 사용하는 기록 필드
+CONVERGENCE_FIELDS = ('temperature', 'black_daisy', 'white_daisy')
+
+
+def cycle_forcing_means(start_time, num_cycles, day_night_timer, intensity_profile, params):
+    """
+    주기별 평균 강제력 계수 (태양 강도 × 거리 계수 × 계절 계수) 계산
+    태양 강도는 수렴한 주기의 값(intensity_profile)이 반복된다고 보고, 나머지는 시간으로부터 직접 계산
+
+    Args:
+        start_time: 첫 주기의 첫 스텝 시각
+        num_cycles: 계산할 주기 수
+        day_night_timer: 첫 주기 시작 시점의 낮/밤 타이머
+        intensity_profile: 한 주기 동안의 스텝별 태양 강도
+        params: 파라미터 딕셔너리
+
+    Returns:
+        (num_cycles,) 배열
+    """
+    p = params
+    cycle_steps = len(intensity_profile)
+    offsets = np.arange(num_cycles * cycle_steps, dtype=np.int64)
+    time = start_time + offsets
+    timer = (day_night_timer + 1 + offsets) % p['DAY_NIGHT_CYCLE_DURATION']
+
+    eccentricity = p['ECCENTRICITY_MIN'] + (p['ECCENTRICITY_MAX'] - p['ECCENTRICITY_MIN']) * \
+                   (0.5 + 0.5 * np.sin((2 * np.pi * time) / p['ECCENTRICITY_CYCLE']))
+    obliquity = p['OBLIQUITY_MIN'] + (p['OBLIQUITY_MAX'] - p['OBLIQUITY_MIN']) * \
+                (0.5 + 0.5 * np.sin((2 * np.pi * time) / p['OBLIQUITY_CYCLE']))
+    precession_angle = ((2 * np.pi * time) / p['PRECESSION_CYCLE']) * (180 / np.pi)
+
+    cycle_position = timer / p['DAY_NIGHT_CYCLE_DURATION']
+    orbital_angle_rad = (precession_angle + cycle_position * 360) * (np.pi / 180)
+    distance = (1 - eccentricity ** 2) / (1 + eccentricity * np.cos(orbital_angle_rad))
+    seasonal_factor = 1.0 + 0.2 * np.sin(obliquity * (np.pi / 180)) * np.cos(cycle_position * 2 * np.pi)
+
+    forcing = np.tile(intensity_profile, num_cycles) * seasonal_factor / distance ** 2
+    return forcing.reshape(num_cycles, cycle_steps).mean(axis=1)
+
+
+class EquilibriumStepper:
+    """
+    평형 고속 진행기
+
+    - 정확한 진행: 낮/밤 한 주기(낮 + 밤)씩 simulator.run()으로 진행하고 주기 평균의 변화를 확인
+    - 수렴 판정: 온도와 데이지 면적의 주기 평균 변화가 EQUILIBRIUM_STABLE_CYCLES 주기 연속으로 허용 오차 이하
+    - 건너뛰기: 주기 평균 강제력이 max_drift 이내로 유지되는 구간만큼 건너뛴 뒤,
+      도착 시점의 주기 사상 P(x) (한 주기 진행 결과)의 고정점 P(x) = x 를 뉴턴법으로 풀어 상태로 사용
+      (낮/밤 타이머와 태양 강도는 주기마다 반복되므로 그대로 유지, O2는 주기당 변화량으로 외삽)
+    - 도착 시점의 고정점 주기는 정확히 계산한 궤적이므로 기록에 남기고, 이후 다시 정확한 진행으로 수렴을 확인
+    - 건너뛴 구간은 기록되지 않음 (기록 시간 축에 빈 구간이 생김)
+    """
+
+    def __init__(self, simulator, tolerance=EQUILIBRIUM_TOLERANCE, max_drift=EQUILIBRIUM_MAX_DRIFT,
+                 max_jump_cycles=EQUILIBRIUM_MAX_JUMP_CYCLES, record=True):
+        """
+        Args:
+            simulator: DaisyworldSimulator 인스턴스
+            tolerance: 수렴 판정 허용 오차
+            max_drift: 건너뛰기를 허용하는 주기 평균 강제력의 최대 상대 변화
+            max_jump_cycles: 한 번에 건너뛰는 최대 주기 수
+            record: True면 정확히 계산한 주기를 history와 궤적 파일에 기록
+        """
+        self.simulator = simulator
+        self.tolerance = tolerance
+        self.max_drift = max_drift
+        self.max_jump_cycles = max_jump_cycles
+        self.record = record
+        self.cycle_steps = 2 * simulator.params['DAY_NIGHT_CYCLE_DURATION']
+
+        # 통계
+        self.exact_steps = 0
+        self.skipped_steps = 0
+        self.jumps = 0
+        self.failed_jumps = 0
+
+        # 주기 사상 계산용 시뮬레이터 (기록/데이지 없음)
+        self._scratch = DaisyworldSimulator(
+            history=SimulationHistory(capacity=1, index=False), params=simulator.params, num_daisies=0)
+        self._jacobian = None           # 마지막으로 계산한 P(x) - x 의 야코비안 (다음 건너뛰기에 재사용)
+        self._previous_means = None     # 직전 주기의 평균값
+        self._last_trajectory = None    # 직전 주기의 궤적
+        self._o2_change = 0.0           # 직전 주기의 O2 변화량
+        self._stable_cycles = 0
+        self._cooldown = 0
+        self._failures = 0
+
+    def advance(self, num_steps):
+        """
+        num_steps 스텝만큼 시뮬레이션 시각을 진행 (가능하면 평형 구간을 건너뜀)
+
+        Args:
+            num_steps: 진행할 스텝 수
+        """
+        cycle = self.cycle_steps
+        remaining = num_steps
+        while remaining >= cycle:
+            # 건너뛴 뒤에도 도착 주기를 정확히 계산할 수 있도록 한 주기를 남김
+            if self._stable_cycles >= EQUILIBRIUM_STABLE_CYCLES and self._cooldown == 0:
+                jump = self._drift_limited_cycles(min(self.max_jump_cycles, remaining // cycle - 1))
+                if jump > 0:
+                    if self._jump(jump):
+                        remaining -= (jump + 1) * cycle
+                        continue
+                    # 실패하면 점점 더 긴 간격을 두고 다시 시도
+                    self.failed_jumps += 1
+                    self._failures += 1
+                    self._cooldown = min(2 ** self._failures, EQUILIBRIUM_MAX_COOLDOWN)
+                    self._stable_cycles = 0
+            # 수렴에 필요한 주기 수만큼 한 번의 run()으로 진행 (주기마다 호출하는 오버헤드 감소)
+            num_cycles = min(max(EQUILIBRIUM_STABLE_CYCLES - self._stable_cycles, self._cooldown, 1),
+                             remaining // cycle)
+            self._exact_cycles(num_cycles)
+            remaining -= num_cycles * cycle
+        if remaining:
+            self.simulator.run(remaining, record=self.record)
+            self.exact_steps += remaining
+            self._previous_means = None
+            self._stable_cycles = 0
+
+    def _exact_cycles(self, num_cycles):
+        """num_cycles 주기를 정확히 진행하고 주기별로 수렴 여부 갱신"""
+        simulator = self.simulator
+        cycle = self.cycle_steps
+        o2 = simulator.o2_concentration
+        trajectory = simulator.run(num_cycles * cycle, record=self.record)
+        self.exact_steps += num_cycles * cycle
+        self._cooldown = max(self._cooldown - num_cycles, 0)
+
+        # 마지막 주기의 O2 변화량
+        o2_values = trajectory['o2']
+        start_o2 = o2_values[-cycle - 1] if num_cycles > 1 else o2
+        self._o2_change = simulator.o2_concentration - start_o2
+
+        means = np.column_stack([
+            trajectory[name].reshape(num_cycles, cycle).mean(axis=1) for name in CONVERGENCE_FIELDS
+        ])
+        for cycle_means in means:
+            self._update_convergence(cycle_means)
+        self._last_trajectory = {name: values[-cycle:] for name, values in trajectory.items()}
+
+    def _update_convergence(self, means):
+        """주기 평균을 직전 주기와 비교하여 연속 수렴 주기 수 갱신"""
+        if self._previous_means is not None:
+            change = np.abs(means - self._previous_means) / np.maximum(np.abs(means), EQUILIBRIUM_SCALE_FLOOR)
+            self._stable_cycles = self._stable_cycles + 1 if change.max() <= self.tolerance else 0
+        self._previous_means = means
+
+    def _drift_limited_cycles(self, max_cycles):
+        """
+        주기 평균 강제력이 직전 주기 대비 max_drift 이내로 유지되는 동안 건너뛸 수 있는 주기 수
+        (도착 주기까지 모든 주기가 한계 이내여야 함, 0이면 정확한 진행을 계속)
+        """
+        if max_cycles < 1:
+            return 0
+        simulator = self.simulator
+        cycle = self.cycle_steps
+        # 0번은 직전 주기(기준), 1 ~ max_cycles + 1번은 건너뛸 주기와 도착 주기
+        means = cycle_forcing_means(
+            simulator.current_time - cycle, max_cycles + 2, simulator.day_night_timer,
+            self._last_trajectory['solar_intensity'], simulator.params)
+        drift = np.abs(means[1:] - means[0]) / means[0]
+        exceeded = np.flatnonzero(drift > self.max_drift)
+        within = len(drift) if len(exceeded) == 0 else exceeded[0]
+        return min(within - 1, max_cycles) if within > 1 else 0
+
+    def _jump(self, num_cycles):
+        """
+        num_cycles 주기를 건너뛰고 도착 주기의 고정점을 풀어 상태로 설정
+
+        Returns:
+            성공 여부 (실패하면 상태를 바꾸지 않음)
+        """
+        simulator = self.simulator
+        cycle = self.cycle_steps
+        start_time = simulator.current_time + num_cycles * cycle
+        x0 = np.array([getattr(simulator, name) for name in EQUILIBRIUM_FIELDS])
+
+        # O2는 직전 주기의 변화량으로 선형 외삽
+        o2 = min(max(simulator.o2_concentration + num_cycles * self._o2_change, 100000.0), 300000.0)
+
+        trajectory = self._solve_fixed_point(x0, start_time, o2)
+        if trajectory is None:
+            return False
+
+        # 고정점에서 한 주기를 정확히 진행한 결과를 시뮬레이터 상태로 복사하고 기록
+        scratch = self._scratch
+        self._o2_change = scratch.o2_concentration - o2
+        for name in STATE_FLOAT_FIELDS:
+            setattr(simulator, name, getattr(scratch, name))
+        simulator.current_time = scratch.current_time
+        simulator.day_night_timer = scratch.day_night_timer
+        simulator.is_daytime = scratch.is_daytime
+        if self.record:
+            simulator.dispatch(trajectory)
+
+        self.skipped_steps += num_cycles * cycle
+        self.exact_steps += cycle
+        self.jumps += 1
+        self._failures = 0
+        # 도착 주기 다음의 정확한 한 주기가 수렴을 확인하면 다시 건너뛸 수 있음
+        self._previous_means = None
+        self._update_convergence(np.array([trajectory[name].mean() for name in CONVERGENCE_FIELDS]))
+        self._last_trajectory = trajectory
+        self._stable_cycles = EQUILIBRIUM_STABLE_CYCLES - 1
+        return True
+
+    def _cycle_map(self, x, start_time, o2):
+        """
+        주기 사상 P(x): start_time에 상태 x에서 출발하여 한 주기를 정확히 진행한 뒤의 상태
+
+        Returns:
+            (한 주기 뒤 상태 배열, 궤적 딕셔너리)
+        """
+        simulator = self.simulator
+        scratch = self._scratch
+        p = scratch.params
+        for name, value in zip(EQUILIBRIUM_FIELDS, x.tolist()):
+            setattr(scratch, name, value)
+        scratch.temperature_planet = (
+            scratch.temperature_atmosphere * 0.3 +
+            scratch.temperature_ocean * p['OCEAN_RATIO'] * 0.7 +
+            scratch.temperature_land * p['LAND_RATIO'] * 0.7
+        )
+        scratch.o2_concentration = o2
+        scratch.solar_luminosity = simulator.solar_luminosity
+        scratch.current_time = start_time
+        scratch.day_night_timer = simulator.day_night_timer
+        scratch.is_daytime = simulator.is_daytime
+        scratch.solar_intensity = simulator.solar_intensity
+        trajectory = scratch.run(self.cycle_steps, record=False)
+        return np.array([getattr(scratch, name) for name in EQUILIBRIUM_FIELDS]), trajectory
+
+    def _solve_fixed_point(self, x0, start_time, o2):
+        """
+        뉴턴법으로 P(x) = x 풀기
+        직전 건너뛰기의 야코비안을 먼저 재사용하고, 수렴하지 않으면 새로 계산하여 한 번 더 시도
+
+        Returns:
+            고정점에서 출발한 주기의 궤적 (scratch 시뮬레이터는 그 주기가 끝난 상태), 실패하면 None
+        """
+        scale = np.maximum(np.abs(x0), EQUILIBRIUM_SCALE_FLOOR)
+        attempts = (self._jacobian, None) if self._jacobian is not None else (None,)
+        for jacobian in attempts:
+            x = x0.copy()
+            for _ in range(EQUILIBRIUM_NEWTON_MAX_ITERATIONS):
+                mapped, trajectory = self._cycle_map(x, start_time, o2)
+                residual = mapped - x
+                if not np.all(np.isfinite(residual)):
+                    break
+                if np.all(np.abs(residual) <= EQUILIBRIUM_NEWTON_TOLERANCE * scale):
+                    return trajectory
+                if jacobian is None:
+                    jacobian = self._finite_difference_jacobian(x, mapped, start_time, o2, scale)
+                    self._jacobian = jacobian
+                x = x + np.linalg.lstsq(jacobian, -residual, rcond=None)[0]
+                x[:2] = np.clip(x[:2], 0.0, 1.0)
+        return None
+
+    def _finite_difference_jacobian(self, x, mapped, start_time, o2, scale):
+        """P(x) - x 의 야코비안을 전진 차분으로 계산 (변수마다 주기 사상 한 번)"""
+        jacobian = np.empty((len(x), len(x)))
+        for i in range(len(x)):
+            step = EQUILIBRIUM_JACOBIAN_STEP * scale[i]
+            perturbed = x.copy()
+            perturbed[i] += step
+            jacobian[:, i] = (self._cycle_map(perturbed, start_time, o2)[0] - mapped) / step
+            jacobian[i, i] -= 1.0
+        return jacobian
@@ -0,0 +1,200 @@
+"""
+Daisyworld 헤드리스(화면 없는) 실행 모듈
+pygame/matplotlib 없이 CPU가 허용하는 최대 속도로 시뮬레이션을 진행
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+import numpy as np
+from simulator import DaisyworldSimulator, simulation_constants, HISTORY_DTYPE, HISTORY_STRIDE, HISTORY_INDEX
+from history import add_history_arguments, history_from_args
+from trajectory import TrajectoryWriter
+from checkpoint import BackgroundCheckpointer, load_checkpoint, DEFAULT_CHECKPOINT_INTERVAL
+from equilibrium import EquilibriumStepper
+from profiling import PROFILE_LOG_INTERVAL
+from telemetry import TelemetryServer, TELEMETRY_PORT, parse_address
+
+
+# 헤드리스 실행 설정
+TIME_CHECK_INTERVAL = 1000         # 시간 예산/진행 상황 확인 주기 (스텝 단위)
+DEFAULT_PROGRESS_INTERVAL = 5.0    # 기본 진행 상황 출력 주기 (초)
+EQUILIBRIUM_CHECK_INTERVAL = 100000  # 평형 고속 진행 모드의 시간 확인 주기 (스텝 단위, 건너뛰기 포함)
+HEADLESS_HISTORY_CAPACITY = 1000000  # 헤드리스 기본 기록 용량 (기본은 링 버퍼로 최근 100만 샘플만 유지, 약 250 MB)
+
+
+def _print_progress(simulator, steps_done, elapsed):
+    """진행 상황 한 줄 출력"""
+    rate = steps_done / elapsed if elapsed > 0 else 0.0
+    print(f"[step {simulator.current_time}] {rate:,.0f} steps/s | "
+          f"T={simulator.temperature_planet:.2f} K | "
+          f"black={simulator.area_black_daisy:.4f} white={simulator.area_white_daisy:.4f}",
+          flush=True)
+
+
+def run_headless(simulator, num_steps=None, time_budget=None, progress_interval=None, checkpointer=None,
+                 equilibrium=None):
+    """
+    화면 없이 시뮬레이션을 최대 속도로 실행
+
+    Args:
+        simulator: DaisyworldSimulator 인스턴스
+        num_steps: 실행할 스텝 수 (None = 제한 없음)
+        time_budget: 실행 시간 예산 (초, None = 제한 없음)
+        progress_interval: 진행 상황 출력 주기 (초, None = 출력 안 함)
+        checkpointer: BackgroundCheckpointer (None = 체크포인트 없음)
+        equilibrium: EquilibriumStepper (주어지면 평형 구간을 건너뛰며 진행)
+
+    Returns:
+        실제로 실행한 스텝 수
+    """
+    if num_steps is None and time_budget is None:
+        raise ValueError("num_steps 또는 time_budget 중 하나는 지정해야 합니다")
+
+    start = time.perf_counter()
+    next_progress = start + progress_interval if progress_interval else None
+    steps_done = 0
+
+    try:
+        while num_steps is None or steps_done < num_steps:
+            # 일정 스텝씩 묶어서 실행하고 시간은 묶음마다 한 번만 확인
+            batch = TIME_CHECK_INTERVAL if equilibrium is None else EQUILIBRIUM_CHECK_INTERVAL
+            if num_steps is not None:
+                batch = min(batch, num_steps - steps_done)
+            if equilibrium is None:
+                simulator.run(batch)
+            else:
+                equilibrium.advance(batch)
+            steps_done += batch
+            if checkpointer is not None:
+                checkpointer.maybe_checkpoint()
+
+            now = time.perf_counter()
+            if next_progress is not None and now >= next_progress:
+                _print_progress(simulator, steps_done, now - start)
+                next_progress = now + progress_interval
+            if time_budget is not None and now - start >= time_budget:
+                break
+    except KeyboardInterrupt:
+        print("\nInterrupted - stopping simulation.")
+
+    if progress_interval:
+        _print_progress(simulator, steps_done, time.perf_counter() - start)
+    return steps_done
+
+
+def export_history(simulator, output_dir='results'):
+    """
+    기록된 시뮬레이션 데이터를 .npz 파일로 저장
+
+    Args:
+        simulator: DaisyworldSimulator 인스턴스
+        output_dir: 저장할 디렉토리 경로
+
+    Returns:
+        저장된 파일 경로
+    """
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = os.path.join(output_dir, f'daisyworld_history_{timestamp}.npz')
+    np.savez(filename, **simulator.history.views())
+
+    print(f"\n{'='*60}")
+    print(f"History saved: {filename}")
+    print(f"Total simulation steps: {simulator.current_time}")
+    print(f"Final temperature: {simulator.temperature_planet:.2f} K")
+    print(f"Final black daisy area: {simulator.area_black_daisy:.4f}")
+    print(f"Final white daisy area: {simulator.area_white_daisy:.4f}")
+    print(f"{'='*60}\n")
+
+    return filename
+
+
+def main():
+    """헤드리스 실행 진입점"""
+    parser = argparse.ArgumentParser(description='Run the Daisyworld simulation without a display.')
+    parser.add_argument('--steps', type=int, default=None, help='number of steps to run')
+    parser.add_argument('--time-budget', type=float, default=None, help='wall-clock budget in seconds')
+    parser.add_argument('--progress', type=float, nargs='?', const=DEFAULT_PROGRESS_INTERVAL,
+                        default=None, help='print progress every N seconds')
+    parser.add_argument('--output-dir', default='results', help='directory for the exported history')
+    parser.add_argument('--trajectory', default=None, help='stream the full trajectory to this file while running')
+    parser.add_argument('--checkpoint', default=None, help='write periodic checkpoints to this file')
+    parser.add_argument('--checkpoint-interval', type=int, default=DEFAULT_CHECKPOINT_INTERVAL,
+                        help='steps between checkpoints')
+    parser.add_argument('--resume', default=None, help='resume from this checkpoint file')
+    parser.add_argument('--no-export', action='store_true', help='do not export the history at the end')
+    parser.add_argument('--no-history', action='store_true',
+                        help='do not record the in-memory history (implies --no-export)')
+    add_history_arguments(parser, HEADLESS_HISTORY_CAPACITY, True, HISTORY_STRIDE)
+    parser.add_argument('--fast-equilibrium', action='store_true',
+                        help='skip ahead over converged day/night cycles by solving the per-cycle fixed point')
+    parser.add_argument('--profile', type=float, nargs='?', const=PROFILE_LOG_INTERVAL, default=None,
+                        help='time each simulation phase and print a profile line every N seconds')
+    parser.add_argument('--telemetry', nargs='?', const=f'127.0.0.1:{TELEMETRY_PORT}', default=None,
+                        help='publish per-step state on this host:port or Unix socket path')
+    args = parser.parse_args()
+
+    if args.steps is None and args.time_budget is None:
+        parser.error('at least one of --steps or --time-budget is required')
+
+    history = history_from_args(parser, args, dtype=HISTORY_DTYPE, index=HISTORY_INDEX)
+
+    if args.resume:
+        # 체크포인트에 궤적 파일이 연결되어 있으면 그 파일에 이어서 기록
+        simulator = load_checkpoint(args.resume, history=history)
+        print(f"Resumed from {args.resume} at step {simulator.current_time}.")
+    else:
+        simulator = DaisyworldSimulator(history=history)
+    if args.trajectory and simulator.trajectory_writer is None:
+        simulator.trajectory_writer = TrajectoryWriter(
+            args.trajectory, constants=simulation_constants(simulator.params))
+
+    if args.no_history:
+        # 기록 저장소 구독을 해제하면 step()/run()이 기록 작업을 하지 않음 (궤적 파일은 그대로 기록)
+        simulator.unsubscribe(simulator.history)
+    if args.profile is not None:
+        simulator.enable_profiling(log_interval=args.profile)
+    telemetry = None
+    if args.telemetry:
+        telemetry = TelemetryServer(parse_address(args.telemetry)).attach(simulator)
+        print(f"Telemetry listening on {telemetry.address}.")
+    equilibrium = EquilibriumStepper(simulator) if args.fast_equilibrium else None
+    checkpointer = None
+    if args.checkpoint:
+        checkpointer = BackgroundCheckpointer(simulator, args.checkpoint, args.checkpoint_interval)
+    try:
+        steps_done = run_headless(
+            simulator,
+            num_steps=args.steps,
+            time_budget=args.time_budget,
+            progress_interval=args.progress,
+            checkpointer=checkpointer,
+            equilibrium=equilibrium,
+        )
+        if checkpointer is not None:
+            checkpointer.checkpoint()
+    finally:
+        if checkpointer is not None:
+            checkpointer.close()
+        if telemetry is not None:
+            telemetry.close()
+        if simulator.trajectory_writer is not None:
+            simulator.trajectory_writer.close()
+    print(f"Ran {steps_done} steps.")
+    if equilibrium is not None:
+        print(f"Skipped {equilibrium.skipped_steps} steps in {equilibrium.jumps} jumps "
+              f"({equilibrium.exact_steps} steps computed exactly).")
+    if simulator.profiler is not None:
+        print(simulator.profiler.format_line())
+    if simulator.trajectory_writer is not None:
+        print(f"Trajectory saved: {simulator.trajectory_writer.path}")
+
+    if not (args.no_export or args.no_history):
+        export_history(simulator, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
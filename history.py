@@ -0,0 +1,377 @@
+"""
+시뮬레이션 기록 저장 모듈
+미리 할당된 연속 NumPy 배열에 스텝별 데이터를 기록
+"""
+import argparse
+import numpy as np
+from history_index import HistoryIndex
+
+
+# 기록 필드 (시간 제외, 모두 같은 dtype의 2차원 배열 한 행씩 차지)
+HISTORY_FIELDS = (
+    'temperature',
+    'atmosphere_temp',
+    'ocean_temp',
+    'land_temp',
+    'black_daisy',
+    'white_daisy',
+    'co2',
+    'o2',
+    'ch4',
+    'h2o',
+    'greenhouse_effect',
+    'emissivity',
+)
+
+
+class SimulationHistory:
+    """
+    미리 할당된 배열 기반 기록 저장소
+
+    - 일반 모드: capacity만큼 미리 할당하고, 가득 차면 용량을 두 배로 늘림
+    - 링 버퍼 모드: 최근 capacity 스텝만 유지 (메모리 고정)
+      각 샘플을 두 위치(i, i + capacity)에 기록하여 항상 연속된 뷰를 복사 없이 반환
+    - stride: k번째 스텝마다 한 번만 기록
+    - dtype: float64 또는 float32 (시간은 항상 int64)
+    - index: 최소/최대/평균 피라미드 인덱스를 함께 구축하여 구간 조회(query)를 출력 점 수에 비례하는 비용으로 처리
+    """
+
+    def __init__(self, capacity=100000, ring=False, dtype=np.float64, stride=1, fields=HISTORY_FIELDS, index=True):
+        """
+        기록 저장소 초기화
+
+        Args:
+            capacity: 초기 용량 (링 버퍼 모드에서는 유지할 최대 샘플 수)
+            ring: 링 버퍼 모드 사용 여부
+            dtype: 값 배열의 자료형 (np.float64 또는 np.float32)
+            stride: 기록 간격 (k번째 스텝마다 기록)
+            fields: 기록할 필드 이름 목록
+            index: 다중 해상도 인덱스(HistoryIndex) 구축 여부
+        """
+        if capacity < 1:
+            raise ValueError("capacity는 1 이상이어야 합니다")
+        if stride < 1:
+            raise ValueError("stride는 1 이상이어야 합니다")
+
+        self.fields = tuple(fields)
+        self.capacity = int(capacity)
+        self.ring = ring
+        self.dtype = np.dtype(dtype)
+        self.stride = int(stride)
+
+        self._field_index = {name: i for i, name in enumerate(self.fields)}
+        # 링 버퍼는 두 배 길이로 할당 (미러 기록)
+        allocated = self.capacity * 2 if ring else self.capacity
+        self._data = np.zeros((len(self.fields), allocated), dtype=self.dtype)
+        self._time = np.zeros(allocated, dtype=np.int64)
+        self.index = HistoryIndex(len(self.fields), window=self.capacity if ring else None) if index else None
+
+        self._count = 0      # 지금까지 기록된 샘플 수
+        self._offered = 0    # record()가 호출된 횟수 (stride 판단용)
+
+    def __len__(self):
+        """현재 조회 가능한 샘플 수"""
+        return min(self._count, self.capacity) if self.ring else self._count
+
+    @property
+    def total_recorded(self):
+        """지금까지 기록된 전체 샘플 수 (링 버퍼에서 밀려난 샘플 포함)"""
+        return self._count
+
+    def _grow(self, required):
+        """일반 모드에서 용량을 두 배씩 늘림 (기존 뷰는 이전 버퍼를 계속 참조)"""
+        new_capacity = self.capacity
+        while new_capacity < required:
+            new_capacity *= 2
+        data = np.zeros((len(self.fields), new_capacity), dtype=self.dtype)
+        data[:, :self._count] = self._data[:, :self._count]
+        time = np.zeros(new_capacity, dtype=np.int64)
+        time[:self._count] = self._time[:self._count]
+        self._data = data
+        self._time = time
+        self.capacity = new_capacity
+
+    def record(self, time, values):
+        """
+        한 스텝의 데이터 기록 (stride에 해당하지 않으면 무시)
+
+        Args:
+            time: 시뮬레이션 시간 (스텝)
+            values: fields 순서의 값 튜플
+        """
+        offered = self._offered
+        self._offered = offered + 1
+        if offered % self.stride:
+            return
+
+        count = self._count
+        if self.ring:
+            slot = count % self.capacity
+            self._data[:, slot] = values
+            self._data[:, slot + self.capacity] = values
+            self._time[slot] = time
+            self._time[slot + self.capacity] = time
+        else:
+            if count >= self.capacity:
+                self._grow(count + 1)
+            self._data[:, count] = values
+            self._time[count] = time
+        if self.index is not None:
+            self.index.record(values)
+        # 데이터를 모두 쓴 뒤에 개수를 증가 (다른 스레드가 미완성 샘플을 읽지 않도록)
+        self._count = count + 1
+
+    def extend(self, times, values):
+        """
+        여러 스텝의 데이터를 한 번에 기록 (stride와 링 버퍼 규칙은 record()와 동일)
+
+        Args:
+            times: (n,) 시간 배열
+            values: (len(fields), n) 값 배열
+        """
+        times = np.asarray(times)
+        values = np.asarray(values)
+        offered = self._offered
+        self._offered = offered + len(times)
+
+        # stride에 해당하는 샘플만 선택
+        first = (-offered) % self.stride
+        if first or self.stride > 1:
+            times = times[first::self.stride]
+            values = values[:, first::self.stride]
+        added = len(times)
+        if added == 0:
+            return
+
+        if self.index is not None:
+            self.index.extend(values)
+
+        count = self._count
+        if self.ring:
+            # 링 용량보다 많으면 마지막 capacity개만 기록
+            skipped = max(added - self.capacity, 0)
+            times = times[skipped:]
+            values = values[:, skipped:]
+            slots = (count + skipped + np.arange(len(times))) % self.capacity
+            self._data[:, slots] = values
+            self._data[:, slots + self.capacity] = values
+            self._time[slots] = times
+            self._time[slots + self.capacity] = times
+        else:
+            if count + added > self.capacity:
+                self._grow(count + added)
+            self._data[:, count:count + added] = values
+            self._time[count:count + added] = times
+        self._count = count + added
+
+    def _window(self):
+        """현재 유효한 데이터 구간 [start, stop)"""
+        count = self._count
+        if self.ring and count > self.capacity:
+            start = count % self.capacity
+            return start, start + self.capacity
+        return 0, count
+
+    def view(self, name):
+        """
+        필드의 읽기 전용 뷰 반환 (복사 없음)
+
+        Args:
+            name: 필드 이름 또는 'time'
+
+        Returns:
+            1차원 NumPy 배열 뷰
+        """
+        start, stop = self._window()
+        if name == 'time':
+            array = self._time[start:stop]
+        else:
+            array = self._data[self._field_index[name], start:stop]
+        array.flags.writeable = False
+        return array
+
+    def views(self):
+        """
+        모든 필드의 뷰를 같은 길이로 한 번에 반환
+
+        Returns:
+            {'time': ..., 필드 이름: ...} 딕셔너리
+        """
+        start, stop = self._window()
+        result = {'time': self._time[start:stop]}
+        for name, index in self._field_index.items():
+            result[name] = self._data[index, start:stop]
+        for array in result.values():
+            array.flags.writeable = False
+        return result
+
+    def snapshot(self):
+        """
+        다른 스레드에서 안전하게 읽을 수 있는 불변 기록 반환
+        일반 모드의 기록 구간은 한 번 쓰이면 바뀌지 않으므로 뷰를 그대로 반환하고,
+        링 버퍼 모드는 이후 기록이 같은 메모리를 덮어쓰므로 복사본을 반환
+
+        Returns:
+            HistorySnapshot (읽기 전용 배열 딕셔너리 + 구간 조회)
+        """
+        result = self.views()
+        if self.ring:
+            result = {name: array.copy() for name, array in result.items()}
+            for array in result.values():
+                array.flags.writeable = False
+        return self._wrap(result)
+
+    def local_snapshot(self):
+        """
+        기록하는 스레드에서 바로 읽기 위한 복사 없는 기록 반환
+        링 버퍼 모드에서도 뷰를 그대로 감싸므로 비용이 기록 길이와 무관하지만,
+        다음 기록 전까지만 유효 (다른 스레드에는 snapshot()을 전달)
+
+        Returns:
+            HistorySnapshot (읽기 전용 배열 딕셔너리 + 구간 조회)
+        """
+        return self._wrap(self.views())
+
+    def _wrap(self, arrays):
+        """배열 딕셔너리와 현재 인덱스 상태로 HistorySnapshot 생성"""
+        index = self.index.freeze() if self.index is not None else None
+        return HistorySnapshot(arrays, self.fields, index, self._count)
+
+    def query(self, name, start=None, stop=None, num_points=1000):
+        """
+        시간 구간 [start, stop]을 최대 약 num_points개 점으로 집계 (HistorySnapshot.query 참고)
+        """
+        return self.local_snapshot().query(name, start, stop, num_points)
+
+
+class HistorySnapshot(dict):
+    """
+    특정 시점의 기록 ({'time': ..., 필드 이름: ...} 딕셔너리)과 인덱스 상태
+    딕셔너리처럼 필드 배열을 읽을 수 있고, query()로 임의 구간을 임의 해상도로 조회
+    """
+
+    def __init__(self, arrays, fields, index, total_recorded):
+        """
+        Args:
+            arrays: {'time': ..., 필드 이름: ...} 배열 딕셔너리
+            fields: 필드 이름 목록 (인덱스의 필드 순서)
+            index: FrozenIndex (None이면 원본에서 직접 집계)
+            total_recorded: 스냅샷 시점까지 기록된 전체 샘플 수
+        """
+        super().__init__(arrays)
+        self.fields = tuple(fields)
+        self.index = index
+        self.total_recorded = total_recorded
+
+    def query(self, name, start=None, stop=None, num_points=1000):
+        """
+        시간 구간 [start, stop]의 필드 값을 최대 약 num_points개 구간의 최솟값/최댓값/평균으로 집계
+        구간 샘플 수가 num_points 이하이면 원본 값을 그대로 반환하고,
+        그보다 많으면 구간 폭 이상인 가장 작은 인덱스 레벨의 블록을 사용 (비용은 출력 점 수에 비례)
+        인덱스 블록을 사용할 때 양 끝 점은 블록 경계에 맞춰지므로 구간 밖 샘플을 일부 포함할 수 있음
+
+        Args:
+            name: 필드 이름
+            start: 시작 시간 (None이면 처음부터)
+            stop: 끝 시간 (None이면 끝까지)
+            num_points: 출력 구간 수 (보통 그래프의 픽셀 폭)
+
+        Returns:
+            (구간 시작 시간, 최솟값, 최댓값, 평균) 배열 튜플
+        """
+        times = self['time']
+        values = self[name]
+        available = len(times)
+        first = 0 if start is None else int(np.searchsorted(times, start, side='left'))
+        last = available if stop is None else int(np.searchsorted(times, stop, side='right'))
+        count = last - first
+        if count <= 0:
+            empty = np.zeros(0)
+            return np.zeros(0, dtype=np.int64), empty, empty, empty
+        if count <= num_points:
+            segment = np.asarray(values[first:last], dtype=np.float64)
+            return times[first:last], segment, segment, segment
+
+        # 블록 하나가 (count / num_points) 샘플 이상을 덮는 가장 낮은 레벨
+        level = ((count + num_points - 1) // num_points - 1).bit_length()
+        index = self.index
+        if index is None or index.top_level is None or level < index.base_level:
+            # 인덱스 레벨보다 촘촘한 조회는 원본에서 직접 집계 (최대 2^base_level * num_points 샘플)
+            edges = (np.arange(num_points, dtype=np.int64) * count) // num_points
+            segment = np.asarray(values[first:last], dtype=np.float64)
+            sizes = np.diff(np.append(edges, count))
+            return (times[first + edges], np.minimum.reduceat(segment, edges),
+                    np.maximum.reduceat(segment, edges), np.add.reduceat(segment, edges) / sizes)
+
+        level = min(level, index.top_level)
+        field = self.fields.index(name)
+        first_sample = self.total_recorded - available     # times[0]의 절대 샘플 번호
+        sample_start = first_sample + first
+        sample_stop = first_sample + last
+
+        # 구간과 겹치는 완성된 블록
+        complete = index.levels[level][1]
+        first_block = sample_start >> level
+        stop_block = max(min((sample_stop - 1) >> level, complete - 1) + 1, first_block)
+        mins, maxs, sums = index.blocks(level, field, first_block, stop_block)
+        block_starts = np.arange(first_block, stop_block, dtype=np.int64) << level
+        block_times = times[np.clip(block_starts - first_sample, 0, available - 1)]
+        means = sums / (1 << level)
+
+        # 마지막 미완성 블록은 하위 레벨 블록과 원본 샘플로 집계한 한 점으로 추가
+        tail_start = max(stop_block << level, sample_start)
+        if tail_start < sample_stop:
+            pieces, (raw_start, raw_stop) = index.cover(field, tail_start, sample_stop)
+            raw = np.asarray(values[raw_start - first_sample:raw_stop - first_sample], dtype=np.float64)
+            tail_mins = [piece[0] for piece in pieces] + ([raw.min()] if len(raw) else [])
+            tail_maxs = [piece[1] for piece in pieces] + ([raw.max()] if len(raw) else [])
+            tail_sum = sum(piece[2] for piece in pieces) + raw.sum()
+            block_times = np.append(block_times, times[tail_start - first_sample])
+            mins = np.append(mins, min(tail_mins))
+            maxs = np.append(maxs, max(tail_maxs))
+            means = np.append(means, tail_sum / (sample_stop - tail_start))
+        return block_times, mins, maxs, means
+
+
+def add_history_arguments(parser, capacity, ring, stride=1):
+    """
+    기록 저장 방식 명령행 옵션 추가 (--history-capacity/--history-ring/--history-stride/--history-float32)
+
+    Args:
+        parser: argparse.ArgumentParser
+        capacity: --history-capacity 기본값
+        ring: --history-ring 기본값
+        stride: --history-stride 기본값
+    """
+    parser.add_argument('--history-capacity', type=int, default=capacity,
+                        help='history samples kept in memory (initial capacity with --no-history-ring)')
+    parser.add_argument('--history-ring', action=argparse.BooleanOptionalAction, default=ring,
+                        help='keep only the last --history-capacity samples, so saved graphs and exports cover '
+                             'only those (--no-history-ring keeps every sample and grows without limit)')
+    parser.add_argument('--history-stride', type=int, default=stride, help='record every k-th step')
+    parser.add_argument('--history-float32', action='store_true', help='store history values as float32')
+
+
+def history_from_args(parser, args, dtype=np.float64, index=True):
+    """
+    add_history_arguments()로 받은 옵션으로 기록 저장소 생성 (잘못된 값은 parser.error로 종료)
+
+    Args:
+        parser: 옵션을 추가한 argparse.ArgumentParser
+        args: parser.parse_args()의 결과
+        dtype: --history-float32가 없을 때의 값 자료형
+        index: 다중 해상도 인덱스 구축 여부
+
+    Returns:
+        SimulationHistory
+    """
+    try:
+        return SimulationHistory(
+            capacity=args.history_capacity,
+            ring=args.history_ring,
+            dtype=np.float32 if args.history_float32 else dtype,
+            stride=args.history_stride,
+            index=index,
+        )
+    except ValueError as error:
+        parser.error(str(error))
@@ -0,0 +1,206 @@
+"""
+기록 데이터의 다중 해상도 인덱스 모듈
+2의 거듭제곱 크기 블록마다 최솟값/최댓값/합계를 미리 집계한 피라미드를 기록과 함께 증분으로 구축하여
+임의 시간 구간을 임의 해상도로 조회하는 비용을 스텝 수가 아닌 출력 점 수에 비례하게 만듦
+"""
+import numpy as np
+
+
+INDEX_BASE_LEVEL = 4        # 가장 낮은 인덱스 레벨 (2^4 = 16 샘플 블록, 그 아래는 원본 기록에서 직접 집계)
+_AGGREGATES = 3             # 블록마다 저장하는 집계 값 (최솟값, 최댓값, 합계)
+
+
+class HistoryIndex:
+    """
+    최소/최대/평균 피라미드 인덱스
+
+    - 레벨 k의 블록 j는 샘플 [j * 2^k, (j + 1) * 2^k)의 집계 (샘플 번호는 기록 시작부터의 절대 번호)
+    - 레벨 k 블록 두 개가 완성되면 레벨 k + 1 블록 하나를 만듦
+    - 완성된 블록은 다시 쓰지 않으며, 배열 확장/정리 시에는 새 배열을 할당하므로
+      freeze()로 얻은 상태는 이후 기록과 무관하게 일관됨
+    - window를 지정하면 (링 버퍼 기록) 기록 구간에서 벗어난 블록을 주기적으로 정리
+    """
+
+    def __init__(self, num_fields, base_level=INDEX_BASE_LEVEL, window=None):
+        """
+        Args:
+            num_fields: 필드 수
+            base_level: 가장 낮은 인덱스 레벨
+            window: 유지할 최근 샘플 수 (None이면 전체 유지)
+        """
+        self.num_fields = num_fields
+        self.base_level = base_level
+        self.window = window
+        self.total = 0           # 지금까지 입력된 샘플 수
+
+        self._block_size = 1 << base_level
+        self._pending = np.zeros((num_fields, self._block_size))
+        self._pending_count = 0
+        self._levels = {}        # 레벨 → (3, num_fields, 할당 크기) 배열
+        self._counts = {}        # 레벨 → 완성된 블록 수 (절대 번호)
+        self._offsets = {}       # 레벨 → 정리되어 배열에서 빠진 블록 수
+
+    def record(self, values):
+        """
+        샘플 하나 추가
+
+        Args:
+            values: 필드 순서의 값 튜플
+        """
+        self._pending[:, self._pending_count] = values
+        self._pending_count += 1
+        self.total += 1
+        if self._pending_count == self._block_size:
+            self._pending_count = 0
+            self.extend_blocks(self._pending[:, :, None])
+
+    def extend(self, values):
+        """
+        여러 샘플을 한 번에 추가
+
+        Args:
+            values: (num_fields, n) 값 배열
+        """
+        values = np.asarray(values, dtype=np.float64)
+        total = values.shape[1]
+        offset = 0
+
+        # 대기 중인 블록부터 채움
+        if self._pending_count:
+            count = min(self._block_size - self._pending_count, total)
+            self._pending[:, self._pending_count:self._pending_count + count] = values[:, :count]
+            self._pending_count += count
+            self.total += count
+            offset = count
+            if self._pending_count == self._block_size:
+                self._pending_count = 0
+                self.extend_blocks(self._pending[:, :, None])
+
+        # 완성된 블록은 한 번에 집계
+        num_blocks = (total - offset) // self._block_size
+        if num_blocks:
+            end = offset + num_blocks * self._block_size
+            blocks = values[:, offset:end].reshape(self.num_fields, num_blocks, self._block_size)
+            self.total += end - offset
+            offset = end
+            self.extend_blocks(blocks.transpose(0, 2, 1))
+
+        # 남은 샘플은 대기
+        rest = total - offset
+        if rest:
+            self._pending[:, :rest] = values[:, offset:]
+            self._pending_count = rest
+            self.total += rest
+
+    def extend_blocks(self, blocks):
+        """(num_fields, block_size, n) 형태의 완성된 기본 블록들을 집계하여 추가"""
+        self._add_blocks(self.base_level, np.stack([blocks.min(axis=1), blocks.max(axis=1), blocks.sum(axis=1)]))
+
+    def _add_blocks(self, level, aggregates):
+        """레벨에 블록들을 추가하고, 완성된 상위 블록을 재귀적으로 만듦"""
+        num_blocks = aggregates.shape[2]
+        if level not in self._levels:
+            self._levels[level] = np.zeros((_AGGREGATES, self.num_fields, max(num_blocks, 64)))
+            self._counts[level] = 0
+            self._offsets[level] = 0
+
+        data = self._levels[level]
+        count = self._counts[level]
+        offset = self._offsets[level]
+        stored = count - offset
+        if stored + num_blocks > data.shape[2]:
+            data = self._reallocate(level, stored + num_blocks)
+            offset = self._offsets[level]
+            stored = count - offset
+        data[:, :, stored:stored + num_blocks] = aggregates
+        self._counts[level] = count + num_blocks
+
+        # 새로 짝이 완성된 블록으로 상위 레벨 블록 생성
+        parent_count = self._counts.get(level + 1, 0)
+        new_parent_count = self._counts[level] // 2
+        if new_parent_count > parent_count:
+            first = 2 * parent_count - offset
+            last = 2 * new_parent_count - offset
+            left = data[:, :, first:last:2]
+            right = data[:, :, first + 1:last:2]
+            self._add_blocks(level + 1, np.stack([
+                np.minimum(left[0], right[0]),
+                np.maximum(left[1], right[1]),
+                left[2] + right[2],
+            ]))
+
+    def _reallocate(self, level, required):
+        """레벨 배열을 새로 할당 (기록 구간에서 벗어난 블록은 버리고, 부족하면 두 배로 확장)"""
+        data = self._levels[level]
+        count = self._counts[level]
+        offset = self._offsets[level]
+        if self.window is not None:
+            # 기록 구간과 겹치는 블록과 아직 상위 블록에 합쳐지지 않은 블록은 유지
+            first_needed = min(max(self.total - self.window, 0) >> level,
+                               2 * self._counts.get(level + 1, 0))
+            dropped = max(first_needed - offset, 0)
+            offset += dropped
+            required -= dropped
+        capacity = data.shape[2]
+        while capacity < required:
+            capacity *= 2
+        new_data = np.zeros((_AGGREGATES, self.num_fields, capacity))
+        old_offset = self._offsets[level]
+        new_data[:, :, :count - offset] = data[:, :, offset - old_offset:count - old_offset]
+        self._levels[level] = new_data
+        self._offsets[level] = offset
+        return new_data
+
+    def freeze(self):
+        """
+        현재까지 완성된 블록의 불변 상태 반환 (다른 스레드에서 조회용)
+
+        Returns:
+            FrozenIndex
+        """
+        levels = {level: (self._levels[level], self._counts[level], self._offsets[level]) for level in self._levels}
+        return FrozenIndex(self.base_level, self.total, levels)
+
+
+class FrozenIndex:
+    """특정 시점의 HistoryIndex 상태 (완성된 블록만 포함)"""
+
+    def __init__(self, base_level, total, levels):
+        self.base_level = base_level
+        self.total = total
+        self.levels = levels     # 레벨 → (배열, 완성된 블록 수, 정리된 블록 수)
+
+    @property
+    def top_level(self):
+        """완성된 블록이 있는 가장 높은 레벨"""
+        levels = [level for level, (_, count, _) in self.levels.items() if count > 0]
+        return max(levels) if levels else None
+
+    def blocks(self, level, field, first, stop):
+        """레벨의 블록 [first, stop)의 (최솟값, 최댓값, 합계) 배열"""
+        data, _, offset = self.levels[level]
+        return data[:, field, first - offset:stop - offset]
+
+    def cover(self, field, start, stop):
+        """
+        샘플 구간 [start, stop)을 완성된 블록과 남은 원본 샘플 구간으로 분해
+        (위치에 정렬된 가장 큰 블록부터 사용하므로 조각 수는 레벨 수에 비례,
+        start가 기본 블록 크기에 정렬되어 있지 않으면 전체가 원본 구간으로 반환됨)
+
+        Returns:
+            ([(최솟값, 최댓값, 합계), ...], 원본에서 직접 집계할 샘플 구간 (시작, 끝))
+        """
+        pieces = []
+        position = start
+        levels = sorted(self.levels, reverse=True)
+        while position < stop:
+            for level in levels:
+                size = 1 << level
+                if position % size == 0 and position + size <= stop and (position >> level) < self.levels[level][1]:
+                    block = position >> level
+                    pieces.append(tuple(self.blocks(level, field, block, block + 1)[:, 0]))
+                    position += size
+                    break
+            else:
+                break
+        return pieces, (position, stop)
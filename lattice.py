@@ -0,0 +1,452 @@
+"""
+2차원 공간 Daisyworld 격자 엔진
+행성 표면을 격자로 나누어 셀마다 지형(바다/대륙), 데이지 피복률, 알베도, 온도를 따로 가지고,
+이웃 셀 사이의 열 확산과 씨앗 확산을 벡터화된 NumPy 스텐실 연산으로 계산
+천문학적 강제력(밀란코비치 주기, 낮/밤 사이클)과 대기 기체는 0차원 모델과 같은 전역 값을 사용
+"""
+import numpy as np
+from simulator import resolve_parameters, compute_astronomical_forcing
+from history import SimulationHistory, HISTORY_FIELDS
+
+
+# 격자 설정
+LATTICE_SIZE = (1024, 1024)          # 기본 격자 크기 (행 = 위도, 열 = 경도)
+LATTICE_DTYPE = np.float32           # 셀 배열 자료형 (float32로 메모리 대역폭 절반)
+LATTICE_TERRAIN_SMOOTHING = 24       # 지형 잡음 저역 통과 필터의 차단 파수 (작을수록 대륙이 큼)
+LATTICE_LATITUDE_CONTRAST = 0.5      # 위도별 일사량 차이 (0 = 균일, 1 = 극지방 일사량 0)
+
+# 확산 설정 (스텝당 이웃으로 이동하는 비율, 안정 조건: 계수 * 간격 <= 0.25)
+LATTICE_HEAT_DIFFUSION = 0.2         # 열 확산 계수
+LATTICE_SEED_DISPERSAL = 0.01        # 씨앗 확산 계수
+LATTICE_DISPERSAL_INTERVAL = 10      # 씨앗 확산 및 최소 피복률 적용 간격 (스텝)
+
+
+def generate_terrain(shape, ocean_ratio, smoothing=LATTICE_TERRAIN_SMOOTHING, seed=None):
+    """
+    저역 통과 필터를 거친 랜덤 잡음으로 대륙 마스크 생성
+    잡음의 분위수로 문턱값을 정하므로 바다 비율이 ocean_ratio와 정확히 맞음
+
+    Args:
+        shape: 격자 크기 (행, 열)
+        ocean_ratio: 바다 셀 비율
+        smoothing: 유지할 최대 파수
+        seed: 난수 시드
+
+    Returns:
+        대륙이면 True인 bool 배열
+    """
+    rng = np.random.default_rng(seed)
+    rows, cols = shape
+    spectrum = np.fft.rfft2(rng.standard_normal(shape))
+    # 파수가 클수록 감쇠 (경도 방향은 주기 경계와 맞도록 FFT 격자 그대로 사용)
+    ky = np.fft.fftfreq(rows) * rows
+    kx = np.fft.rfftfreq(cols) * cols
+    wavenumber = np.hypot(ky[:, None], kx[None, :])
+    spectrum *= np.exp(-(wavenumber / smoothing) ** 2)
+    field = np.fft.irfft2(spectrum, s=shape)
+    return field > np.quantile(field, ocean_ratio)
+
+
+def latitude_insolation(rows, contrast=LATTICE_LATITUDE_CONTRAST):
+    """
+    위도별 일사량 계수 (행 평균이 1이 되도록 정규화)
+
+    Args:
+        rows: 격자 행 수 (북극 → 남극)
+        contrast: 적도와 극지방의 일사량 차이
+
+    Returns:
+        (rows,) 배열
+    """
+    latitude = (np.arange(rows) + 0.5) / rows * np.pi - np.pi / 2
+    # cos(위도)의 평균은 2/π이므로 π/2를 곱하면 평균 1
+    return (1 - contrast) + contrast * np.cos(latitude) * (np.pi / 2)
+
+
+class DaisyworldLattice:
+    """
+    2차원 공간 Daisyworld 시뮬레이터
+
+    - 셀 상태: 지형(바다/대륙), 검은/흰 데이지 피복률, 알베도, 표면 온도
+    - 셀 온도: 셀 알베도와 위도별 일사량으로 복사 평형 온도를 구하고 지형별 열용량으로 완화하면서 이웃과 열 확산
+    - 데이지: 셀 온도와 셀 알베도로 지역 데이지 온도와 성장률을 계산하고, 일정 간격으로 이웃 대륙 셀에 씨앗 확산
+    - 전역 값: 천문학적 강제력과 대기 기체/온실효과는 0차원 모델(DaisyworldSimulator)과 같은 식을 사용하며,
+      기체 변화는 대륙 평균 피복률과 평균 온도로 계산
+
+    메모리 배치:
+    - 온도는 위/아래에 여분 행을 둔 1차원 연속 버퍼에 저장하고, 이웃은 ±1 (경도), ±열 수 (위도) 위치로 읽음
+      (경도 방향은 나선형 주기 경계로 행의 끝이 다음 행의 처음과 이웃, 극지방은 열 흐름이 없는 경계)
+    - 데이지 피복률과 알베도는 대륙 셀만 모은 압축 배열(black, white, land_albedo)에 저장하여
+      바다 셀(약 70%)에 대한 성장 계산을 생략
+    """
+
+    def __init__(self, shape=LATTICE_SIZE, params=None, history=None, seed=None, terrain=None):
+        """
+        격자 시뮬레이터 초기화
+
+        Args:
+            shape: 격자 크기 (행, 열)
+            params: 물리 파라미터 덮어쓰기 딕셔너리
+            history: 전역 평균 기록 저장소 (None이면 기본 설정으로 생성)
+            seed: 지형 생성 난수 시드
+            terrain: 대륙 마스크 (주어지면 지형 생성 대신 사용)
+        """
+        self.params = resolve_parameters(params)
+        p = self.params
+        self.shape = tuple(shape)
+        rows, cols = self.shape
+        self.num_cells = rows * cols
+        dtype = LATTICE_DTYPE
+
+        # 지형
+        if terrain is None:
+            terrain = generate_terrain(self.shape, p['OCEAN_RATIO'], seed=seed)
+        self.land = np.array(terrain, dtype=bool).reshape(self.shape)
+        self.land_index = np.flatnonzero(self.land)      # 대륙 셀의 평탄화 위치 (압축 배열 순서)
+        self.num_land = len(self.land_index)
+        if self.num_land == 0:
+            raise ValueError("대륙 셀이 하나 이상 있어야 합니다")
+
+        # 셀 상태
+        self._temperature_buffer = self._allocate(250.0)
+        self.temperature = self._interior(self._temperature_buffer)      # (num_cells,) 표면 온도
+        self.black = np.full(self.num_land, 0.01, dtype=dtype)            # 대륙 셀별 검은 데이지 피복률
+        self.white = np.full(self.num_land, 0.01, dtype=dtype)            # 대륙 셀별 흰 데이지 피복률
+        self.land_albedo = np.empty(self.num_land, dtype=dtype)           # 대륙 셀별 알베도
+        self.land_temperature = np.empty(self.num_land, dtype=dtype)      # 대륙 셀별 온도 (temperature에서 모음)
+
+        # 셀별 상수
+        # 온도 갱신: T' = C(1 - 4D) T + C D (이웃 합) + k W (1 - 알베도)^0.25
+        # (C = 지형별 열용량, D = 열 확산 계수, W = (1 - C) * 위도별 일사량^0.25, k = 스텝별 복사 규모)
+        land_flat = self.land.ravel()
+        heat_capacity = np.where(land_flat, p['LAND_HEAT_CAPACITY'], p['OCEAN_HEAT_CAPACITY'])
+        insolation = np.repeat(latitude_insolation(rows) ** 0.25, cols)
+        forcing_weight = (1 - heat_capacity) * insolation
+        self._retention = (heat_capacity * (1 - 4 * LATTICE_HEAT_DIFFUSION)).astype(dtype)
+        self._exchange = (heat_capacity * LATTICE_HEAT_DIFFUSION).astype(dtype)
+        self._land_forcing_weight = forcing_weight[self.land_index].astype(dtype)
+        # 바다 셀은 알베도가 고정이므로 W (1 - 알베도)^0.25 를 미리 계산하고, 대륙 셀은 스텝마다 덮어씀
+        self._radiative_weight = (forcing_weight * (1 - p['ALBEDO_OCEAN']) ** 0.25).astype(dtype)
+
+        # 스텝 계산용 임시 버퍼
+        self._cover_buffer = self._allocate(0.0)
+        self._grid_work = np.empty(self.num_cells, dtype=dtype)
+        self._land_work = [np.empty(self.num_land, dtype=dtype) for _ in range(4)]
+
+        # 전역 변수 (DaisyworldSimulator와 같은 이름/초기값)
+        self.area_black_daisy = 0.01
+        self.area_white_daisy = 0.01
+        self.temperature_planet = 250.0
+        self.temperature_atmosphere = 250.0
+        self.temperature_ocean = 250.0
+        self.temperature_land = 250.0
+        self.solar_luminosity = p['INITIAL_SOLAR_LUMINOSITY']
+        self.planetary_albedo = 0.0
+        self.current_time = 0
+        self.co2_concentration = p['INITIAL_CO2_CONCENTRATION']
+        self.o2_concentration = p['INITIAL_O2_CONCENTRATION']
+        self.ch4_concentration = p['INITIAL_CH4_CONCENTRATION']
+        self.h2o_concentration = p['INITIAL_H2O_CONCENTRATION']
+        self.greenhouse_effect = 0.0
+        self.earth_emissivity = p['BASE_EARTH_EMISSIVITY']
+        self.is_daytime = True
+        self.day_night_timer = 0
+        self.solar_intensity = 1.0
+        self.eccentricity = 0.0167
+        self.obliquity = p['CURRENT_OBLIQUITY']
+        self.precession_angle = 0.0
+
+        if history is None:
+            history = SimulationHistory()
+        self.history = history
+
+    def _allocate(self, value):
+        """위/아래 여분 행과 양 끝 여분 셀 하나씩을 포함한 1차원 버퍼 할당"""
+        cols = self.shape[1]
+        return np.full(self.num_cells + 2 * cols + 2, value, dtype=LATTICE_DTYPE)
+
+    def _interior(self, buffer):
+        """버퍼의 격자 부분 (연속 1차원 뷰)"""
+        start = self.shape[1] + 1
+        return buffer[start:start + self.num_cells]
+
+    def _neighbour_sum(self, buffer, out):
+        """
+        상하좌우 네 이웃 값의 합 (5점 스텐실)
+        여분 행을 가장자리 행으로 채워 극지방은 무흐름 경계, 양 끝 여분 셀은 나선형 경도 경계의 이웃이 됨
+        """
+        cols = self.shape[1]
+        start = cols + 1
+        stop = start + self.num_cells
+        buffer[1:start] = buffer[start:start + cols]
+        buffer[0] = buffer[stop - 1]
+        buffer[stop:stop + cols] = buffer[stop - cols:stop]
+        buffer[-1] = buffer[start]
+        np.add(buffer[start - 1:stop - 1], buffer[start + 1:stop + 1], out=out)
+        out += buffer[start - cols:stop - cols]
+        out += buffer[start + cols:stop + cols]
+        return out
+
+    def _disperse(self, cover, rate):
+        """
+        대륙 셀 피복률을 격자에 펼쳐 이웃으로 확산시킨 뒤 다시 모음 (바다로 떨어진 씨앗은 사라짐)
+
+        Args:
+            cover: 대륙 셀 압축 피복률 배열 (제자리 갱신)
+            rate: 확산 계수
+        """
+        grid = self._interior(self._cover_buffer)
+        grid.fill(0.0)
+        grid[self.land_index] = cover
+        neighbours = self._neighbour_sum(self._cover_buffer, self._grid_work)
+        neighbours *= rate
+        grid *= 1 - 4 * rate
+        grid += neighbours
+        np.take(grid, self.land_index, out=cover)
+        np.maximum(cover, self.params['MIN_AREA_THRESHOLD'], out=cover)
+
+    def grid(self, name):
+        """
+        셀 값을 (행, 열) 형태의 격자로 반환
+
+        Args:
+            name: 'temperature' (뷰), 'black', 'white', 'albedo' (바다 셀은 0 / 바다 알베도로 채운 새 배열)
+
+        Returns:
+            (행, 열) 배열
+        """
+        if name == 'temperature':
+            return self.temperature.reshape(self.shape)
+        if name == 'albedo':
+            values = np.full(self.num_cells, self.params['ALBEDO_OCEAN'], dtype=LATTICE_DTYPE)
+            values[self.land_index] = self.land_albedo
+        else:
+            values = np.zeros(self.num_cells, dtype=LATTICE_DTYPE)
+            values[self.land_index] = getattr(self, name)
+        return values.reshape(self.shape)
+
+    def step(self):
+        """한 스텝 진행"""
+        return self.run(1)
+
+    def run(self, num_steps, record=True):
+        """
+        여러 스텝을 한 번에 실행
+        시간에만 의존하는 강제력은 전체 구간을 미리 계산하고, 셀 배열은 미리 할당된 버퍼에서 제자리 연산으로 갱신
+
+        Args:
+            num_steps: 실행할 스텝 수
+            record: True면 전역 평균을 history에 기록
+
+        Returns:
+            TRAJECTORY_FIELDS 이름을 키로 하는 (num_steps,) 전역 평균 배열 딕셔너리
+        """
+        p = self.params
+        forcing = compute_astronomical_forcing(
+            self.current_time, num_steps,
+            self.day_night_timer, self.is_daytime, self.solar_intensity, p,
+        )
+        effective_luminosity = (
+            self.solar_luminosity * forcing['solar_intensity'] *
+            forcing['distance_factor'] * forcing['seasonal_factor']
+        )
+
+        respiration_rate = p['RESPIRATION_RATE']
+        photosynthesis_rate_base = p['BASE_PHOTOSYNTHESIS_RATE']
+        photosynthesis_temp_coefficient = p['PHOTOSYNTHESIS_TEMP_COEFFICIENT']
+        initial_co2 = p['INITIAL_CO2_CONCENTRATION']
+        initial_ch4 = p['INITIAL_CH4_CONCENTRATION']
+        initial_h2o = p['INITIAL_H2O_CONCENTRATION']
+        co2_factor = p['CO2_GREENHOUSE_FACTOR']
+        ch4_factor = p['CH4_GREENHOUSE_FACTOR']
+        h2o_factor = p['H2O_GREENHOUSE_FACTOR']
+        base_emissivity = p['BASE_EARTH_EMISSIVITY']
+        greenhouse_coefficient = p['GREENHOUSE_EFFECT_COEFFICIENT']
+        sigma = p['STEFAN_BOLTZMANN_CONSTANT']
+        atmosphere_capacity = p['ATMOSPHERE_HEAT_CAPACITY']
+        albedo_land = p['ALBEDO_LAND']
+        albedo_ocean = p['ALBEDO_OCEAN']
+        albedo_black_delta = p['ALBEDO_BLACK_DAISY'] - albedo_land
+        albedo_white_delta = p['ALBEDO_WHITE_DAISY'] - albedo_land
+        feedback = p['TEMPERATURE_FEEDBACK_FACTOR']
+        death_rate = p['DEATH_RATE']
+
+        # 성장률 1 - g (최적 온도 - 데이지 온도)^2 의 편차를 sqrt(g) 단위로 계산
+        # (데이지 온도 = 셀 온도 + feedback * (셀 알베도 - 데이지 알베도))
+        growth_scale = p['GROWTH_RATE_COEFFICIENT'] ** 0.5
+        black_offset = growth_scale * (p['OPTIMAL_TEMPERATURE'] + feedback * p['ALBEDO_BLACK_DAISY'])
+        white_offset = growth_scale * (p['OPTIMAL_TEMPERATURE'] + feedback * p['ALBEDO_WHITE_DAISY'])
+        albedo_growth_scale = feedback * growth_scale
+
+        num_cells = self.num_cells
+        num_land = self.num_land
+        num_ocean = num_cells - num_land
+        land_fraction = num_land / num_cells
+        land_index = self.land_index
+        temperature_buffer = self._temperature_buffer
+        temperature = self.temperature
+        land_temperature = self.land_temperature
+        black = self.black
+        white = self.white
+        land_albedo = self.land_albedo
+        retention = self._retention
+        exchange = self._exchange
+        radiative_weight = self._radiative_weight
+        land_forcing_weight = self._land_forcing_weight
+        grid_work = self._grid_work
+        deviation, bare, growth_black, growth_white = self._land_work
+        dispersal_rate = LATTICE_SEED_DISPERSAL * LATTICE_DISPERSAL_INTERVAL
+
+        area_black = self.area_black_daisy
+        area_white = self.area_white_daisy
+        temperature_planet = self.temperature_planet
+        temperature_atmosphere = self.temperature_atmosphere
+        temperature_ocean = self.temperature_ocean
+        temperature_land = self.temperature_land
+        co2 = self.co2_concentration
+        o2 = self.o2_concentration
+        ch4 = self.ch4_concentration
+        h2o = self.h2o_concentration
+
+        rows = []
+        append = rows.append
+        for time_step, is_daytime, solar_intensity, luminosity in zip(
+                forcing['time'].tolist(),
+                forcing['is_daytime'].tolist(),
+                forcing['solar_intensity'].tolist(),
+                effective_luminosity.tolist()):
+            # 전역 온실 기체 (DaisyworldSimulator.run과 같은 식, 대륙 평균 피복률 사용)
+            total_daisy_area = area_black + area_white
+            respiration_co2 = total_daisy_area * respiration_rate
+            respiration_o2 = -total_daisy_area * respiration_rate
+            if is_daytime:
+                temp_boost = 1.0 + ((temperature_planet - 273.15) * photosynthesis_temp_coefficient)
+                temp_boost = max(0.5, min(temp_boost, 2.0))
+                photosynthesis_rate = photosynthesis_rate_base * temp_boost * solar_intensity
+                photosynthesis_co2 = -total_daisy_area * photosynthesis_rate
+                photosynthesis_o2 = total_daisy_area * photosynthesis_rate
+            else:
+                photosynthesis_co2 = 0.0
+                photosynthesis_o2 = 0.0
+            co2 += respiration_co2 + photosynthesis_co2
+            o2 += respiration_o2 + photosynthesis_o2
+            ch4 += total_daisy_area * 0.001 - ch4 * 0.001
+            evaporation = max(0, ((temperature_ocean - 273.15) / 100.0) * 30.0)
+            h2o += evaporation - h2o * 0.002
+            co2 = max(50.0, min(co2, 800.0))
+            o2 = max(100000.0, min(o2, 300000.0))
+            ch4 = max(0.5, min(ch4, 5.0))
+            h2o = max(1000.0, min(h2o, 25000.0))
+
+            total_effect = (
+                (co2 / initial_co2) * co2_factor +
+                (ch4 / initial_ch4) * ch4_factor +
+                (h2o / initial_h2o) * h2o_factor
+            ) / 3.0
+            greenhouse_effect = min(total_effect, 3.0) / 3.0
+            emissivity = max(base_emissivity * (1.0 - greenhouse_effect * greenhouse_coefficient), 0.3)
+
+            # 대륙 셀 알베도와 복사 가중치 W (1 - 알베도)^0.25
+            np.multiply(black, albedo_black_delta, out=land_albedo)
+            land_albedo += albedo_land
+            np.multiply(white, albedo_white_delta, out=deviation)
+            land_albedo += deviation
+            np.subtract(1.0, land_albedo, out=deviation)
+            np.sqrt(deviation, out=deviation)
+            np.sqrt(deviation, out=deviation)
+            deviation *= land_forcing_weight
+            radiative_weight[land_index] = deviation
+
+            # 셀 온도: 열용량 완화와 열 확산을 한 번에 계산
+            radiative_scale = (luminosity / (emissivity * sigma)) ** 0.25
+            neighbours = self._neighbour_sum(temperature_buffer, grid_work)
+            neighbours *= exchange
+            temperature *= retention
+            temperature += neighbours
+            np.multiply(radiative_weight, radiative_scale, out=grid_work)
+            temperature += grid_work
+            np.take(temperature, land_index, out=land_temperature)
+
+            # 지역 데이지 성장률 (sqrt(g) 단위 편차의 제곱을 1에서 잘라냄)
+            np.multiply(land_albedo, albedo_growth_scale, out=deviation)
+            np.multiply(land_temperature, growth_scale, out=bare)
+            deviation += bare
+            np.subtract(black_offset, deviation, out=growth_black)
+            np.square(growth_black, out=growth_black)
+            np.minimum(growth_black, 1.0, out=growth_black)
+            np.subtract(white_offset, deviation, out=growth_white)
+            np.square(growth_white, out=growth_white)
+            np.minimum(growth_white, 1.0, out=growth_white)
+
+            # 피복률 변화: cover * (bare * (1 - deviation^2) - death)
+            np.subtract(1.0, black, out=bare)
+            bare -= white
+            np.subtract(bare, death_rate, out=deviation)
+            growth_black *= bare
+            np.subtract(deviation, growth_black, out=growth_black)
+            growth_black *= black
+            growth_white *= bare
+            np.subtract(deviation, growth_white, out=growth_white)
+            growth_white *= white
+            black += growth_black
+            white += growth_white
+
+            # 씨앗 확산 및 최소 피복률 (확산은 느린 과정이므로 일정 간격으로 모아서 계산)
+            if (time_step + 1) % LATTICE_DISPERSAL_INTERVAL == 0:
+                self._disperse(black, dispersal_rate)
+                self._disperse(white, dispersal_rate)
+
+            # 전역 평균
+            temperature_sum = float(temperature.sum())
+            land_temperature_sum = float(land_temperature.sum())
+            temperature_land = land_temperature_sum / num_land
+            temperature_ocean = (temperature_sum - land_temperature_sum) / num_ocean if num_ocean else temperature_land
+            temperature_surface = temperature_sum / num_cells
+            temperature_atmosphere = temperature_atmosphere * atmosphere_capacity + temperature_surface * (1 - atmosphere_capacity)
+            temperature_planet = temperature_atmosphere * 0.3 + temperature_surface * 0.7
+            area_black = float(black.sum()) / num_land
+            area_white = float(white.sum()) / num_land
+            planetary_albedo = (
+                albedo_ocean * (1 - land_fraction) +
+                (albedo_land + area_black * albedo_black_delta + area_white * albedo_white_delta) * land_fraction
+            )
+
+            append((
+                temperature_planet, temperature_atmosphere, temperature_ocean, temperature_land,
+                area_black, area_white, co2, o2, ch4, h2o, greenhouse_effect, emissivity,
+                planetary_albedo,
+            ))
+
+        if num_steps > 0:
+            self.area_black_daisy = area_black
+            self.area_white_daisy = area_white
+            self.temperature_planet = temperature_planet
+            self.temperature_atmosphere = temperature_atmosphere
+            self.temperature_ocean = temperature_ocean
+            self.temperature_land = temperature_land
+            self.co2_concentration = co2
+            self.o2_concentration = o2
+            self.ch4_concentration = ch4
+            self.h2o_concentration = h2o
+            self.greenhouse_effect = greenhouse_effect
+            self.earth_emissivity = emissivity
+            self.planetary_albedo = planetary_albedo
+            self.eccentricity = forcing['eccentricity'][-1]
+            self.obliquity = forcing['obliquity'][-1]
+            self.precession_angle = forcing['precession_angle'][-1]
+            self.day_night_timer = int(forcing['day_night_timer'][-1])
+            self.is_daytime = bool(forcing['is_daytime'][-1])
+            self.solar_intensity = forcing['solar_intensity'][-1]
+            self.current_time += num_steps
+
+        values = np.array(rows, dtype=np.float64).reshape(num_steps, len(HISTORY_FIELDS) + 1).T
+        if record:
+            self.history.extend(forcing['time'], values[:len(HISTORY_FIELDS)])
+
+        trajectory = {'time': forcing['time']}
+        for i, name in enumerate(HISTORY_FIELDS):
+            trajectory[name] = values[i]
+        trajectory['planetary_albedo'] = values[len(HISTORY_FIELDS)]
+        for name in ('solar_intensity', 'eccentricity', 'obliquity', 'precession_angle'):
+            trajectory[name] = forcing[name]
+        return trajectory
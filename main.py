@@ -1,14 +1,26 @@
 """
 Daisyworld 시뮬레이션 메인 실행 파일
 """
-import threading
-from simulator import DaisyworldSimulator
+import argparse
+from simulator import (DaisyworldSimulator, NUM_DAISIES, HISTORY_CAPACITY, HISTORY_RING_BUFFER, HISTORY_DTYPE,
+                       HISTORY_STRIDE, HISTORY_INDEX)
+from history import add_history_arguments, history_from_args
+from sim_runner import SimulationRunner, SIM_STEPS_PER_SECOND
 from visualizer_pygame import run_pygame_visualization, PLANET_RADIUS_PX, CENTER_X, CENTER_Y
-from visualizer_matplotlib import run_matplotlib_graphs, save_graphs
+from visualizer_matplotlib import start_graph_process, save_graphs
 
 
 def main():
     """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='Run the Daisyworld simulation with live visualization.')
+    parser.add_argument('--steps-per-second', type=float, default=SIM_STEPS_PER_SECOND,
+                        help='simulation speed (0 = as fast as possible)')
+    parser.add_argument('--daisies', type=int, default=NUM_DAISIES,
+                        help='number of daisies to draw (large counts use the pixel renderer)')
+    add_history_arguments(parser, HISTORY_CAPACITY, HISTORY_RING_BUFFER, HISTORY_STRIDE)
+    args = parser.parse_args()
+    history = history_from_args(parser, args, dtype=HISTORY_DTYPE, index=HISTORY_INDEX)
+    
     print("=" * 60)
     print("Daisyworld Simulation Starting...")
     print("=" * 60)
@@ -23,15 +35,26 @@ def main():
     simulator = DaisyworldSimulator(
         planet_radius_px=PLANET_RADIUS_PX,
         center_x=CENTER_X,
-        center_y=CENTER_Y
+        center_y=CENTER_Y,
+        num_daisies=args.daisies,
+        history=history,
     )
     
-    # Matplotlib을 별도 스레드에서 실행
-    graph_thread = threading.Thread(target=run_matplotlib_graphs, args=(simulator,), daemon=True)
-    graph_thread.start()
+    # Matplotlib을 별도 프로세스에서 실행 (공유 메모리 링으로 새 샘플 전달)
+    graph_process, graph_ring = start_graph_process(simulator)
+    
+    # 시뮬레이션을 화면 갱신과 분리된 별도 스레드에서 실행
+    runner = SimulationRunner(simulator, steps_per_second=args.steps_per_second or None).start()
     
     # Pygame을 메인 스레드에서 실행
-    run_pygame_visualization(simulator)
+    try:
+        run_pygame_visualization(simulator, runner)
+    finally:
+        runner.stop()
+        simulator.unsubscribe(graph_ring)
+        graph_process.terminate()
+        graph_process.join()
+        graph_ring.close()
     
     # 시뮬레이션 종료 후 그래프 저장
     print("\nSaving simulation results...")
@@ -0,0 +1,147 @@
+"""
+시뮬레이션 단계별 성능 측정 모듈
+DaisyworldSimulator.enable_profiling()으로 켰을 때만 사용되며, 꺼져 있으면 타이머를 전혀 호출하지 않음
+"""
+import bisect
+import time
+
+
+# step() 단계 (호출 순서)
+STEP_PHASES = (
+    'milankovitch',        # _update_milankovitch_cycles
+    'day_night',           # _update_day_night_cycle
+    'greenhouse_gases',    # _update_greenhouse_gases
+    'greenhouse_effect',   # _calculate_greenhouse_effect
+    'emissivity',          # _update_earth_emissivity
+    'luminosity',          # _get_effective_solar_luminosity
+    'surface',             # 알베도, 지형별 온도, 데이지 성장 (_update_surface)
+    'record',              # 기록 저장소/궤적 파일 기록 (_record_step)
+)
+
+# run() 단계 (여러 스텝을 묶어서 실행하므로 단계를 합쳐서 측정)
+RUN_PHASES = (
+    'run_forcing',         # 천문 강제력 벡터 계산 (밀란코비치, 낮/밤, 광도)
+    'run_loop',            # 결합 상태 루프 (기체, 온실효과, 온도, 성장)
+    'run_record',          # 궤적 배열 구성 및 기록
+)
+
+PROFILE_PHASES = STEP_PHASES + RUN_PHASES
+
+# 스텝 지연 시간 히스토그램 구간 경계 (초, 100ns ~ 100ms를 10배마다 4구간)
+PROFILE_LATENCY_BOUNDS = tuple(10.0 ** (exponent / 4.0) for exponent in range(-28, -3))
+PROFILE_LOG_INTERVAL = 10.0        # 기본 주기 로그 출력 간격 (초)
+
+
+class StepProfiler:
+    """단계별 누적 시간/호출 횟수와 스텝 지연 시간 히스토그램"""
+
+    def __init__(self, log_interval=None, log=print):
+        """
+        Args:
+            log_interval: 이 간격(초)마다 요약 한 줄 출력 (None이면 출력 안 함)
+            log: 요약 줄을 받는 함수
+        """
+        self.log_interval = log_interval
+        self.log = log
+        self.reset()
+
+    def reset(self):
+        """측정값 초기화"""
+        self.phase_time = dict.fromkeys(PROFILE_PHASES, 0.0)
+        self.phase_calls = dict.fromkeys(PROFILE_PHASES, 0)
+        self.latency_counts = [0] * (len(PROFILE_LATENCY_BOUNDS) + 1)
+        self.steps = 0
+        self.total_time = 0.0
+        self.max_latency = 0.0
+        self._last_log = time.perf_counter()
+
+    def add_phase(self, phase, elapsed):
+        """단계 한 번의 실행 시간 누적"""
+        self.phase_time[phase] += elapsed
+        self.phase_calls[phase] += 1
+
+    def add_steps(self, elapsed, num_steps=1):
+        """
+        스텝 지연 시간 기록
+
+        Args:
+            elapsed: num_steps 스텝에 걸린 시간 (초)
+            num_steps: 스텝 수 (run()은 한 번에 여러 스텝, 스텝당 평균으로 히스토그램에 기록)
+        """
+        if num_steps <= 0:
+            return
+        latency = elapsed / num_steps
+        self.latency_counts[bisect.bisect_left(PROFILE_LATENCY_BOUNDS, latency)] += num_steps
+        self.steps += num_steps
+        self.total_time += elapsed
+        if latency > self.max_latency:
+            self.max_latency = latency
+        if self.log_interval is not None:
+            now = time.perf_counter()
+            if now - self._last_log >= self.log_interval:
+                self._last_log = now
+                self.log(self.format_line())
+
+    def latency_percentile(self, fraction):
+        """
+        히스토그램에서 스텝 지연 시간 분위수 추정 (해당 구간의 위쪽 경계, 최댓값을 넘지 않음)
+
+        Args:
+            fraction: 0~1 사이 분위
+
+        Returns:
+            지연 시간 (초, 기록이 없으면 0)
+        """
+        if self.steps == 0:
+            return 0.0
+        target = fraction * self.steps
+        cumulative = 0
+        for i, count in enumerate(self.latency_counts):
+            cumulative += count
+            if cumulative >= target:
+                if i < len(PROFILE_LATENCY_BOUNDS):
+                    return min(PROFILE_LATENCY_BOUNDS[i], self.max_latency)
+                return self.max_latency
+        return self.max_latency
+
+    def snapshot(self):
+        """
+        현재 측정값의 복사본
+
+        Returns:
+            steps, total_time, 단계별 time/calls/share, 지연 시간 분위수와 히스토그램을 담은 딕셔너리
+        """
+        phase_total = sum(self.phase_time.values())
+        phases = {}
+        for phase in PROFILE_PHASES:
+            if self.phase_calls[phase]:
+                phases[phase] = {
+                    'time': self.phase_time[phase],
+                    'calls': self.phase_calls[phase],
+                    'share': self.phase_time[phase] / phase_total if phase_total > 0 else 0.0,
+                }
+        return {
+            'steps': self.steps,
+            'total_time': self.total_time,
+            'steps_per_second': self.steps / self.total_time if self.total_time > 0 else 0.0,
+            'phases': phases,
+            'latency': {
+                'mean': self.total_time / self.steps if self.steps else 0.0,
+                'p50': self.latency_percentile(0.5),
+                'p90': self.latency_percentile(0.9),
+                'p99': self.latency_percentile(0.99),
+                'max': self.max_latency,
+                'bounds': PROFILE_LATENCY_BOUNDS,
+                'counts': tuple(self.latency_counts),
+            },
+        }
+
+    def format_line(self):
+        """요약 한 줄 (처리량, 지연 시간 분위수, 비중이 큰 단계 순)"""
+        stats = self.snapshot()
+        latency = stats['latency']
+        phases = sorted(stats['phases'].items(), key=lambda item: -item[1]['time'])
+        breakdown = ' '.join(f"{name}={info['share']:.0%}" for name, info in phases[:4])
+        return (f"[profile] {stats['steps']:,} steps {stats['steps_per_second']:,.0f} steps/s | "
+                f"p50={latency['p50'] * 1e6:.1f}us p99={latency['p99'] * 1e6:.1f}us "
+                f"max={latency['max'] * 1e6:.1f}us | {breakdown}")
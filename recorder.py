@@ -0,0 +1,186 @@
+"""
+기록 구독(observer) 모듈
+시뮬레이터는 구독자가 요청한 필드만, 요청한 간격과 조건에 맞는 스텝에서만 전달하며 구독자가 없으면 기록 작업을 하지 않음
+
+구독자(sink)는 다음 두 메서드를 가진 객체 (SimulationHistory가 그대로 해당):
+    record(time, values)   - 한 스텝, values는 구독 필드 순서의 튜플
+    extend(times, values)  - 여러 스텝, values는 (필드 수, n) 배열
+"""
+import numpy as np
+from history import HISTORY_FIELDS
+
+
+# 구독할 수 있는 필드 (기록 필드 + 천문/복사 변수, 'time'은 항상 함께 전달되므로 제외)
+# simulator.TRAJECTORY_FIELDS = ('time',) + RECORDABLE_FIELDS
+RECORDABLE_FIELDS = HISTORY_FIELDS + (
+    'planetary_albedo',
+    'solar_intensity',
+    'eccentricity',
+    'obliquity',
+    'precession_angle',
+)
+_FIELD_POSITION = {name: i + 1 for i, name in enumerate(RECORDABLE_FIELDS)}   # 행(time 포함)에서의 위치
+
+
+class ThresholdTrigger:
+    """
+    필드 값이 임계값을 지나는 스텝에서만 기록하는 조건
+    구독 간격과 무관하게 모든 스텝의 값을 보고 직전 스텝 값과 비교
+    """
+
+    def __init__(self, field, threshold, direction='both'):
+        """
+        Args:
+            field: 감시할 필드 이름 (RECORDABLE_FIELDS)
+            threshold: 임계값
+            direction: 'up' (아래→위), 'down' (위→아래), 'both'
+        """
+        if field not in _FIELD_POSITION:
+            raise ValueError(f"알 수 없는 필드: {field}")
+        if direction not in ('up', 'down', 'both'):
+            raise ValueError(f"direction은 'up', 'down', 'both' 중 하나여야 합니다: {direction}")
+        self.field = field
+        self.threshold = threshold
+        self.direction = direction
+        self._position = _FIELD_POSITION[field]
+        self._previous = None
+
+    def _crossed(self, previous, value):
+        """직전 값 → 현재 값이 임계값을 지났는지 (스칼라 또는 배열)"""
+        up = (previous < self.threshold) & (value >= self.threshold)
+        down = (previous > self.threshold) & (value <= self.threshold)
+        if self.direction == 'up':
+            return up
+        if self.direction == 'down':
+            return down
+        return up | down
+
+    def check(self, row):
+        """
+        한 스텝 판정
+
+        Args:
+            row: TRAJECTORY_FIELDS 순서의 값 튜플 (time 포함)
+        """
+        value = row[self._position]
+        previous, self._previous = self._previous, value
+        return previous is not None and bool(self._crossed(previous, value))
+
+    def mask(self, trajectory):
+        """
+        여러 스텝 판정
+
+        Args:
+            trajectory: 필드 이름 → (n,) 배열 딕셔너리
+
+        Returns:
+            (n,) bool 배열
+        """
+        values = np.asarray(trajectory[self.field])
+        if len(values) == 0:
+            return np.zeros(0, dtype=bool)
+        previous = np.empty_like(values)
+        previous[1:] = values[:-1]
+        previous[0] = values[0] if self._previous is None else self._previous
+        self._previous = values[-1]
+        return self._crossed(previous, values)
+
+
+class CallbackRecorder:
+    """스텝마다 함수를 호출하는 구독자 (func(time, {필드: 값}))"""
+
+    def __init__(self, func, fields=('temperature',)):
+        """
+        Args:
+            func: 호출할 함수
+            fields: 전달할 필드 이름 목록
+        """
+        self.func = func
+        self.fields = tuple(fields)
+
+    def record(self, time, values):
+        """한 스텝 전달"""
+        self.func(time, dict(zip(self.fields, values)))
+
+    def extend(self, times, values):
+        """여러 스텝 전달 (스텝마다 함수 호출)"""
+        for i, time in enumerate(times.tolist()):
+            self.func(time, dict(zip(self.fields, values[:, i].tolist())))
+
+
+class TrajectorySink:
+    """TrajectoryWriter를 구독자 형식으로 감싸는 어댑터 (궤적 파일의 첫 필드는 'time')"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.fields = tuple(writer.fields[1:])
+
+    def record(self, time, values):
+        """한 스텝 기록"""
+        self.writer.record((time,) + tuple(values))
+
+    def extend(self, times, values):
+        """여러 스텝 기록"""
+        columns = dict(zip(self.fields, values))
+        columns['time'] = times
+        self.writer.extend(columns)
+
+
+class Subscription:
+    """구독 한 건 (구독자, 필드, 기록 간격, 기록 조건)"""
+
+    def __init__(self, sink, fields=None, stride=1, trigger=None):
+        """
+        Args:
+            sink: 구독자 (record/extend 메서드)
+            fields: 받을 필드 이름 목록 (None이면 sink.fields)
+            stride: 기록 간격 (time이 stride의 배수인 스텝만)
+            trigger: 기록 조건 (check(row)/mask(trajectory) 메서드, 예: ThresholdTrigger)
+        """
+        if fields is None:
+            fields = sink.fields
+        unknown = [name for name in fields if name not in _FIELD_POSITION]
+        if unknown:
+            raise ValueError(f"알 수 없는 필드: {', '.join(unknown)}")
+        if stride < 1:
+            raise ValueError("stride는 1 이상이어야 합니다")
+        self.sink = sink
+        self.fields = tuple(fields)
+        self.stride = int(stride)
+        self.trigger = trigger
+        self._positions = tuple(_FIELD_POSITION[name] for name in self.fields)
+
+    def offer(self, row):
+        """
+        한 스텝 전달 (간격과 조건을 만족할 때만 필드를 골라 sink.record 호출)
+
+        Args:
+            row: TRAJECTORY_FIELDS 순서의 값 튜플 (time 포함)
+        """
+        if self.trigger is not None and not self.trigger.check(row):
+            return
+        time = row[0]
+        if time % self.stride:
+            return
+        self.sink.record(time, tuple([row[i] for i in self._positions]))
+
+    def offer_batch(self, trajectory):
+        """
+        여러 스텝 전달
+
+        Args:
+            trajectory: 필드 이름 → (n,) 배열 딕셔너리 (DaisyworldSimulator.run()의 반환값)
+        """
+        times = trajectory['time']
+        selected = None
+        if self.stride > 1:
+            selected = times % self.stride == 0
+        if self.trigger is not None:
+            fired = self.trigger.mask(trajectory)
+            selected = fired if selected is None else selected & fired
+        values = np.array([trajectory[name] for name in self.fields], dtype=np.float64).reshape(len(self.fields), -1)
+        if selected is not None:
+            times = times[selected]
+            values = values[:, selected]
+        if len(times):
+            self.sink.extend(times, values)
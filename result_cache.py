@@ -0,0 +1,226 @@
+"""
+실행 결과 캐시 모듈
+같은 파라미터/초기 상태/코드 버전의 실행은 같은 궤적을 만들므로, 궤적과 요약을 디스크에 저장해 두고 다시 사용
+
+- 키: 전체 파라미터, 초기 상태(STATE 필드), simulator.py 소스 해시의 SHA-256
+  (스텝 수는 키에 넣지 않고 항목에 기록하여, 더 긴 요청은 저장된 궤적의 끝 상태에서 이어서 계산)
+- 항목: <키>.npz (궤적 + 끝 상태), <키>-<요약 설정 해시>.summary.npz (요약 통계 + 다운샘플 궤적)
+- 크기 예산을 넘으면 가장 오래 사용하지 않은(수정 시각 기준) 항목부터 삭제 (LRU)
+"""
+import hashlib
+import json
+import os
+import numpy as np
+import simulator as simulator_module
+from simulator import (DaisyworldSimulator, resolve_parameters, STATE_FLOAT_FIELDS, STATE_INT_FIELDS,
+                       TRAJECTORY_FIELDS)
+from history import SimulationHistory
+
+
+CACHE_DIRECTORY = 'results/cache'          # 기본 캐시 디렉토리
+CACHE_MAX_BYTES = 2 << 30                  # 기본 크기 예산 (2 GiB)
+CACHE_VERSION = 1                          # 캐시 항목 형식 버전 (키에 포함)
+
+
+def _code_version():
+    """시뮬레이션 코드 버전 (simulator.py 소스의 해시, 물리가 바뀌면 이전 항목은 자동으로 쓰이지 않음)"""
+    with open(simulator_module.__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+CODE_VERSION = _code_version()
+
+
+def initial_state(params=None):
+    """
+    새 시뮬레이터의 초기 상태 (STATE 필드만)
+
+    Args:
+        params: 물리 파라미터 덮어쓰기 딕셔너리
+
+    Returns:
+        상태 변수 이름 → 값 딕셔너리
+    """
+    simulator = DaisyworldSimulator(history=SimulationHistory(capacity=1, index=False), params=params,
+                                    num_daisies=0)
+    state = simulator.get_state()
+    return {name: state[name] for name in STATE_FLOAT_FIELDS + STATE_INT_FIELDS}
+
+
+def run_key(params=None, state=None):
+    """
+    실행 키 (파라미터 + 초기 상태 + 코드 버전의 SHA-256)
+    데이지 위치와 난수 상태는 궤적에 영향을 주지 않으므로 제외
+
+    Args:
+        params: 물리 파라미터 덮어쓰기 딕셔너리
+        state: 초기 상태 (get_state() 형식, None이면 새 시뮬레이터의 초기 상태)
+
+    Returns:
+        16진수 문자열
+    """
+    if state is None:
+        state = initial_state(params)
+    content = {
+        'cache_version': CACHE_VERSION,
+        'code_version': CODE_VERSION,
+        'params': resolve_parameters(params),
+        'state': {name: state[name] for name in STATE_FLOAT_FIELDS + STATE_INT_FIELDS},
+    }
+    # float.hex로 직렬화하여 값이 비트 단위로 같을 때만 같은 키
+    encoded = json.dumps(_exact(content), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _exact(value):
+    """JSON 직렬화용 변환 (실수는 float.hex, 정수/bool은 int)"""
+    if isinstance(value, dict):
+        return {key: _exact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_exact(item) for item in value]
+    if isinstance(value, (bool, np.bool_)):
+        return int(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return float(value).hex()
+    return value
+
+
+class ResultCache:
+    """디스크 기반 실행 결과 캐시 (여러 프로세스가 같은 디렉토리를 써도 파일 교체가 원자적)"""
+
+    def __init__(self, directory=CACHE_DIRECTORY, max_bytes=CACHE_MAX_BYTES):
+        """
+        Args:
+            directory: 캐시 디렉토리
+            max_bytes: 크기 예산 (바이트)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0          # 저장된 항목으로 요청 전체를 처리한 횟수
+        self.extensions = 0    # 저장된 항목에 이어서 계산한 횟수
+        self.misses = 0        # 처음부터 계산한 횟수
+        if not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load(self, path):
+        """항목 읽기 (사용 시각 갱신, 없거나 다른 프로세스가 삭제했으면 None)"""
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+            os.utime(path)
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        arrays['meta'] = json.loads(arrays['meta'].tobytes().decode('utf-8'))
+        return arrays
+
+    def _store(self, path, meta, arrays):
+        """항목 쓰기 (임시 파일에 쓴 뒤 교체) 후 크기 예산 적용"""
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as f:
+            np.savez(f, meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8), **arrays)
+        os.replace(temporary_path, path)
+        self.evict()
+
+    def evict(self):
+        """크기 예산을 넘으면 가장 오래 사용하지 않은 항목부터 삭제"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.npz'):
+                continue
+            try:
+                info = os.stat(self._path(name))
+            except FileNotFoundError:
+                continue
+            entries.append((info.st_mtime, info.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def size(self):
+        """현재 캐시 크기 (바이트)"""
+        return sum(os.path.getsize(self._path(name)) for name in os.listdir(self.directory) if name.endswith('.npz'))
+
+    def trajectory(self, num_steps, params=None, state=None):
+        """
+        궤적 조회 (없으면 계산하여 저장, 짧은 항목이 있으면 그 끝 상태에서 이어서 계산)
+
+        Args:
+            num_steps: 스텝 수
+            params: 물리 파라미터 덮어쓰기 딕셔너리
+            state: 초기 상태 (get_state() 형식, None이면 새 시뮬레이터의 초기 상태)
+
+        Returns:
+            TRAJECTORY_FIELDS 이름을 키로 하는 (num_steps,) 배열 딕셔너리 (DaisyworldSimulator.run()과 같은 형식)
+        """
+        key = run_key(params, state)
+        path = self._path(f'{key}.npz')
+        entry = self._load(path)
+        cached_steps = entry['meta']['num_steps'] if entry is not None else 0
+        if cached_steps >= num_steps:
+            self.hits += 1
+            return {name: entry[name][:num_steps] for name in TRAJECTORY_FIELDS}
+
+        # 저장된 끝 상태(없으면 초기 상태)에서 남은 스텝만 계산
+        simulator = DaisyworldSimulator(history=SimulationHistory(capacity=1, index=False), params=params,
+                                        num_daisies=0)
+        start_state = entry['meta']['final_state'] if entry is not None else state
+        if start_state is not None:
+            simulator.set_state(dict(start_state, daisy_positions=np.empty((0, 2)), rng_state=None))
+        computed = simulator.run(num_steps - cached_steps, record=False)
+        if entry is not None:
+            self.extensions += 1
+            trajectory = {name: np.concatenate((entry[name], computed[name])) for name in TRAJECTORY_FIELDS}
+        else:
+            self.misses += 1
+            trajectory = computed
+
+        final_state = simulator.get_state()
+        meta = {
+            'key': key,
+            'num_steps': num_steps,
+            'final_state': {name: final_state[name] for name in STATE_FLOAT_FIELDS + STATE_INT_FIELDS},
+        }
+        self._store(path, meta, trajectory)
+        return trajectory
+
+    def summary(self, num_steps, params=None, state=None, compute=None, **options):
+        """
+        요약 조회 (없으면 궤적을 조회/계산한 뒤 compute로 만들어 저장)
+
+        Args:
+            num_steps: 스텝 수
+            params: 물리 파라미터 덮어쓰기 딕셔너리
+            state: 초기 상태
+            compute: compute(trajectory, **options) → (요약 통계 딕셔너리, 배열) 함수
+                     (예: sweep.summarize_trajectory)
+            options: compute에 넘길 인자 (요약 키에 포함, JSON으로 직렬화 가능해야 함)
+
+        Returns:
+            compute의 반환값과 같은 (요약 통계 딕셔너리, 배열)
+        """
+        key = run_key(params, state)
+        options_key = hashlib.sha256(json.dumps(
+            {'num_steps': num_steps, 'compute': f'{compute.__module__}.{compute.__qualname__}', 'options': options},
+            sort_keys=True, default=list).encode('utf-8')).hexdigest()[:16]
+        path = self._path(f'{key}-{options_key}.summary.npz')
+        entry = self._load(path)
+        if entry is not None:
+            self.hits += 1
+            summary = {name: entry[f'summary_{name}'][()] for name in entry['meta']['summary_fields']}
+            return summary, entry['values']
+
+        summary, values = compute(self.trajectory(num_steps, params, state), **options)
+        meta = {'key': key, 'num_steps': num_steps, 'summary_fields': list(summary)}
+        self._store(path, meta, dict(values=values, **{f'summary_{name}': value for name, value in summary.items()}))
+        return summary, values
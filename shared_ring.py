@@ -0,0 +1,160 @@
+"""
+프로세스 간 공유 메모리 링 버퍼 모듈
+시뮬레이션 프로세스(쓰는 쪽 하나)가 기록 구독자로서 샘플을 쓰고, 그래프 프로세스(읽는 쪽)가 잠금 없이 새 샘플만 읽음
+프레임마다 pickle이나 큐 전송 없이 공유 메모리의 배열을 직접 읽고 씀
+
+메모리 구조:
+    [헤더 int64 × 8][time float64 × capacity][값 float64 × (필드 수 × capacity)]
+    헤더[0] = 쓰기를 마친 샘플 수 (committed), 헤더[1] = 쓰기를 시작한 샘플 수 (reserved)
+쓰는 쪽은 reserved를 먼저 올리고 데이터를 쓴 뒤 committed를 올림 (시퀀스 카운터)
+읽는 쪽은 committed까지 복사한 뒤 reserved를 다시 읽어, 복사하는 동안 덮어써졌을 수 있는 앞부분을 버림
+"""
+import sys
+from multiprocessing import shared_memory
+import numpy as np
+
+
+SHARED_RING_CAPACITY = 1 << 18      # 기본 링 용량 (샘플 수, 읽는 쪽이 이만큼 뒤처지면 오래된 샘플을 잃음)
+_HEADER_SLOTS = 8                   # 헤더 크기 (int64 개수, 64바이트)
+_COMMITTED = 0
+_RESERVED = 1
+
+
+class SharedRingBuffer:
+    """
+    공유 메모리 링 버퍼 (쓰는 쪽)
+    recorder 구독자 형식(record/extend)이므로 simulator.subscribe(ring)로 바로 연결
+    """
+
+    def __init__(self, fields, capacity=SHARED_RING_CAPACITY):
+        """
+        Args:
+            fields: 기록할 필드 이름 목록 (recorder.RECORDABLE_FIELDS 중에서)
+            capacity: 링 용량 (샘플 수)
+        """
+        self.fields = tuple(fields)
+        self.capacity = int(capacity)
+        self._shm = shared_memory.SharedMemory(create=True, size=_buffer_size(len(self.fields), self.capacity))
+        self._header, self._time, self._data = _map_arrays(self._shm, len(self.fields), self.capacity)
+        self._header[:] = 0
+
+    @property
+    def name(self):
+        """공유 메모리 이름 (읽는 쪽 프로세스에 전달)"""
+        return self._shm.name
+
+    def spec(self):
+        """읽는 쪽이 연결할 때 필요한 정보 (name, fields, capacity)"""
+        return self.name, self.fields, self.capacity
+
+    def record(self, time, values):
+        """한 스텝 기록"""
+        count = int(self._header[_COMMITTED])
+        slot = count % self.capacity
+        self._header[_RESERVED] = count + 1
+        self._time[slot] = time
+        self._data[:, slot] = values
+        self._header[_COMMITTED] = count + 1
+
+    def extend(self, times, values):
+        """
+        여러 스텝 기록 (용량보다 많으면 마지막 capacity개만)
+
+        Args:
+            times: (n,) 시간 배열
+            values: (필드 수, n) 값 배열
+        """
+        total = len(times)
+        count = int(self._header[_COMMITTED])
+        if total > self.capacity:
+            count += total - self.capacity
+            times = times[-self.capacity:]
+            values = values[:, -self.capacity:]
+            total = self.capacity
+        self._header[_RESERVED] = count + total
+        slot = count % self.capacity
+        first = min(total, self.capacity - slot)
+        self._time[slot:slot + first] = times[:first]
+        self._data[:, slot:slot + first] = values[:, :first]
+        if first < total:
+            self._time[:total - first] = times[first:]
+            self._data[:, :total - first] = values[:, first:]
+        self._header[_COMMITTED] = count + total
+
+    def close(self):
+        """공유 메모리 해제 (만든 쪽이므로 이름도 삭제)"""
+        self._header = self._time = self._data = None
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedRingReader:
+    """공유 메모리 링 버퍼 (읽는 쪽, 다른 프로세스에서 이름으로 연결)"""
+
+    def __init__(self, name, fields, capacity):
+        """
+        Args:
+            name, fields, capacity: SharedRingBuffer.spec()의 값
+        """
+        self.fields = tuple(fields)
+        self.capacity = int(capacity)
+        self._shm = _attach(name)
+        self._header, self._time, self._data = _map_arrays(self._shm, len(self.fields), self.capacity)
+        self.position = 0      # 다음에 읽을 샘플 번호
+        self.dropped = 0       # 읽기 전에 덮어써져 잃은 샘플 수
+
+    def read(self):
+        """
+        마지막으로 읽은 뒤 새로 쓰인 샘플 복사
+
+        Returns:
+            ((n,) 시간 배열, (필드 수, n) 값 배열)
+        """
+        end = int(self._header[_COMMITTED])
+        start = max(self.position, end - self.capacity)
+        slots = np.arange(start, end) % self.capacity
+        times = self._time[slots]
+        values = self._data[:, slots]
+
+        # 복사하는 동안 쓰는 쪽이 앞질러 덮어썼을 수 있는 샘플은 버림
+        valid_start = max(start, int(self._header[_RESERVED]) - self.capacity)
+        skip = valid_start - start
+        if skip > 0:
+            times = times[skip:]
+            values = values[:, skip:]
+        self.dropped += max(0, valid_start - self.position)
+        self.position = end
+        return times, values
+
+    def close(self):
+        """연결 해제 (공유 메모리는 만든 쪽이 삭제)"""
+        self._header = self._time = self._data = None
+        self._shm.close()
+
+
+def _buffer_size(num_fields, capacity):
+    """공유 메모리 크기 (바이트)"""
+    return 8 * (_HEADER_SLOTS + capacity * (num_fields + 1))
+
+
+def _map_arrays(shm, num_fields, capacity):
+    """공유 메모리 위의 (헤더, 시간, 값) 배열 뷰"""
+    header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+    times = np.ndarray((capacity,), dtype=np.float64, buffer=shm.buf, offset=8 * _HEADER_SLOTS)
+    data = np.ndarray((num_fields, capacity), dtype=np.float64, buffer=shm.buf,
+                      offset=8 * (_HEADER_SLOTS + capacity))
+    return header, times, data
+
+
+def _attach(name):
+    """
+    이미 있는 공유 메모리에 연결
+    (multiprocessing으로 시작한 프로세스는 만든 쪽과 같은 resource_tracker를 쓰므로 등록이 겹쳐도 한 번만 정리됨,
+    Python 3.13 이상은 아예 등록하지 않음)
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
@@ -0,0 +1,113 @@
+"""
+시뮬레이션 실행 스레드 모듈
+시뮬레이션을 화면 갱신과 분리된 별도 스레드에서 고정 속도(또는 무제한)로 진행하고,
+시각화 모듈은 일관된 불변 스냅샷만 읽어서 각자의 속도로 그림
+"""
+import threading
+import time
+from collections import namedtuple
+from simulator import STATE_FLOAT_FIELDS, STATE_INT_FIELDS
+
+
+# 실행 스레드 설정
+SIM_STEPS_PER_SECOND = 20          # 기본 시뮬레이션 속도 (스텝/초, None = 무제한)
+SIM_MAX_BATCH_STEPS = 1000         # 한 번에 실행하는 최대 스텝 수 (스냅샷 발행 간격)
+SIM_MAX_LAG = 0.25                 # 이 시간(초) 이상 뒤처지면 밀린 스텝을 버리고 따라잡지 않음
+
+# 스냅샷 필드 (상태 변수 + 데이지 위치/색상 배정 순서, 기록은 그래프 프로세스가 공유 메모리 링으로 받음)
+SNAPSHOT_FIELDS = STATE_FLOAT_FIELDS + STATE_INT_FIELDS + ('daisy_positions', 'daisy_order')
+
+SimulationSnapshot = namedtuple('SimulationSnapshot', SNAPSHOT_FIELDS)
+SimulationSnapshot.__doc__ = """특정 시점의 시뮬레이션 상태 (불변, 여러 스레드에서 안전하게 읽기 가능)"""
+
+
+def capture_snapshot(simulator):
+    """
+    시뮬레이터의 현재 상태를 불변 스냅샷으로 캡처
+    시뮬레이터를 진행하는 스레드에서 스텝 사이에 호출해야 일관된 값을 얻음
+
+    Args:
+        simulator: DaisyworldSimulator 인스턴스
+
+    Returns:
+        SimulationSnapshot
+    """
+    values = [getattr(simulator, name) for name in STATE_FLOAT_FIELDS + STATE_INT_FIELDS]
+    return SimulationSnapshot(
+        *values,
+        daisy_positions=simulator.daisy_positions,
+        daisy_order=simulator.daisy_order,
+    )
+
+
+class SimulationRunner:
+    """
+    시뮬레이션을 별도 스레드에서 진행하는 실행기
+    시뮬레이터는 이 스레드만 변경하며, 배치가 끝날 때마다 스냅샷을 발행
+    (스냅샷 교체는 참조 대입 한 번이므로 읽는 쪽은 잠금 없이 latest()만 호출)
+    """
+
+    def __init__(self, simulator, steps_per_second=SIM_STEPS_PER_SECOND, max_batch_steps=SIM_MAX_BATCH_STEPS):
+        """
+        Args:
+            simulator: DaisyworldSimulator 인스턴스
+            steps_per_second: 시뮬레이션 속도 (스텝/초, None = CPU가 허용하는 최대 속도)
+            max_batch_steps: 스냅샷 발행 사이에 실행하는 최대 스텝 수
+        """
+        self.simulator = simulator
+        self.steps_per_second = steps_per_second
+        self.max_batch_steps = max_batch_steps
+        self.steps_done = 0
+
+        self._snapshot = capture_snapshot(simulator)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+
+    def latest(self):
+        """가장 최근에 발행된 스냅샷"""
+        return self._snapshot
+
+    def start(self):
+        """실행 스레드 시작"""
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """실행 스레드를 멈추고 종료될 때까지 대기 (이후 시뮬레이터를 직접 사용해도 안전)"""
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run_batch(self, num_steps):
+        """num_steps 스텝 실행 후 스냅샷 발행"""
+        self.simulator.run(num_steps)
+        self.steps_done += num_steps
+        self._snapshot = capture_snapshot(self.simulator)
+
+    def _worker(self):
+        """실행 루프"""
+        if self.steps_per_second is None:
+            # 무제한 모드: 최대 배치 크기로 계속 실행
+            while not self._stop_event.is_set():
+                self._run_batch(self.max_batch_steps)
+            return
+
+        # 고정 속도 모드: 경과 시간으로 목표 스텝 수를 계산하여 밀린 만큼만 실행
+        step_interval = 1.0 / self.steps_per_second
+        start = time.perf_counter()
+        target_offset = 0
+        while not self._stop_event.is_set():
+            elapsed = time.perf_counter() - start
+            due = int(elapsed * self.steps_per_second) - target_offset
+            if due * step_interval > SIM_MAX_LAG:
+                # 너무 뒤처졌으면 밀린 스텝은 버리고 현재 시점부터 다시 맞춤
+                target_offset += due - 1
+                due = 1
+            if due > 0:
+                batch = min(due, self.max_batch_steps)
+                self._run_batch(batch)
+                target_offset += batch
+            else:
+                # 다음 스텝 시각까지 대기 (stop() 호출 시 즉시 깨어남)
+                next_step_time = (target_offset + 1) * step_interval
+                self._stop_event.wait(max(next_step_time - elapsed, 0.0))
@@ -4,6 +4,10 @@ Daisyworld 시뮬레이션 코어 모듈
 import numpy as np
 from datetime import datetime
 import os
+import time
+from history import SimulationHistory, HISTORY_FIELDS
+from profiling import StepProfiler
+from recorder import RECORDABLE_FIELDS, Subscription, TrajectorySink
 
 
 # ========== 상수 정의 ==========
@@ -31,7 +35,7 @@ SIMULATION_TIME_STEPS = None          # 무한 시뮬레이션 (None = 무한)
 TIME_STEP_SECONDS = 3600              # 1스텝 = 1시간 (3600초)
 
 # 시각화 설정
-NUM_DAISIES = 300                  # 화면에 표시할 데이지 개수
+NUM_DAISIES = 300                  # 화면에 표시할 기본 데이지 개수
 
 # 지형 관련 상수
 OCEAN_RATIO = 0.7                  # 바다 비율 (지구는 약 71%)
@@ -85,10 +89,276 @@ OBLIQUITY_MIN = 22.1                  # 최소 기울기 (도)
 OBLIQUITY_MAX = 24.5                  # 최대 기울기 (도) (실제 지구: 22.1~24.5도)
 CURRENT_OBLIQUITY = 23.5              # 현재 기울기 (도)
 
+# 시뮬레이터 인스턴스별로 덮어쓸 수 있는 물리 파라미터 (기본값은 위의 모듈 상수)
+PARAMETER_NAMES = (
+    'STEFAN_BOLTZMANN_CONSTANT',
+    'ALBEDO_BLACK_DAISY', 'ALBEDO_WHITE_DAISY',
+    'TEMPERATURE_FEEDBACK_FACTOR', 'DEATH_RATE', 'OPTIMAL_TEMPERATURE',
+    'GROWTH_RATE_COEFFICIENT', 'MIN_AREA_THRESHOLD',
+    'INITIAL_SOLAR_LUMINOSITY',
+    'OCEAN_RATIO', 'LAND_RATIO',
+    'ATMOSPHERE_HEAT_CAPACITY', 'OCEAN_HEAT_CAPACITY', 'LAND_HEAT_CAPACITY',
+    'ALBEDO_OCEAN', 'ALBEDO_LAND',
+    'BASE_EARTH_EMISSIVITY', 'GREENHOUSE_EFFECT_COEFFICIENT',
+    'INITIAL_CO2_CONCENTRATION', 'INITIAL_O2_CONCENTRATION',
+    'INITIAL_CH4_CONCENTRATION', 'INITIAL_H2O_CONCENTRATION',
+    'RESPIRATION_RATE', 'BASE_PHOTOSYNTHESIS_RATE', 'PHOTOSYNTHESIS_TEMP_COEFFICIENT',
+    'CO2_GREENHOUSE_FACTOR', 'CH4_GREENHOUSE_FACTOR', 'H2O_GREENHOUSE_FACTOR',
+    'DAY_NIGHT_CYCLE_DURATION', 'NIGHT_SOLAR_REDUCTION', 'TRANSITION_SMOOTHNESS',
+    'ECCENTRICITY_CYCLE', 'PRECESSION_CYCLE', 'OBLIQUITY_CYCLE',
+    'ECCENTRICITY_MIN', 'ECCENTRICITY_MAX', 'OBLIQUITY_MIN', 'OBLIQUITY_MAX',
+    'CURRENT_OBLIQUITY',
+)
+DEFAULT_PARAMETERS = {name: globals()[name] for name in PARAMETER_NAMES}
+
+# 기록 저장 설정
+HISTORY_CAPACITY = 100000             # 기록 배열 초기 용량 (스텝 수, 가득 차면 두 배로 확장)
+HISTORY_RING_BUFFER = False           # True면 최근 HISTORY_CAPACITY 스텝만 유지 (메모리 고정)
+HISTORY_DTYPE = np.float64            # 기록 자료형 (np.float32로 메모리 절반)
+HISTORY_STRIDE = 1                    # 기록 간격 (k스텝마다 한 번 기록)
+HISTORY_INDEX = True                  # 다중 해상도 최소/최대/평균 인덱스 구축 (구간 조회/그래프용)
+
+# run()이 반환하는 궤적 필드 (기록 필드 + 천문/복사 변수)
+TRAJECTORY_FIELDS = ('time',) + RECORDABLE_FIELDS
+
+
+def resolve_parameters(overrides=None):
+    """
+    기본 파라미터에 인스턴스별 덮어쓰기 값을 적용한 새 딕셔너리 반환
+    (모듈 전역 상수는 변경하지 않음)
+    
+    Args:
+        overrides: 파라미터 이름 → 값 딕셔너리 (None이면 기본값 그대로)
+        
+    Returns:
+        PARAMETER_NAMES 전체를 담은 딕셔너리
+    """
+    params = dict(DEFAULT_PARAMETERS)
+    if overrides:
+        unknown = set(overrides) - set(PARAMETER_NAMES)
+        if unknown:
+            raise ValueError(f"알 수 없는 파라미터: {', '.join(sorted(unknown))}")
+        params.update(overrides)
+    return params
+
+
+def simulation_constants(params=None):
+    """
+    simulator.py에 정의된 숫자 상수 전체를 딕셔너리로 반환 (결과 파일 헤더 기록용)
+    
+    Args:
+        params: 인스턴스별 파라미터 (주어지면 해당 값으로 덮어씀)
+        
+    Returns:
+        상수 이름 → 값 딕셔너리
+    """
+    constants = {
+        name: value for name, value in globals().items()
+        if name.isupper() and isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+    if params:
+        constants.update(params)
+    return constants
+
+
+def compute_astronomical_forcing(start_time, num_steps, day_night_timer, is_daytime, solar_intensity, params=None):
+    """
+    시간에만 의존하는 천문학적 강제력(밀란코비치 주기, 낮/밤 사이클)을 한 번에 계산
+    DaisyworldSimulator.step()의 스텝별 계산과 같은 순서/값을 벡터화한 것
+    
+    Args:
+        start_time: 첫 스텝의 current_time
+        num_steps: 계산할 스텝 수
+        day_night_timer: 시작 시점의 낮/밤 타이머
+        is_daytime: 시작 시점의 낮 여부
+        solar_intensity: 시작 시점의 태양 강도
+        params: 파라미터 딕셔너리 (None이면 기본값)
+        
+    Returns:
+        스텝별 배열 딕셔너리 (time, eccentricity, obliquity, precession_angle,
+        day_night_timer, is_daytime, solar_intensity, distance_factor, seasonal_factor)
+    """
+    p = DEFAULT_PARAMETERS if params is None else params
+    time = start_time + np.arange(num_steps, dtype=np.int64)
+    
+    # 밀란코비치 주기 (_update_milankovitch_cycles)
+    eccentricity = p['ECCENTRICITY_MIN'] + (p['ECCENTRICITY_MAX'] - p['ECCENTRICITY_MIN']) * \
+                   (0.5 + 0.5 * np.sin((2 * np.pi * time) / p['ECCENTRICITY_CYCLE']))
+    obliquity = p['OBLIQUITY_MIN'] + (p['OBLIQUITY_MAX'] - p['OBLIQUITY_MIN']) * \
+                (0.5 + 0.5 * np.sin((2 * np.pi * time) / p['OBLIQUITY_CYCLE']))
+    precession_angle = ((2 * np.pi * time) / p['PRECESSION_CYCLE']) * (180 / np.pi)
+    
+    # 낮/밤 타이머 (_update_day_night_cycle): 스텝 후 타이머와 전환 횟수
+    elapsed = day_night_timer + np.arange(1, num_steps + 1, dtype=np.int64)
+    timer = elapsed % p['DAY_NIGHT_CYCLE_DURATION']
+    daytime = (elapsed // p['DAY_NIGHT_CYCLE_DURATION']) % 2 == (0 if is_daytime else 1)
+    
+    # 태양 강도는 점화식이므로 순차 계산 (step()과 동일한 부동소수점 결과 유지)
+    intensity = np.empty(num_steps)
+    current = solar_intensity
+    for i, day in enumerate(daytime.tolist()):
+        target_intensity = 1.0 if day else p['NIGHT_SOLAR_REDUCTION']
+        current += (target_intensity - current) * p['TRANSITION_SMOOTHNESS']
+        intensity[i] = current
+    
+    # 거리 계수 (_calculate_solar_distance_factor)
+    # 제곱은 원소별 스칼라 pow로 계산 (배열 제곱은 x*x로 처리되어 step()과 ULP 차이가 생김)
+    orbital_angle = precession_angle + (timer / p['DAY_NIGHT_CYCLE_DURATION']) * 360
+    orbital_angle_rad = orbital_angle * (np.pi / 180)
+    eccentricity_squared = np.array([e ** 2 for e in eccentricity.tolist()])
+    distance = (1 - eccentricity_squared) / (1 + eccentricity * np.cos(orbital_angle_rad))
+    distance_factor = 1.0 / np.array([d ** 2 for d in distance.tolist()])
+    
+    # 계절 계수 (_calculate_seasonal_factor)
+    obliquity_rad = obliquity * (np.pi / 180)
+    seasonal_phase = (timer / p['DAY_NIGHT_CYCLE_DURATION']) * 2 * np.pi
+    seasonal_factor = 1.0 + 0.2 * np.sin(obliquity_rad) * np.cos(seasonal_phase)
+    
+    return {
+        'time': time,
+        'eccentricity': eccentricity,
+        'obliquity': obliquity,
+        'precession_angle': precession_angle,
+        'day_night_timer': timer,
+        'is_daytime': daytime,
+        'solar_intensity': intensity,
+        'distance_factor': distance_factor,
+        'seasonal_factor': seasonal_factor,
+    }
+
+
+def daisy_counts(area_black_daisy, area_white_daisy, num_daisies=NUM_DAISIES):
+    """
+    데이지 면적 비율을 화면에 표시할 검은/흰 데이지 개수로 변환
+    
+    Args:
+        area_black_daisy: 검은 데이지 면적
+        area_white_daisy: 흰 데이지 면적
+        num_daisies: 전체 데이지 개수
+        
+    Returns:
+        (검은 데이지 개수, 흰 데이지 개수)
+    """
+    return int(num_daisies * area_black_daisy), int(num_daisies * area_white_daisy)
+
+
+class DaisyStates:
+    """
+    데이지별 상태(빈 땅/검은 데이지/흰 데이지) 인덱스 배열
+    
+    고정된 무작위 순서(order)의 앞쪽 num_black개가 검은 데이지, 뒤쪽 num_white개가 흰 데이지가 되므로
+    개수가 바뀌면 경계에 있는 데이지만 상태가 바뀜 (갱신 비용은 변화량에 비례, 새 배열 할당 없음)
+    """
+    
+    BARE = 0     # 빈 땅
+    BLACK = 1    # 검은 데이지
+    WHITE = 2    # 흰 데이지
+    
+    def __init__(self, order):
+        """
+        Args:
+            order: 데이지 인덱스의 무작위 순열 (DaisyworldSimulator.daisy_order)
+        """
+        self.order = order
+        self.states = np.zeros(len(order), dtype=np.int8)
+        self.num_black = 0
+        self.num_white = 0
+    
+    def update(self, num_black, num_white):
+        """
+        검은/흰 데이지 개수에 맞게 상태 갱신
+        
+        Args:
+            num_black: 검은 데이지 개수
+            num_white: 흰 데이지 개수
+            
+        Returns:
+            상태가 바뀐 데이지 인덱스 배열 뷰의 리스트
+        """
+        order = self.order
+        states = self.states
+        total = len(order)
+        changed = []
+        
+        # 줄어드는 쪽을 먼저 비워야 늘어나는 쪽과 겹치지 않음
+        if num_black < self.num_black:
+            changed.append(order[num_black:self.num_black])
+            states[changed[-1]] = self.BARE
+        if num_white < self.num_white:
+            changed.append(order[total - self.num_white:total - num_white])
+            states[changed[-1]] = self.BARE
+        if num_black > self.num_black:
+            changed.append(order[self.num_black:num_black])
+            states[changed[-1]] = self.BLACK
+        if num_white > self.num_white:
+            changed.append(order[total - num_white:total - self.num_white])
+            states[changed[-1]] = self.WHITE
+        
+        self.num_black = num_black
+        self.num_white = num_white
+        return changed
+
+
+def _history_view(field):
+    """SimulationHistory 필드를 시뮬레이터 속성(history_*)으로 노출하는 프로퍼티 생성"""
+    return property(lambda self: self.history.view(field))
+
+
+# 체크포인트에 저장되는 상태 변수 (실수형)
+STATE_FLOAT_FIELDS = (
+    'area_black_daisy',
+    'area_white_daisy',
+    'area_bare_ground',
+    'temperature_planet',
+    'temperature_atmosphere',
+    'temperature_ocean',
+    'temperature_land',
+    'temperature_black_daisy',
+    'temperature_white_daisy',
+    'growth_factor_black',
+    'growth_factor_white',
+    'solar_luminosity',
+    'planetary_albedo',
+    'co2_concentration',
+    'o2_concentration',
+    'ch4_concentration',
+    'h2o_concentration',
+    'greenhouse_effect',
+    'earth_emissivity',
+    'solar_intensity',
+    'eccentricity',
+    'obliquity',
+    'precession_angle',
+)
+
+# 체크포인트에 저장되는 상태 변수 (정수형)
+STATE_INT_FIELDS = (
+    'current_time',
+    'day_night_timer',
+    'is_daytime',
+)
+
+
 class DaisyworldSimulator:
     """데이지 월드 시뮬레이션 클래스"""
     
-    def __init__(self, planet_radius_px=350, center_x=400, center_y=400):
+    # 기록 데이터 (SimulationHistory의 복사 없는 배열 뷰)
+    history_time = _history_view('time')
+    history_temperature = _history_view('temperature')
+    history_atmosphere_temp = _history_view('atmosphere_temp')
+    history_ocean_temp = _history_view('ocean_temp')
+    history_land_temp = _history_view('land_temp')
+    history_black_daisy = _history_view('black_daisy')
+    history_white_daisy = _history_view('white_daisy')
+    history_co2 = _history_view('co2')
+    history_o2 = _history_view('o2')
+    history_ch4 = _history_view('ch4')
+    history_h2o = _history_view('h2o')
+    history_greenhouse_effect = _history_view('greenhouse_effect')
+    history_emissivity = _history_view('emissivity')
+    
+    def __init__(self, planet_radius_px=350, center_x=400, center_y=400, history=None, params=None,
+                 num_daisies=NUM_DAISIES, seed=None):
         """
         시뮬레이터 초기화
         
@@ -96,7 +366,18 @@ class DaisyworldSimulator:
             planet_radius_px: 행성 반지름 (픽셀)
             center_x: 중심 X 좌표
             center_y: 중심 Y 좌표
+            history: 기록 저장소 (None이면 HISTORY_* 설정으로 생성)
+            params: 물리 파라미터 덮어쓰기 딕셔너리 (예: {'DEATH_RATE': 0.25})
+            num_daisies: 화면에 표시할 데이지 개수
+            seed: 난수 시드 (데이지 배치/색상 배정 순서, None이면 실행마다 다름)
         """
+        # 인스턴스별 파라미터 (모듈 상수 + 덮어쓰기)
+        self.params = resolve_parameters(params)
+        p = self.params
+        
+        # 인스턴스별 난수 생성기 (전역 np.random 상태를 쓰지 않으므로 같은 시드면 항상 같은 결과)
+        self.rng = np.random.default_rng(seed)
+        
         # 면적 변수
         self.area_black_daisy = 0.01  # 검은 데이지가 차지하는 면적
         self.area_white_daisy = 0.01  # 흰 데이지가 차지하는 면적
@@ -115,17 +396,17 @@ class DaisyworldSimulator:
         self.growth_factor_white = 0.0  # 흰 데이지 성장률
         
         # 기타 변수
-        self.solar_luminosity = INITIAL_SOLAR_LUMINOSITY  # 현재 태양 광도 (고정)
+        self.solar_luminosity = p['INITIAL_SOLAR_LUMINOSITY']  # 현재 태양 광도 (고정)
         self.planetary_albedo = 0.0    # 행성 평균 알베도
         self.current_time = 0
         
         # 대기 및 온실효과 변수
-        self.co2_concentration = INITIAL_CO2_CONCENTRATION    # CO2 농도 (ppm)
-        self.o2_concentration = INITIAL_O2_CONCENTRATION      # O2 농도 (ppm)
-        self.ch4_concentration = INITIAL_CH4_CONCENTRATION    # CH4 농도 (ppm)
-        self.h2o_concentration = INITIAL_H2O_CONCENTRATION    # H2O 농도 (ppm)
+        self.co2_concentration = p['INITIAL_CO2_CONCENTRATION']    # CO2 농도 (ppm)
+        self.o2_concentration = p['INITIAL_O2_CONCENTRATION']      # O2 농도 (ppm)
+        self.ch4_concentration = p['INITIAL_CH4_CONCENTRATION']    # CH4 농도 (ppm)
+        self.h2o_concentration = p['INITIAL_H2O_CONCENTRATION']    # H2O 농도 (ppm)
         self.greenhouse_effect = 0.0                          # 총 온실효과
-        self.earth_emissivity = BASE_EARTH_EMISSIVITY         # 현재 지구 복사 방출 효율
+        self.earth_emissivity = p['BASE_EARTH_EMISSIVITY']         # 현재 지구 복사 방출 효율
         
         # 낮/밤 사이클 변수
         self.is_daytime = True                                # 현재 낮인지 밤인지
@@ -134,42 +415,51 @@ class DaisyworldSimulator:
         
         # 밀란코비치 주기 변수
         self.eccentricity = 0.0167                            # 현재 이심률 (지구 현재값)
-        self.obliquity = CURRENT_OBLIQUITY                    # 현재 자전축 기울기 (도)
+        self.obliquity = p['CURRENT_OBLIQUITY']                    # 현재 자전축 기울기 (도)
         self.precession_angle = 0.0                           # 세차운동 각도 (도)
         
-        # 데이터 기록용 리스트
-        self.history_black_daisy = []
-        self.history_white_daisy = []
-        self.history_temperature = []
-        self.history_atmosphere_temp = []
-        self.history_ocean_temp = []
-        self.history_land_temp = []
-        self.history_time = []
-        self.history_co2 = []
-        self.history_o2 = []
-        self.history_ch4 = []
-        self.history_h2o = []
-        self.history_greenhouse_effect = []
-        self.history_emissivity = []
+        # 데이터 기록용 저장소 (미리 할당된 배열)
+        if history is None:
+            history = SimulationHistory(
+                capacity=HISTORY_CAPACITY,
+                ring=HISTORY_RING_BUFFER,
+                dtype=HISTORY_DTYPE,
+                stride=HISTORY_STRIDE,
+                index=HISTORY_INDEX,
+            )
+        self.history = history
+        self._subscriptions = []        # 기록 구독 (Subscription, subscribe()로 추가)
+        self._trajectory_writer = None  # 궤적 파일 작성기 (trajectory_writer 속성으로 설정)
+        self._trajectory_subscription = None
+        self.subscribe(history)
+        self.profiler = None            # 단계별 성능 측정 (StepProfiler, enable_profiling()으로 켬)
         
         # 데이지 위치 생성 (극좌표 사용)
         self.planet_radius_px = planet_radius_px
         self.center_x = center_x
         self.center_y = center_y
-        self.daisy_positions = self._generate_daisy_positions()
-    
-        self.solar_luminosity = INITIAL_SOLAR_LUMINOSITY
-
-    def _generate_daisy_positions(self):
-        """데이지들의 랜덤 위치 생성 (픽셀 좌표)"""
-        positions = []
-        for _ in range(NUM_DAISIES):
-            # 원 내부의 랜덤 위치 생성
-            theta = np.random.uniform(0, 2 * np.pi)
-            r = np.random.uniform(0, self.planet_radius_px * 0.95)
-            x = self.center_x + r * np.cos(theta)
-            y = self.center_y + r * np.sin(theta)
-            positions.append((int(x), int(y)))
+        self.daisy_positions = self._generate_daisy_positions(num_daisies)
+        self.daisy_order = self.rng.permutation(num_daisies)     # 데이지 색상 배정 순서 (고정)
+        self.daisy_states = DaisyStates(self.daisy_order)
+    
+        self.solar_luminosity = p['INITIAL_SOLAR_LUMINOSITY']
+
+    def _generate_daisy_positions(self, num_daisies):
+        """
+        데이지들의 랜덤 위치 생성 (픽셀 좌표, 한 번에 벡터화하여 생성)
+        
+        Args:
+            num_daisies: 데이지 개수
+            
+        Returns:
+            (num_daisies, 2) int64 배열 (x, y)
+        """
+        # 원 내부의 랜덤 위치 생성
+        theta = self.rng.uniform(0, 2 * np.pi, num_daisies)
+        r = self.rng.uniform(0, self.planet_radius_px * 0.95, num_daisies)
+        positions = np.empty((num_daisies, 2), dtype=np.int64)
+        positions[:, 0] = self.center_x + r * np.cos(theta)
+        positions[:, 1] = self.center_y + r * np.sin(theta)
         return positions
     
     def _calculate_greenhouse_effect(self):
@@ -179,10 +469,11 @@ class DaisyworldSimulator:
         Returns:
             총 온실효과 값 (0 ~ 1 범위로 정규화)
         """
+        p = self.params
         # 각 온실 기체의 기여도 계산 (초기 농도 대비 비율)
-        co2_contribution = (self.co2_concentration / INITIAL_CO2_CONCENTRATION) * CO2_GREENHOUSE_FACTOR
-        ch4_contribution = (self.ch4_concentration / INITIAL_CH4_CONCENTRATION) * CH4_GREENHOUSE_FACTOR
-        h2o_contribution = (self.h2o_concentration / INITIAL_H2O_CONCENTRATION) * H2O_GREENHOUSE_FACTOR
+        co2_contribution = (self.co2_concentration / p['INITIAL_CO2_CONCENTRATION']) * p['CO2_GREENHOUSE_FACTOR']
+        ch4_contribution = (self.ch4_concentration / p['INITIAL_CH4_CONCENTRATION']) * p['CH4_GREENHOUSE_FACTOR']
+        h2o_contribution = (self.h2o_concentration / p['INITIAL_H2O_CONCENTRATION']) * p['H2O_GREENHOUSE_FACTOR']
         
         # 총 온실효과 (가중 평균)
         total_effect = (co2_contribution + ch4_contribution + h2o_contribution) / 3.0
@@ -197,9 +488,10 @@ class DaisyworldSimulator:
         온실효과에 따라 지구 복사 방출 효율 업데이트
         온실효과가 증가하면 → 대기가 열을 가두므로 → 방출 효율 감소
         """
+        p = self.params
         # 온실효과가 클수록 방출 효율이 감소
         # emissivity = base_emissivity * (1 - greenhouse_effect * coefficient)
-        self.earth_emissivity = BASE_EARTH_EMISSIVITY * (1.0 - self.greenhouse_effect * GREENHOUSE_EFFECT_COEFFICIENT)
+        self.earth_emissivity = p['BASE_EARTH_EMISSIVITY'] * (1.0 - self.greenhouse_effect * p['GREENHOUSE_EFFECT_COEFFICIENT'])
         
         # 최소값 보장 (완전히 0이 되지 않도록)
         self.earth_emissivity = max(self.earth_emissivity, 0.3)
@@ -209,21 +501,22 @@ class DaisyworldSimulator:
         시간에 따른 온실 기체 농도 업데이트
         광합성과 호흡을 통한 CO2/O2 순환 포함
         """
+        p = self.params
         total_daisy_area = self.area_black_daisy + self.area_white_daisy
         
         # === 광합성 및 호흡 시스템 ===
         # 호흡: 항상 일정하게 발생 (O2 소비, CO2 생성)
-        respiration_co2 = total_daisy_area * RESPIRATION_RATE
-        respiration_o2 = -total_daisy_area * RESPIRATION_RATE  # O2 소비 (음수)
+        respiration_co2 = total_daisy_area * p['RESPIRATION_RATE']
+        respiration_o2 = -total_daisy_area * p['RESPIRATION_RATE']  # O2 소비 (음수)
         
         # 광합성: 낮에만 발생 (CO2 소비, O2 생성)
         # 온도가 높을수록 광합성 효율 증가
         if self.is_daytime:
             temp_celsius = self.temperature_planet - 273.15
-            temp_boost = 1.0 + (temp_celsius * PHOTOSYNTHESIS_TEMP_COEFFICIENT)  # 온도에 따른 효율 증가
+            temp_boost = 1.0 + (temp_celsius * p['PHOTOSYNTHESIS_TEMP_COEFFICIENT'])  # 온도에 따른 효율 증가
             temp_boost = max(0.5, min(temp_boost, 2.0))  # 0.5~2.0 범위로 제한
             
-            photosynthesis_rate = BASE_PHOTOSYNTHESIS_RATE * temp_boost * self.solar_intensity
+            photosynthesis_rate = p['BASE_PHOTOSYNTHESIS_RATE'] * temp_boost * self.solar_intensity
             photosynthesis_co2 = -total_daisy_area * photosynthesis_rate  # CO2 소비 (음수)
             photosynthesis_o2 = total_daisy_area * photosynthesis_rate    # O2 생성 (양수)
         else:
@@ -264,45 +557,46 @@ class DaisyworldSimulator:
         Args:
             effective_solar_luminosity: 유효 태양 광도
         """
+        p = self.params
         # 지형별 기본 온도 계산 (열용량 없이)
         base_temp_ocean = (
-            effective_solar_luminosity * (1 - ALBEDO_OCEAN) /
-            (self.earth_emissivity * STEFAN_BOLTZMANN_CONSTANT)
+            effective_solar_luminosity * (1 - p['ALBEDO_OCEAN']) /
+            (self.earth_emissivity * p['STEFAN_BOLTZMANN_CONSTANT'])
         ) ** 0.25
         
         base_temp_land = (
-            effective_solar_luminosity * (1 - ALBEDO_LAND) /
-            (self.earth_emissivity * STEFAN_BOLTZMANN_CONSTANT)
+            effective_solar_luminosity * (1 - p['ALBEDO_LAND']) /
+            (self.earth_emissivity * p['STEFAN_BOLTZMANN_CONSTANT'])
         ) ** 0.25
         
         # 대기 온도는 해양과 육지의 가중 평균
         base_temp_atmosphere = (
-            base_temp_ocean * OCEAN_RATIO +
-            base_temp_land * LAND_RATIO
+            base_temp_ocean * p['OCEAN_RATIO'] +
+            base_temp_land * p['LAND_RATIO']
         )
         
         # 열용량 적용 (이전 온도와 새 온도의 가중 평균)
         # 열용량이 클수록 이전 온도를 더 많이 유지
         self.temperature_atmosphere = (
-            self.temperature_atmosphere * ATMOSPHERE_HEAT_CAPACITY +
-            base_temp_atmosphere * (1 - ATMOSPHERE_HEAT_CAPACITY)
+            self.temperature_atmosphere * p['ATMOSPHERE_HEAT_CAPACITY'] +
+            base_temp_atmosphere * (1 - p['ATMOSPHERE_HEAT_CAPACITY'])
         )
         
         self.temperature_ocean = (
-            self.temperature_ocean * OCEAN_HEAT_CAPACITY +
-            base_temp_ocean * (1 - OCEAN_HEAT_CAPACITY)
+            self.temperature_ocean * p['OCEAN_HEAT_CAPACITY'] +
+            base_temp_ocean * (1 - p['OCEAN_HEAT_CAPACITY'])
         )
         
         self.temperature_land = (
-            self.temperature_land * LAND_HEAT_CAPACITY +
-            base_temp_land * (1 - LAND_HEAT_CAPACITY)
+            self.temperature_land * p['LAND_HEAT_CAPACITY'] +
+            base_temp_land * (1 - p['LAND_HEAT_CAPACITY'])
         )
         
         # 행성 전체 온도는 각 지형의 가중 평균
         self.temperature_planet = (
             self.temperature_atmosphere * 0.3 +  # 대기 영향 30%
-            self.temperature_ocean * OCEAN_RATIO * 0.7 +  # 바다 영향
-            self.temperature_land * LAND_RATIO * 0.7      # 대륙 영향
+            self.temperature_ocean * p['OCEAN_RATIO'] * 0.7 +  # 바다 영향
+            self.temperature_land * p['LAND_RATIO'] * 0.7      # 대륙 영향
         )
     
     def _update_milankovitch_cycles(self):
@@ -312,18 +606,19 @@ class DaisyworldSimulator:
         - 자전축 기울기 (Obliquity): 자전축 기울기 변화
         - 세차운동 (Precession): 자전축의 회전
         """
+        p = self.params
         # 1. 이심률 변화 (100,000년 주기)
-        eccentricity_phase = (2 * np.pi * self.current_time) / ECCENTRICITY_CYCLE
-        self.eccentricity = ECCENTRICITY_MIN + (ECCENTRICITY_MAX - ECCENTRICITY_MIN) * \
+        eccentricity_phase = (2 * np.pi * self.current_time) / p['ECCENTRICITY_CYCLE']
+        self.eccentricity = p['ECCENTRICITY_MIN'] + (p['ECCENTRICITY_MAX'] - p['ECCENTRICITY_MIN']) * \
                            (0.5 + 0.5 * np.sin(eccentricity_phase))
         
         # 2. 자전축 기울기 변화 (41,000년 주기)
-        obliquity_phase = (2 * np.pi * self.current_time) / OBLIQUITY_CYCLE
-        self.obliquity = OBLIQUITY_MIN + (OBLIQUITY_MAX - OBLIQUITY_MIN) * \
+        obliquity_phase = (2 * np.pi * self.current_time) / p['OBLIQUITY_CYCLE']
+        self.obliquity = p['OBLIQUITY_MIN'] + (p['OBLIQUITY_MAX'] - p['OBLIQUITY_MIN']) * \
                         (0.5 + 0.5 * np.sin(obliquity_phase))
         
         # 3. 세차운동 (26,000년 주기)
-        precession_phase = (2 * np.pi * self.current_time) / PRECESSION_CYCLE
+        precession_phase = (2 * np.pi * self.current_time) / p['PRECESSION_CYCLE']
         self.precession_angle = precession_phase * (180 / np.pi)  # 라디안을 도로 변환
     
     def _calculate_solar_distance_factor(self):
@@ -334,8 +629,9 @@ class DaisyworldSimulator:
         Returns:
             태양 복사 에너지 변화 계수 (1.0 기준)
         """
+        p = self.params
         # 궤도 상 위치 (세차운동 고려)
-        orbital_angle = self.precession_angle + (self.day_night_timer / DAY_NIGHT_CYCLE_DURATION) * 360
+        orbital_angle = self.precession_angle + (self.day_night_timer / p['DAY_NIGHT_CYCLE_DURATION']) * 360
         orbital_angle_rad = orbital_angle * (np.pi / 180)
         
         # 타원 궤도에서의 거리 변화
@@ -355,11 +651,12 @@ class DaisyworldSimulator:
         Returns:
             계절 효과 계수 (0.8 ~ 1.2)
         """
+        p = self.params
         # 태양에 대한 지구 기울기 효과
         obliquity_rad = self.obliquity * (np.pi / 180)
         
         # 낮/밤 사이클 위치에 따른 계절 (여름/겪울)
-        seasonal_phase = (self.day_night_timer / DAY_NIGHT_CYCLE_DURATION) * 2 * np.pi
+        seasonal_phase = (self.day_night_timer / p['DAY_NIGHT_CYCLE_DURATION']) * 2 * np.pi
         
         # 기울기에 따른 태양 복사 변화
         seasonal_factor = 1.0 + 0.2 * np.sin(obliquity_rad) * np.cos(seasonal_phase)
@@ -371,10 +668,11 @@ class DaisyworldSimulator:
         낮/밤 사이클 업데이트
         100스텝마다 낮과 밤이 전환되며, 태양 강도는 점진적으로 변화
         """
+        p = self.params
         self.day_night_timer += 1
         
         # 주기가 지나면 낮/밤 전환
-        if self.day_night_timer >= DAY_NIGHT_CYCLE_DURATION:
+        if self.day_night_timer >= p['DAY_NIGHT_CYCLE_DURATION']:
             self.is_daytime = not self.is_daytime
             self.day_night_timer = 0
         
@@ -384,10 +682,10 @@ class DaisyworldSimulator:
             target_intensity = 1.0
         else:
             # 밤이 되면 태양 강도를 서서히 감소
-            target_intensity = NIGHT_SOLAR_REDUCTION
+            target_intensity = p['NIGHT_SOLAR_REDUCTION']
         
         # 현재 강도를 목표 강도로 부드럽게 이동
-        self.solar_intensity += (target_intensity - self.solar_intensity) * TRANSITION_SMOOTHNESS
+        self.solar_intensity += (target_intensity - self.solar_intensity) * p['TRANSITION_SMOOTHNESS']
     
     def _get_effective_solar_luminosity(self):
         """
@@ -412,62 +710,48 @@ class DaisyworldSimulator:
         
         return effective_luminosity
     
-    def step(self):
-        """시뮬레이션 한 스텝 실행"""
-        # 무한 시뮬레이션 (시간 제한 없음)
-        
-        # 밀란코비치 주기 업데이트
-        self._update_milankovitch_cycles()
-        
-        # 낮/밤 사이클 업데이트
-        self._update_day_night_cycle()
-        
-        # 온실 기체 농도 업데이트
-        self._update_greenhouse_gases()
-        
-        # 온실효과 계산
-        self.greenhouse_effect = self._calculate_greenhouse_effect()
-        
-        # 지구 방출 효율 업데이트
-        self._update_earth_emissivity()
-        
+    def _update_surface(self, effective_solar_luminosity):
+        """
+        알베도, 지형별 온도, 데이지 영역 온도와 성장 업데이트
         
-        # 유효 태양 광도 (낮/밤 고려)
-        effective_solar_luminosity = self._get_effective_solar_luminosity()
+        Args:
+            effective_solar_luminosity: 유효 태양 광도
+        """
+        p = self.params
         
         # 빈 땅 면적 계산
         self.area_bare_ground = 1 - self.area_black_daisy - self.area_white_daisy
         
         # 최소 면적 보장
-        if self.area_black_daisy < MIN_AREA_THRESHOLD:
-            self.area_black_daisy = MIN_AREA_THRESHOLD
-        if self.area_white_daisy < MIN_AREA_THRESHOLD:
-            self.area_white_daisy = MIN_AREA_THRESHOLD
+        if self.area_black_daisy < p['MIN_AREA_THRESHOLD']:
+            self.area_black_daisy = p['MIN_AREA_THRESHOLD']
+        if self.area_white_daisy < p['MIN_AREA_THRESHOLD']:
+            self.area_white_daisy = p['MIN_AREA_THRESHOLD']
         
         # 행성 평균 알베도 계산 (대륙 부분만 - 데이지 영향)
         # 대륙에서의 데이지 비율 계산
         land_albedo = (
-            (self.area_bare_ground * ALBEDO_LAND) +
-            (self.area_black_daisy * ALBEDO_BLACK_DAISY) +
-            (self.area_white_daisy * ALBEDO_WHITE_DAISY)
+            (self.area_bare_ground * p['ALBEDO_LAND']) +
+            (self.area_black_daisy * p['ALBEDO_BLACK_DAISY']) +
+            (self.area_white_daisy * p['ALBEDO_WHITE_DAISY'])
         )
         
         # 행성 전체 알베도 (바다 + 대륙)
         self.planetary_albedo = (
-            ALBEDO_OCEAN * OCEAN_RATIO +
-            land_albedo * LAND_RATIO
+            p['ALBEDO_OCEAN'] * p['OCEAN_RATIO'] +
+            land_albedo * p['LAND_RATIO']
         )
         
         # 지형별 온도 계산 (열용량 고려)
         self._calculate_terrain_temperatures(effective_solar_luminosity)
         
         # 각 데이지 영역의 온도 계산
-        self.temperature_white_daisy = TEMPERATURE_FEEDBACK_FACTOR * (self.planetary_albedo - ALBEDO_WHITE_DAISY) + self.temperature_planet
-        self.temperature_black_daisy = TEMPERATURE_FEEDBACK_FACTOR * (self.planetary_albedo - ALBEDO_BLACK_DAISY) + self.temperature_planet
+        self.temperature_white_daisy = p['TEMPERATURE_FEEDBACK_FACTOR'] * (self.planetary_albedo - p['ALBEDO_WHITE_DAISY']) + self.temperature_planet
+        self.temperature_black_daisy = p['TEMPERATURE_FEEDBACK_FACTOR'] * (self.planetary_albedo - p['ALBEDO_BLACK_DAISY']) + self.temperature_planet
         
         # 성장률 계산
-        self.growth_factor_black = 1 - (GROWTH_RATE_COEFFICIENT * (OPTIMAL_TEMPERATURE - self.temperature_black_daisy) ** 2)
-        self.growth_factor_white = 1 - (GROWTH_RATE_COEFFICIENT * (OPTIMAL_TEMPERATURE - self.temperature_white_daisy) ** 2)
+        self.growth_factor_black = 1 - (p['GROWTH_RATE_COEFFICIENT'] * (p['OPTIMAL_TEMPERATURE'] - self.temperature_black_daisy) ** 2)
+        self.growth_factor_white = 1 - (p['GROWTH_RATE_COEFFICIENT'] * (p['OPTIMAL_TEMPERATURE'] - self.temperature_white_daisy) ** 2)
         
         # 성장률 제한
         if self.growth_factor_black < 0:
@@ -476,31 +760,440 @@ class DaisyworldSimulator:
             self.growth_factor_white = 0
         
         # 면적 변화량 계산
-        delta_area_black = self.area_black_daisy * (self.area_bare_ground * self.growth_factor_black - DEATH_RATE)
-        delta_area_white = self.area_white_daisy * (self.area_bare_ground * self.growth_factor_white - DEATH_RATE)
+        delta_area_black = self.area_black_daisy * (self.area_bare_ground * self.growth_factor_black - p['DEATH_RATE'])
+        delta_area_white = self.area_white_daisy * (self.area_bare_ground * self.growth_factor_white - p['DEATH_RATE'])
         
         # 면적 업데이트
         self.area_black_daisy += delta_area_black
         self.area_white_daisy += delta_area_white
+    
+    def _record_step(self):
+        """현재 상태를 구독자에게 전달 (TRAJECTORY_FIELDS 순서의 행, 구독자가 필드/간격/조건을 고름)"""
+        row = (
+            self.current_time,
+            self.temperature_planet,
+            self.temperature_atmosphere,
+            self.temperature_ocean,
+            self.temperature_land,
+            self.area_black_daisy,
+            self.area_white_daisy,
+            self.co2_concentration,
+            self.o2_concentration,
+            self.ch4_concentration,
+            self.h2o_concentration,
+            self.greenhouse_effect,
+            self.earth_emissivity,
+            self.planetary_albedo,
+            self.solar_intensity,
+            self.eccentricity,
+            self.obliquity,
+            self.precession_angle,
+        )
+        for subscription in self._subscriptions:
+            subscription.offer(row)
+    
+    def step(self):
+        """시뮬레이션 한 스텝 실행"""
+        # 무한 시뮬레이션 (시간 제한 없음)
         
-        # 데이터 기록
-        self.history_time.append(self.current_time)
-        self.history_temperature.append(self.temperature_planet)
-        self.history_atmosphere_temp.append(self.temperature_atmosphere)
-        self.history_ocean_temp.append(self.temperature_ocean)
-        self.history_land_temp.append(self.temperature_land)
-        self.history_black_daisy.append(self.area_black_daisy)
-        self.history_white_daisy.append(self.area_white_daisy)
-        self.history_co2.append(self.co2_concentration)
-        self.history_o2.append(self.o2_concentration)
-        self.history_ch4.append(self.ch4_concentration)
-        self.history_h2o.append(self.h2o_concentration)
-        self.history_greenhouse_effect.append(self.greenhouse_effect)
-        self.history_emissivity.append(self.earth_emissivity)
+        # 밀란코비치 주기 업데이트
+        self._update_milankovitch_cycles()
         
+        # 낮/밤 사이클 업데이트
+        self._update_day_night_cycle()
+        
+        # 온실 기체 농도 업데이트
+        self._update_greenhouse_gases()
+        
+        # 온실효과 계산
+        self.greenhouse_effect = self._calculate_greenhouse_effect()
+        
+        # 지구 방출 효율 업데이트
+        self._update_earth_emissivity()
+        
+        # 유효 태양 광도 (낮/밤 고려)
+        effective_solar_luminosity = self._get_effective_solar_luminosity()
+        
+        # 알베도, 지형별 온도, 데이지 성장
+        self._update_surface(effective_solar_luminosity)
+        
+        # 데이터 기록 (구독자가 있을 때만)
+        if self._subscriptions:
+            self._record_step()
+        
+        self.current_time += 1
+        return True
+    
+    def _profiled_step(self):
+        """단계마다 시간을 측정하는 step() (enable_profiling()이 step을 이 함수로 바꿈)"""
+        profiler = self.profiler
+        add_phase = profiler.add_phase
+        clock = time.perf_counter
+        start = clock()
+        self._update_milankovitch_cycles()
+        t1 = clock()
+        add_phase('milankovitch', t1 - start)
+        self._update_day_night_cycle()
+        t2 = clock()
+        add_phase('day_night', t2 - t1)
+        self._update_greenhouse_gases()
+        t1 = clock()
+        add_phase('greenhouse_gases', t1 - t2)
+        self.greenhouse_effect = self._calculate_greenhouse_effect()
+        t2 = clock()
+        add_phase('greenhouse_effect', t2 - t1)
+        self._update_earth_emissivity()
+        t1 = clock()
+        add_phase('emissivity', t1 - t2)
+        effective_solar_luminosity = self._get_effective_solar_luminosity()
+        t2 = clock()
+        add_phase('luminosity', t2 - t1)
+        self._update_surface(effective_solar_luminosity)
+        t1 = clock()
+        add_phase('surface', t1 - t2)
+        if self._subscriptions:
+            self._record_step()
+        t2 = clock()
+        add_phase('record', t2 - t1)
         self.current_time += 1
+        profiler.add_steps(t2 - start)
         return True
     
+    def enable_profiling(self, log_interval=None, log=print):
+        """
+        단계별 성능 측정 켜기 (끈 상태에서는 step()/run()에 타이머 호출이 전혀 없음)
+        
+        Args:
+            log_interval: 이 간격(초)마다 요약 한 줄 출력 (None이면 출력 안 함)
+            log: 요약 줄을 받는 함수
+            
+        Returns:
+            StepProfiler
+        """
+        self.profiler = StepProfiler(log_interval=log_interval, log=log)
+        self.step = self._profiled_step
+        return self.profiler
+    
+    def disable_profiling(self):
+        """단계별 성능 측정 끄기"""
+        self.profiler = None
+        self.__dict__.pop('step', None)
+    
+    def stats(self):
+        """
+        성능 측정값 스냅샷
+        
+        Returns:
+            StepProfiler.snapshot() 딕셔너리 (측정이 꺼져 있으면 None)
+        """
+        if self.profiler is None:
+            return None
+        return self.profiler.snapshot()
+    
+    def run(self, num_steps, record=True):
+        """
+        여러 스텝을 한 번에 실행
+        시간에만 의존하는 강제력은 전체 구간을 벡터화하여 미리 계산하고,
+        결합된 상태(데이지, 기체, 온도)만 지역 변수 기반의 루프로 진행
+        결과는 step()을 num_steps번 호출한 것과 같음
+        
+        Args:
+            num_steps: 실행할 스텝 수
+            record: True면 결과를 history와 궤적 파일에도 기록
+            
+        Returns:
+            TRAJECTORY_FIELDS 이름을 키로 하는 (num_steps,) 배열 딕셔너리
+        """
+        p = self.params
+        profiler = self.profiler
+        if profiler is not None:
+            run_start = time.perf_counter()
+        forcing = compute_astronomical_forcing(
+            self.current_time, num_steps,
+            self.day_night_timer, self.is_daytime, self.solar_intensity, p,
+        )
+        effective_luminosity = (
+            self.solar_luminosity * forcing['solar_intensity'] *
+            forcing['distance_factor'] * forcing['seasonal_factor']
+        )
+        if profiler is not None:
+            loop_start = time.perf_counter()
+            profiler.add_phase('run_forcing', loop_start - run_start)
+        
+        # 파라미터를 지역 변수로 (루프 내 딕셔너리 조회 비용 제거)
+        respiration_rate = p['RESPIRATION_RATE']
+        photosynthesis_rate_base = p['BASE_PHOTOSYNTHESIS_RATE']
+        photosynthesis_temp_coefficient = p['PHOTOSYNTHESIS_TEMP_COEFFICIENT']
+        initial_co2 = p['INITIAL_CO2_CONCENTRATION']
+        initial_ch4 = p['INITIAL_CH4_CONCENTRATION']
+        initial_h2o = p['INITIAL_H2O_CONCENTRATION']
+        co2_factor = p['CO2_GREENHOUSE_FACTOR']
+        ch4_factor = p['CH4_GREENHOUSE_FACTOR']
+        h2o_factor = p['H2O_GREENHOUSE_FACTOR']
+        base_emissivity = p['BASE_EARTH_EMISSIVITY']
+        greenhouse_coefficient = p['GREENHOUSE_EFFECT_COEFFICIENT']
+        min_area = p['MIN_AREA_THRESHOLD']
+        albedo_land = p['ALBEDO_LAND']
+        albedo_ocean = p['ALBEDO_OCEAN']
+        albedo_black = p['ALBEDO_BLACK_DAISY']
+        albedo_white = p['ALBEDO_WHITE_DAISY']
+        ocean_ratio = p['OCEAN_RATIO']
+        land_ratio = p['LAND_RATIO']
+        sigma = p['STEFAN_BOLTZMANN_CONSTANT']
+        atmosphere_capacity = p['ATMOSPHERE_HEAT_CAPACITY']
+        ocean_capacity = p['OCEAN_HEAT_CAPACITY']
+        land_capacity = p['LAND_HEAT_CAPACITY']
+        feedback = p['TEMPERATURE_FEEDBACK_FACTOR']
+        growth_coefficient = p['GROWTH_RATE_COEFFICIENT']
+        optimal_temperature = p['OPTIMAL_TEMPERATURE']
+        death_rate = p['DEATH_RATE']
+        
+        # 결합 상태
+        area_black = self.area_black_daisy
+        area_white = self.area_white_daisy
+        temperature_planet = self.temperature_planet
+        temperature_atmosphere = self.temperature_atmosphere
+        temperature_ocean = self.temperature_ocean
+        temperature_land = self.temperature_land
+        co2 = self.co2_concentration
+        o2 = self.o2_concentration
+        ch4 = self.ch4_concentration
+        h2o = self.h2o_concentration
+        
+        rows = []
+        append = rows.append
+        for is_daytime, solar_intensity, luminosity in zip(
+                forcing['is_daytime'].tolist(),
+                forcing['solar_intensity'].tolist(),
+                effective_luminosity.tolist()):
+            # 온실 기체 (_update_greenhouse_gases)
+            total_daisy_area = area_black + area_white
+            respiration_co2 = total_daisy_area * respiration_rate
+            respiration_o2 = -total_daisy_area * respiration_rate
+            if is_daytime:
+                temp_boost = 1.0 + ((temperature_planet - 273.15) * photosynthesis_temp_coefficient)
+                temp_boost = max(0.5, min(temp_boost, 2.0))
+                photosynthesis_rate = photosynthesis_rate_base * temp_boost * solar_intensity
+                photosynthesis_co2 = -total_daisy_area * photosynthesis_rate
+                photosynthesis_o2 = total_daisy_area * photosynthesis_rate
+            else:
+                photosynthesis_co2 = 0.0
+                photosynthesis_o2 = 0.0
+            co2 += respiration_co2 + photosynthesis_co2
+            o2 += respiration_o2 + photosynthesis_o2
+            ch4 += total_daisy_area * 0.001 - ch4 * 0.001
+            evaporation = max(0, ((temperature_ocean - 273.15) / 100.0) * 30.0)
+            h2o += evaporation - h2o * 0.002
+            co2 = max(50.0, min(co2, 800.0))
+            o2 = max(100000.0, min(o2, 300000.0))
+            ch4 = max(0.5, min(ch4, 5.0))
+            h2o = max(1000.0, min(h2o, 25000.0))
+            
+            # 온실효과 및 방출 효율
+            total_effect = (
+                (co2 / initial_co2) * co2_factor +
+                (ch4 / initial_ch4) * ch4_factor +
+                (h2o / initial_h2o) * h2o_factor
+            ) / 3.0
+            greenhouse_effect = min(total_effect, 3.0) / 3.0
+            emissivity = max(base_emissivity * (1.0 - greenhouse_effect * greenhouse_coefficient), 0.3)
+            
+            # 면적 및 알베도
+            area_bare = 1 - area_black - area_white
+            if area_black < min_area:
+                area_black = min_area
+            if area_white < min_area:
+                area_white = min_area
+            land_albedo = (area_bare * albedo_land) + (area_black * albedo_black) + (area_white * albedo_white)
+            planetary_albedo = albedo_ocean * ocean_ratio + land_albedo * land_ratio
+            
+            # 지형별 온도 (_calculate_terrain_temperatures)
+            radiative_denominator = emissivity * sigma
+            base_temp_ocean = (luminosity * (1 - albedo_ocean) / radiative_denominator) ** 0.25
+            base_temp_land = (luminosity * (1 - albedo_land) / radiative_denominator) ** 0.25
+            base_temp_atmosphere = base_temp_ocean * ocean_ratio + base_temp_land * land_ratio
+            temperature_atmosphere = temperature_atmosphere * atmosphere_capacity + base_temp_atmosphere * (1 - atmosphere_capacity)
+            temperature_ocean = temperature_ocean * ocean_capacity + base_temp_ocean * (1 - ocean_capacity)
+            temperature_land = temperature_land * land_capacity + base_temp_land * (1 - land_capacity)
+            temperature_planet = (
+                temperature_atmosphere * 0.3 +
+                temperature_ocean * ocean_ratio * 0.7 +
+                temperature_land * land_ratio * 0.7
+            )
+            
+            # 데이지 성장
+            temperature_white = feedback * (planetary_albedo - albedo_white) + temperature_planet
+            temperature_black = feedback * (planetary_albedo - albedo_black) + temperature_planet
+            growth_black = 1 - (growth_coefficient * (optimal_temperature - temperature_black) ** 2)
+            growth_white = 1 - (growth_coefficient * (optimal_temperature - temperature_white) ** 2)
+            if growth_black < 0:
+                growth_black = 0
+            if growth_white < 0:
+                growth_white = 0
+            delta_area_black = area_black * (area_bare * growth_black - death_rate)
+            delta_area_white = area_white * (area_bare * growth_white - death_rate)
+            area_black += delta_area_black
+            area_white += delta_area_white
+            
+            append((
+                temperature_planet, temperature_atmosphere, temperature_ocean, temperature_land,
+                area_black, area_white, co2, o2, ch4, h2o, greenhouse_effect, emissivity,
+                planetary_albedo,
+            ))
+        
+        if profiler is not None:
+            record_start = time.perf_counter()
+            profiler.add_phase('run_loop', record_start - loop_start)
+        
+        # 최종 상태 반영
+        if num_steps > 0:
+            self.area_black_daisy = area_black
+            self.area_white_daisy = area_white
+            self.area_bare_ground = area_bare
+            self.temperature_planet = temperature_planet
+            self.temperature_atmosphere = temperature_atmosphere
+            self.temperature_ocean = temperature_ocean
+            self.temperature_land = temperature_land
+            self.temperature_black_daisy = temperature_black
+            self.temperature_white_daisy = temperature_white
+            self.growth_factor_black = growth_black
+            self.growth_factor_white = growth_white
+            self.co2_concentration = co2
+            self.o2_concentration = o2
+            self.ch4_concentration = ch4
+            self.h2o_concentration = h2o
+            self.greenhouse_effect = greenhouse_effect
+            self.earth_emissivity = emissivity
+            self.planetary_albedo = planetary_albedo
+            self.eccentricity = forcing['eccentricity'][-1]
+            self.obliquity = forcing['obliquity'][-1]
+            self.precession_angle = forcing['precession_angle'][-1]
+            self.day_night_timer = int(forcing['day_night_timer'][-1])
+            self.is_daytime = bool(forcing['is_daytime'][-1])
+            self.solar_intensity = forcing['solar_intensity'][-1]
+            self.current_time += num_steps
+        
+        # 궤적 배열 구성
+        values = np.array(rows, dtype=np.float64).reshape(num_steps, len(HISTORY_FIELDS) + 1).T
+        trajectory = {'time': forcing['time']}
+        for i, name in enumerate(HISTORY_FIELDS):
+            trajectory[name] = values[i]
+        trajectory['planetary_albedo'] = values[len(HISTORY_FIELDS)]
+        for name in ('solar_intensity', 'eccentricity', 'obliquity', 'precession_angle'):
+            trajectory[name] = forcing[name]
+        if record and self._subscriptions:
+            self.dispatch(trajectory)
+        if profiler is not None:
+            run_end = time.perf_counter()
+            profiler.add_phase('run_record', run_end - record_start)
+            profiler.add_steps(run_end - run_start, num_steps)
+        return trajectory
+    
+    def subscribe(self, sink, fields=None, stride=1, trigger=None):
+        """
+        기록 구독 추가 (step()/run()이 구독자에게 요청한 필드만 전달)
+        
+        Args:
+            sink: 구독자 (record(time, values)/extend(times, values) 메서드, 예: SimulationHistory)
+            fields: 받을 필드 이름 목록 (None이면 sink.fields, recorder.RECORDABLE_FIELDS 중에서)
+            stride: 기록 간격 (time이 stride의 배수인 스텝만)
+            trigger: 기록 조건 (예: recorder.ThresholdTrigger)
+            
+        Returns:
+            Subscription
+        """
+        subscription = Subscription(sink, fields=fields, stride=stride, trigger=trigger)
+        # 목록을 교체하므로 다른 스레드에서 구독해도 진행 중인 전달에 영향 없음 (unsubscribe와 동일)
+        self._subscriptions = self._subscriptions + [subscription]
+        return subscription
+    
+    def unsubscribe(self, target):
+        """
+        기록 구독 해제
+        
+        Args:
+            target: subscribe()가 반환한 Subscription 또는 구독자 객체
+        """
+        self._subscriptions = [
+            subscription for subscription in self._subscriptions
+            if subscription is not target and subscription.sink is not target
+        ]
+    
+    @property
+    def subscriptions(self):
+        """현재 기록 구독 목록"""
+        return tuple(self._subscriptions)
+    
+    def dispatch(self, trajectory):
+        """
+        여러 스텝의 궤적을 구독자에게 전달 (run()과 평형 고속 진행이 사용)
+        
+        Args:
+            trajectory: TRAJECTORY_FIELDS 이름을 키로 하는 (n,) 배열 딕셔너리
+        """
+        for subscription in self._subscriptions:
+            subscription.offer_batch(trajectory)
+    
+    @property
+    def trajectory_writer(self):
+        """궤적 파일 작성기 (TrajectoryWriter 또는 None, 설정하면 구독자로 등록)"""
+        return self._trajectory_writer
+    
+    @trajectory_writer.setter
+    def trajectory_writer(self, writer):
+        if self._trajectory_subscription is not None:
+            self.unsubscribe(self._trajectory_subscription)
+            self._trajectory_subscription = None
+        self._trajectory_writer = writer
+        if writer is not None:
+            self._trajectory_subscription = self.subscribe(TrajectorySink(writer))
+    
+    def get_state(self):
+        """
+        시뮬레이터의 전체 상태를 딕셔너리로 반환 (체크포인트용)
+        
+        Returns:
+            상태 변수, 데이지 위치, 난수 생성기 상태를 담은 딕셔너리
+        """
+        state = {name: float(getattr(self, name)) for name in STATE_FLOAT_FIELDS}
+        state.update({name: int(getattr(self, name)) for name in STATE_INT_FIELDS})
+        state['daisy_positions'] = self.daisy_positions.copy()
+        state['daisy_order'] = self.daisy_order.copy()
+        state['rng_state'] = self.rng.bit_generator.state
+        return state
+    
+    def set_state(self, state):
+        """
+        get_state()로 얻은 상태를 그대로 복원 (기록 데이터는 복원하지 않음)
+        
+        Args:
+            state: get_state() 형식의 딕셔너리
+        """
+        for name in STATE_FLOAT_FIELDS:
+            setattr(self, name, float(state[name]))
+        self.current_time = int(state['current_time'])
+        self.day_night_timer = int(state['day_night_timer'])
+        self.is_daytime = bool(state['is_daytime'])
+        self.daisy_positions = np.array(state['daisy_positions'], dtype=np.int64).reshape(-1, 2)
+        if 'daisy_order' in state:
+            self.daisy_order = np.asarray(state['daisy_order'], dtype=np.int64)
+        elif len(self.daisy_order) != len(self.daisy_positions):
+            self.daisy_order = self.rng.permutation(len(self.daisy_positions))
+        self.daisy_states = DaisyStates(self.daisy_order)
+        if state.get('rng_state') is not None:
+            self.rng.bit_generator.state = state['rng_state']
+    
+    def get_daisy_states(self):
+        """
+        현재 데이지별 상태 배열 반환 (DaisyStates.BARE / BLACK / WHITE)
+        이전 호출 이후 개수가 바뀐 데이지만 갱신
+        
+        Returns:
+            (데이지 개수,) int8 배열 (내부 배열이므로 수정하지 말 것)
+        """
+        self.daisy_states.update(*daisy_counts(self.area_black_daisy, self.area_white_daisy, len(self.daisy_order)))
+        return self.daisy_states.states
+    
     def get_daisy_colors(self, color_black, color_white, color_bare):
         """
         현재 데이지 색상 배열 반환
@@ -513,10 +1206,5 @@ class DaisyworldSimulator:
         Returns:
             색상 리스트
         """
-        num_black = int(NUM_DAISIES * self.area_black_daisy)
-        num_white = int(NUM_DAISIES * self.area_white_daisy)
-        num_bare = NUM_DAISIES - num_black - num_white
-        
-        colors = [color_black] * num_black + [color_white] * num_white + [color_bare] * num_bare
-        np.random.shuffle(colors)
-        return colors
+        palette = (color_bare, color_black, color_white)
+        return [palette[state] for state in self.get_daisy_states()]
@@ -0,0 +1,258 @@
+"""
+Daisyworld 파라미터 스윕 모듈
+격자(grid) 또는 라틴 하이퍼큐브(Latin hypercube)로 파라미터 조합을 만들고
+프로세스 풀에서 병렬로 실행하여 요약 통계와 다운샘플 궤적을 하나의 결과 표로 수집
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import time
+import numpy as np
+from simulator import DaisyworldSimulator, PARAMETER_NAMES
+from history import SimulationHistory
+from result_cache import ResultCache, CACHE_DIRECTORY
+
+
+# 스윕 설정
+SWEEP_DEFAULT_STEPS = 20000                  # 실행당 기본 스텝 수
+SWEEP_TRAJECTORY_POINTS = 200                # 다운샘플 궤적 길이 (구간 평균)
+SWEEP_SUMMARY_TAIL = 0.5                     # 요약 통계에 사용할 마지막 구간 비율
+SWEEP_FIELDS = ('temperature', 'black_daisy', 'white_daisy', 'co2', 'o2', 'h2o')
+
+
+def grid_spec(axes):
+    """
+    격자 스윕 파라미터 조합 생성 (모든 조합의 데카르트 곱)
+
+    Args:
+        axes: 파라미터 이름 → 값 목록 딕셔너리
+
+    Returns:
+        파라미터 딕셔너리 리스트
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+
+def latin_hypercube_spec(ranges, num_samples, seed=None):
+    """
+    라틴 하이퍼큐브 샘플링으로 파라미터 조합 생성
+    각 파라미터 범위를 num_samples개 구간으로 나누고 구간마다 정확히 한 번씩 샘플링
+
+    Args:
+        ranges: 파라미터 이름 → (최솟값, 최댓값) 딕셔너리
+        num_samples: 샘플 개수
+        seed: 난수 시드
+
+    Returns:
+        파라미터 딕셔너리 리스트
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, (low, high) in ranges.items():
+        strata = (rng.permutation(num_samples) + rng.random(num_samples)) / num_samples
+        columns[name] = low + (high - low) * strata
+    return [{name: float(columns[name][i]) for name in ranges} for i in range(num_samples)]
+
+
+def _downsample(values, num_points):
+    """구간 평균으로 궤적을 num_points개로 다운샘플"""
+    edges = np.linspace(0, len(values), num_points + 1).astype(np.int64)[:-1]
+    counts = np.diff(np.append(edges, len(values)))
+    return np.add.reduceat(values, edges) / counts
+
+
+def run_single(params, num_steps=SWEEP_DEFAULT_STEPS, fields=SWEEP_FIELDS,
+               trajectory_points=SWEEP_TRAJECTORY_POINTS, cache=None):
+    """
+    파라미터 조합 하나를 실행하고 요약 통계와 다운샘플 궤적 반환
+
+    Args:
+        params: 파라미터 덮어쓰기 딕셔너리
+        num_steps: 실행할 스텝 수
+        fields: 수집할 필드 목록
+        trajectory_points: 다운샘플 궤적 길이
+        cache: result_cache.ResultCache (지정하면 저장된 요약/궤적을 다시 사용)
+
+    Returns:
+        (요약 통계 딕셔너리, (len(fields), trajectory_points) 궤적 배열)
+    """
+    if cache is not None:
+        return cache.summary(num_steps, params, compute=summarize_trajectory,
+                             fields=list(fields), trajectory_points=trajectory_points)
+
+    # 스윕에서는 기록 저장소가 필요 없으므로 최소 크기로 생성
+    simulator = DaisyworldSimulator(history=SimulationHistory(capacity=1, index=False), params=params)
+    trajectory = simulator.run(num_steps, record=False)
+    return summarize_trajectory(trajectory, fields, trajectory_points)
+
+
+def summarize_trajectory(trajectory, fields=SWEEP_FIELDS, trajectory_points=SWEEP_TRAJECTORY_POINTS):
+    """
+    궤적의 요약 통계(마지막 구간의 평균/표준편차/최솟값/최댓값, 최종값)와 다운샘플 궤적 계산
+
+    Args:
+        trajectory: DaisyworldSimulator.run()의 반환값
+        fields: 수집할 필드 목록
+        trajectory_points: 다운샘플 궤적 길이
+
+    Returns:
+        (요약 통계 딕셔너리, (len(fields), trajectory_points) 궤적 배열)
+    """
+    num_steps = len(trajectory['time'])
+    tail_start = int(num_steps * (1 - SWEEP_SUMMARY_TAIL))
+    summary = {}
+    downsampled = np.empty((len(fields), trajectory_points))
+    for i, name in enumerate(fields):
+        values = trajectory[name]
+        tail = values[tail_start:]
+        summary[f'{name}_mean'] = tail.mean()
+        summary[f'{name}_std'] = tail.std()
+        summary[f'{name}_min'] = tail.min()
+        summary[f'{name}_max'] = tail.max()
+        summary[f'{name}_final'] = values[-1]
+        downsampled[i] = _downsample(values, trajectory_points)
+    return summary, downsampled
+
+
+def _run_task(task):
+    """프로세스 풀 작업 단위 (모듈 최상위 함수여야 pickle 가능)"""
+    params, num_steps, fields, trajectory_points, cache = task
+    return run_single(params, num_steps, fields, trajectory_points, cache)
+
+
+class SweepResult:
+    """스윕 결과 표 (실행별 파라미터 + 요약 통계 열, 다운샘플 궤적)"""
+
+    def __init__(self, parameter_sets, summaries, trajectories, fields, num_steps, elapsed):
+        self.parameter_sets = parameter_sets
+        self.fields = tuple(fields)
+        self.num_steps = num_steps
+        self.elapsed = elapsed
+        self.trajectories = trajectories   # (실행 수, 필드 수, 궤적 길이)
+        self.trajectory_time = _downsample(np.arange(num_steps, dtype=np.float64), trajectories.shape[2])
+
+        # 열(column) 기반 결과 표
+        parameter_names = sorted({name for params in parameter_sets for name in params})
+        self.table = {'run': np.arange(len(parameter_sets))}
+        for name in parameter_names:
+            self.table[name] = np.array([params.get(name, np.nan) for params in parameter_sets], dtype=np.float64)
+        for key in (summaries[0] if summaries else {}):
+            self.table[key] = np.array([summary[key] for summary in summaries])
+
+    def __len__(self):
+        return len(self.parameter_sets)
+
+    def save(self, path):
+        """
+        결과를 .npz 파일로 저장
+
+        Args:
+            path: 저장할 파일 경로
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        np.savez(
+            path,
+            trajectories=self.trajectories,
+            trajectory_time=self.trajectory_time,
+            trajectory_fields=np.array(self.fields),
+            **{f'table_{name}': column for name, column in self.table.items()},
+        )
+
+
+def run_sweep(parameter_sets, num_steps=SWEEP_DEFAULT_STEPS, processes=None,
+              fields=SWEEP_FIELDS, trajectory_points=SWEEP_TRAJECTORY_POINTS, cache=None):
+    """
+    파라미터 조합들을 프로세스 풀에서 병렬 실행
+    각 작업은 독립적인 시뮬레이터 인스턴스에 파라미터를 덮어쓰므로 모듈 전역 상수는 변경되지 않음
+
+    Args:
+        parameter_sets: 파라미터 딕셔너리 리스트 (grid_spec / latin_hypercube_spec)
+        num_steps: 실행당 스텝 수
+        processes: 프로세스 수 (None이면 CPU 코어 수, 1이면 현재 프로세스에서 순차 실행)
+        fields: 수집할 필드 목록
+        trajectory_points: 다운샘플 궤적 길이
+        cache: result_cache.ResultCache (지정하면 같은 실행은 다시 계산하지 않음)
+
+    Returns:
+        SweepResult
+    """
+    for params in parameter_sets:
+        unknown = set(params) - set(PARAMETER_NAMES)
+        if unknown:
+            raise ValueError(f"알 수 없는 파라미터: {', '.join(sorted(unknown))}")
+
+    trajectory_points = min(trajectory_points, num_steps)
+    tasks = [(params, num_steps, tuple(fields), trajectory_points, cache) for params in parameter_sets]
+    processes = processes or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    if processes == 1 or len(tasks) <= 1:
+        results = [_run_task(task) for task in tasks]
+    else:
+        # 작업을 코어당 여러 묶음으로 나눠 부하를 고르게 분산
+        chunksize = max(1, len(tasks) // (processes * 4))
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(_run_task, tasks, chunksize=chunksize)
+    elapsed = time.perf_counter() - start
+
+    summaries = [summary for summary, _ in results]
+    if results:
+        trajectories = np.stack([trajectory for _, trajectory in results])
+    else:
+        trajectories = np.zeros((0, len(fields), trajectory_points))
+    return SweepResult(parameter_sets, summaries, trajectories, fields, num_steps, elapsed)
+
+
+def _parse_axis(text, parts):
+    """'NAME=a:b[:n]' 형식의 명령행 인자 분해"""
+    name, _, values = text.partition('=')
+    values = values.split(':')
+    if len(values) != parts:
+        raise argparse.ArgumentTypeError(f"잘못된 형식: {text}")
+    return name, [float(value) for value in values]
+
+
+def main():
+    """스윕 실행 진입점"""
+    parser = argparse.ArgumentParser(description='Run a Daisyworld parameter sweep on a process pool.')
+    parser.add_argument('--grid', action='append', default=[], metavar='NAME=START:STOP:NUM',
+                        help='grid axis (repeatable)')
+    parser.add_argument('--lhs', action='append', default=[], metavar='NAME=LOW:HIGH',
+                        help='Latin-hypercube range (repeatable)')
+    parser.add_argument('--samples', type=int, default=100, help='number of Latin-hypercube samples')
+    parser.add_argument('--seed', type=int, default=None, help='Latin-hypercube seed')
+    parser.add_argument('--steps', type=int, default=SWEEP_DEFAULT_STEPS, help='steps per run')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--output', default='results/sweep.npz', help='output .npz file')
+    parser.add_argument('--cache', nargs='?', const=CACHE_DIRECTORY, default=None,
+                        help='reuse cached runs from this directory (default: %(const)s)')
+    args = parser.parse_args()
+
+    if bool(args.grid) == bool(args.lhs):
+        parser.error('use either --grid or --lhs')
+
+    if args.grid:
+        axes = {}
+        for text in args.grid:
+            name, (start, stop, num) = _parse_axis(text, 3)
+            axes[name] = np.linspace(start, stop, int(num)).tolist()
+        parameter_sets = grid_spec(axes)
+    else:
+        ranges = dict(_parse_axis(text, 2) for text in args.lhs)
+        parameter_sets = latin_hypercube_spec(ranges, args.samples, args.seed)
+
+    cache = ResultCache(args.cache) if args.cache else None
+    result = run_sweep(parameter_sets, num_steps=args.steps, processes=args.processes, cache=cache)
+    result.save(args.output)
+    total_steps = len(result) * result.num_steps
+    print(f"{len(result)} runs x {result.num_steps} steps in {result.elapsed:.1f} s "
+          f"({total_steps / result.elapsed:,.0f} steps/s)")
+    print(f"Sweep saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,486 @@
+"""
+원격 대시보드용 텔레메트리 모듈
+시뮬레이터의 스텝별 상태(pygame 화면 정보와 같은 값)를 로컬 TCP 또는 Unix 소켓으로 고정 길이 이진 레코드로 발행
+
+프로토콜 (리틀 엔디언):
+    연결 직후 서버 → 클라이언트: 헤더 '<4sHHH' (TELEMETRY_MAGIC, 버전, 레코드 크기, 필드 수)
+                                 + '<I' 길이 + 필드 이름 ('\\n'으로 구분한 ASCII)
+    클라이언트 → 서버 (언제든): '<I' 솎아내기 간격 (time이 이 값의 배수인 레코드만 받음, 기본 1)
+    서버 → 클라이언트 (flush마다): 프레임 헤더 '<II' (레코드 수, 직전 프레임 이후 버린 레코드 수)
+                                 + 레코드 수 × TELEMETRY_RECORD_DTYPE
+
+시뮬레이터 쪽(step()/run())은 구독자로서 값을 대기열에 넣기만 하고, 인코딩과 전송은 발행 스레드가 담당
+연결된 클라이언트가 있는 동안만 구독하므로, 아무도 연결하지 않은 서버는 시뮬레이션 속도에 영향이 없음
+느린 클라이언트는 보낼 대기 프레임이 쌓이면 오래된 프레임부터 버리므로 시뮬레이션을 막지 않음
+"""
+import argparse
+import collections
+import os
+import selectors
+import socket
+import struct
+import threading
+import time
+import numpy as np
+
+
+TELEMETRY_PORT = 47800             # 기본 TCP 포트 (127.0.0.1)
+TELEMETRY_FLUSH_INTERVAL = 0.1     # 프레임 발행 간격 (초)
+TELEMETRY_MAX_PENDING = 65536      # 발행 전 대기열 최대 블록 수 (넘으면 오래된 블록부터 버림)
+TELEMETRY_MAX_BACKLOG = 1 << 20    # 클라이언트별 미전송 바이트 상한 (넘으면 오래된 프레임부터 버림)
+TELEMETRY_MAGIC = b'DWTM'
+TELEMETRY_VERSION = 1
+
+# 레코드 값 필드 (pygame 화면 정보 순서, recorder.RECORDABLE_FIELDS 이름)
+TELEMETRY_FIELDS = (
+    'solar_intensity',
+    'eccentricity',
+    'obliquity',
+    'precession_angle',
+    'atmosphere_temp',
+    'ocean_temp',
+    'land_temp',
+    'black_daisy',
+    'white_daisy',
+    'o2',
+    'co2',
+    'ch4',
+    'h2o',
+    'greenhouse_effect',
+)
+
+# 고정 길이 레코드 (128바이트)
+TELEMETRY_RECORD_DTYPE = np.dtype(
+    [('time', '<i8'), ('day_night_timer', '<i4'), ('is_daytime', '<i4')]
+    + [(name, '<f8') for name in TELEMETRY_FIELDS]
+)
+
+_HEADER = struct.Struct('<4sHHH')
+_LENGTH = struct.Struct('<I')
+_FRAME = struct.Struct('<II')
+
+
+def parse_address(text):
+    """
+    주소 문자열 해석
+
+    Args:
+        text: 'host:port', 'port' 또는 Unix 소켓 경로 ('/' 또는 '.' 포함)
+
+    Returns:
+        (host, port) 튜플 또는 경로 문자열
+    """
+    if '/' in text or text.startswith('.'):
+        return text
+    host, _, port = text.rpartition(':')
+    return (host or '127.0.0.1', int(port))
+
+
+def _socket_family(address):
+    """주소 종류에 맞는 소켓 패밀리"""
+    return socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+
+
+class _Client:
+    """연결된 클라이언트 한 개 (솎아내기 간격과 미전송 프레임 대기열)"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.decimation = 1
+        self.frames = collections.deque()   # (바이트, 레코드 수, 헤더에 보고한 버린 수)
+        self.sent = 0                       # 첫 프레임에서 이미 보낸 바이트 수
+        self.backlog = 0                    # 미전송 바이트 수
+        self.dropped = 0                    # 아직 보고하지 않은 버린 레코드 수
+        self.inbox = b''
+
+
+class TelemetryServer:
+    """
+    텔레메트리 발행 서버 (recorder 구독자)
+    attach(simulator)로 연결하면 step()/run()의 값이 발행 스레드를 거쳐 연결된 클라이언트로 전송됨
+    첫 클라이언트가 연결될 때 구독하고 마지막 클라이언트가 끊기면 해제하므로,
+    클라이언트가 없는 동안 step()/run()은 텔레메트리 비용을 전혀 내지 않음
+    """
+
+    fields = TELEMETRY_FIELDS
+
+    def __init__(self, address=('127.0.0.1', TELEMETRY_PORT), flush_interval=TELEMETRY_FLUSH_INTERVAL,
+                 max_pending=TELEMETRY_MAX_PENDING, max_backlog=TELEMETRY_MAX_BACKLOG):
+        """
+        Args:
+            address: (host, port) 또는 Unix 소켓 경로
+            flush_interval: 프레임 발행 간격 (초)
+            max_pending: 발행 전 대기열 최대 블록 수
+            max_backlog: 클라이언트별 미전송 바이트 상한
+        """
+        self.address = address
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_backlog = max_backlog
+        self.simulator = None
+        self.cycle_duration = None
+        self.subscription = None
+        self.published = 0                  # 발행한 레코드 수 (솎아내기 전)
+
+        self._subscription_lock = threading.Lock()   # attach()와 발행 스레드의 구독/해제 직렬화
+        self._pending = collections.deque()
+        self._overflow = collections.deque()   # 대기열이 넘쳐 버린 블록의 time (다음 발행 때 버린 수로 보고)
+        self._clients = {}
+        self._selector = selectors.DefaultSelector()
+        if isinstance(address, str) and os.path.exists(address):
+            os.unlink(address)
+        self._listener = socket.socket(_socket_family(address), socket.SOCK_STREAM)
+        if not isinstance(address, str):
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(address)
+        self._listener.listen()
+        self._listener.setblocking(False)
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        if not isinstance(address, str):
+            self.address = self._listener.getsockname()[:2]   # 포트 0이면 실제 포트
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    @property
+    def num_clients(self):
+        """연결된 클라이언트 수"""
+        return len(self._clients)
+
+    def attach(self, simulator):
+        """
+        시뮬레이터 연결 (실제 구독은 첫 클라이언트가 연결될 때)
+
+        Args:
+            simulator: DaisyworldSimulator 인스턴스
+
+        Returns:
+            self
+        """
+        # 낮/밤 타이머는 시작 시점(낮, 타이머 0)부터 일정하게 돌므로 time에서 계산 (compute_astronomical_forcing과 동일)
+        self.cycle_duration = simulator.params['DAY_NIGHT_CYCLE_DURATION']
+        self.simulator = simulator
+        if self._clients:
+            self._subscribe()
+        return self
+
+    def record(self, time, values):
+        """한 스텝 대기열에 추가"""
+        self._push(time, values)
+
+    def extend(self, times, values):
+        """여러 스텝 대기열에 추가"""
+        self._push(times, values)
+
+    def _push(self, times, values):
+        """블록을 대기열에 추가 (가득 차면 가장 오래된 블록을 버리고 그 time을 기록)"""
+        if len(self._pending) >= self.max_pending:
+            try:
+                self._overflow.append(np.atleast_1d(self._pending.popleft()[0]))
+            except IndexError:
+                pass   # 그 사이 발행 스레드가 비움
+        self._pending.append((times, values))
+
+    def _subscribe(self):
+        """시뮬레이터에 구독 (연결된 시뮬레이터가 있고 아직 구독하지 않았을 때)"""
+        with self._subscription_lock:
+            if self.simulator is not None and self.subscription is None:
+                self.subscription = self.simulator.subscribe(self)
+
+    def _unsubscribe(self):
+        """구독 해제 후 남은 대기열 비움"""
+        with self._subscription_lock:
+            if self.subscription is not None:
+                self.simulator.unsubscribe(self.subscription)
+                self.subscription = None
+        self._pending.clear()
+        self._overflow.clear()
+
+    def close(self):
+        """발행 스레드를 멈추고 모든 연결 종료"""
+        self._stop_event.set()
+        self._thread.join()
+        for client in list(self._clients.values()):
+            self._disconnect(client)
+        self._selector.unregister(self._listener)
+        self._listener.close()
+        self._selector.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def _worker(self):
+        """발행 스레드 (연결 수락, 간격 요청 수신, flush 간격마다 인코딩/전송)"""
+        next_flush = time.monotonic() + self.flush_interval
+        while not self._stop_event.is_set():
+            timeout = max(0.0, next_flush - time.monotonic())
+            for key, events in self._selector.select(timeout):
+                if key.fileobj is self._listener:
+                    self._accept()
+                    continue
+                client = key.data
+                if events & selectors.EVENT_READ:
+                    self._receive(client)
+                if events & selectors.EVENT_WRITE and client.sock.fileno() >= 0:
+                    self._send(client)
+            if time.monotonic() >= next_flush:
+                next_flush = time.monotonic() + self.flush_interval
+                records, overflow = self._drain()
+                if records is not None:
+                    for client in list(self._clients.values()):
+                        if len(overflow):
+                            client.dropped += int(np.count_nonzero(overflow % client.decimation == 0))
+                        self._enqueue(client, records)
+                        self._send(client)
+
+    def _accept(self):
+        """새 연결 수락 후 헤더 전송"""
+        try:
+            sock, _ = self._listener.accept()
+        except BlockingIOError:
+            return
+        names = '\n'.join(TELEMETRY_RECORD_DTYPE.names).encode('ascii')
+        header = (_HEADER.pack(TELEMETRY_MAGIC, TELEMETRY_VERSION, TELEMETRY_RECORD_DTYPE.itemsize,
+                               len(TELEMETRY_RECORD_DTYPE.names))
+                  + _LENGTH.pack(len(names)) + names)
+        try:
+            sock.sendall(header)
+        except OSError:
+            sock.close()
+            return
+        sock.setblocking(False)
+        client = _Client(sock)
+        self._clients[sock.fileno()] = client
+        self._selector.register(sock, selectors.EVENT_READ, client)
+        self._subscribe()
+
+    def _receive(self, client):
+        """솎아내기 간격 요청 수신 (연결이 끊기면 정리)"""
+        try:
+            data = client.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self._disconnect(client)
+            return
+        client.inbox += data
+        while len(client.inbox) >= _LENGTH.size:
+            (decimation,), client.inbox = _LENGTH.unpack(client.inbox[:_LENGTH.size]), client.inbox[_LENGTH.size:]
+            client.decimation = max(1, decimation)
+
+    def _disconnect(self, client):
+        """연결 정리"""
+        self._clients.pop(client.sock.fileno(), None)
+        self._selector.unregister(client.sock)
+        client.sock.close()
+        if not self._clients:
+            self._unsubscribe()
+
+    def _drain(self):
+        """
+        대기열의 블록을 모두 꺼내 레코드 배열로 인코딩
+
+        Returns:
+            (TELEMETRY_RECORD_DTYPE 배열 (대기열이 비었으면 None),
+             그 사이 대기열이 넘쳐 버린 레코드의 time 배열)
+        """
+        overflow = [self._overflow.popleft() for _ in range(len(self._overflow))]
+        overflow = np.concatenate(overflow).astype(np.int64) if overflow else np.zeros(0, dtype=np.int64)
+        times, values = [], []
+        for _ in range(len(self._pending)):
+            try:
+                block_times, block_values = self._pending.popleft()
+            except IndexError:
+                break   # 그 사이 시뮬레이터 쪽이 넘친 블록을 버림
+            if isinstance(block_times, np.ndarray):
+                times.append(block_times)
+                values.append(np.asarray(block_values))
+            else:
+                times.append(np.array([block_times]))
+                values.append(np.array(block_values, dtype=np.float64).reshape(-1, 1))
+        if not times:
+            return None, overflow
+        times = np.concatenate(times).astype(np.int64)
+        values = np.concatenate(values, axis=1)
+
+        records = np.empty(len(times), dtype=TELEMETRY_RECORD_DTYPE)
+        records['time'] = times
+        # time 행의 값은 그 스텝의 낮/밤 갱신(time + 1번째) 이후 상태
+        elapsed = times + 1
+        records['day_night_timer'] = elapsed % self.cycle_duration
+        records['is_daytime'] = (elapsed // self.cycle_duration) % 2 == 0
+        for i, name in enumerate(TELEMETRY_FIELDS):
+            records[name] = values[i]
+        self.published += len(records)
+        return records, overflow
+
+    def _enqueue(self, client, records):
+        """클라이언트별 솎아내기 후 프레임 추가 (미전송 바이트가 상한을 넘으면 오래된 프레임부터 버림)"""
+        if client.decimation > 1:
+            records = records[records['time'] % client.decimation == 0]
+        if len(records) == 0:
+            return
+        payload = records.tobytes()
+        while client.backlog + len(payload) > self.max_backlog and len(client.frames) > (1 if client.sent else 0):
+            # 보내는 중인 첫 프레임은 남겨 두어야 스트림이 프레임 경계를 유지함
+            index = 1 if client.sent else 0
+            frame, count, reported = client.frames[index]
+            del client.frames[index]
+            client.backlog -= len(frame)
+            client.dropped += count + reported
+        if client.backlog + len(payload) > self.max_backlog and client.frames:
+            client.dropped += len(records)
+            return
+        frame = _FRAME.pack(len(records), client.dropped) + payload
+        client.frames.append((frame, len(records), client.dropped))
+        client.backlog += len(frame)
+        client.dropped = 0
+
+    def _send(self, client):
+        """막히지 않는 범위에서 대기 프레임 전송"""
+        try:
+            while client.frames:
+                frame = client.frames[0][0]
+                sent = client.sock.send(memoryview(frame)[client.sent:])
+                client.sent += sent
+                client.backlog -= sent
+                if client.sent < len(frame):
+                    break
+                client.frames.popleft()
+                client.sent = 0
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._disconnect(client)
+            return
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.frames else 0)
+        self._selector.modify(client.sock, events, client)
+
+
+class TelemetryClient:
+    """
+    참조 클라이언트 (서버에 연결하여 레코드를 받아 필드별 시계열로 복원)
+    """
+
+    def __init__(self, address=('127.0.0.1', TELEMETRY_PORT), decimation=1, timeout=5.0):
+        """
+        Args:
+            address: (host, port) 또는 Unix 소켓 경로
+            decimation: 솎아내기 간격 (time이 이 값의 배수인 레코드만 받음)
+            timeout: 소켓 대기 시간 (초)
+        """
+        self.sock = socket.socket(_socket_family(address), socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(address)
+        self._buffer = bytearray()   # 받았지만 아직 프레임으로 꺼내지 않은 바이트 (시간 초과 후에도 유지)
+        magic, version, record_size, num_fields = _HEADER.unpack(self._read_exact(_HEADER.size))
+        names = self._read_exact(_LENGTH.unpack(self._read_exact(_LENGTH.size))[0]).decode('ascii').split('\n')
+        if magic != TELEMETRY_MAGIC or version != TELEMETRY_VERSION:
+            raise ValueError(f"지원하지 않는 텔레메트리 스트림입니다: {magic!r} v{version}")
+        if record_size != TELEMETRY_RECORD_DTYPE.itemsize or tuple(names) != TELEMETRY_RECORD_DTYPE.names:
+            raise ValueError("레코드 형식이 클라이언트와 다릅니다")
+        self.dropped = 0
+        self._chunks = []
+        if decimation != 1:
+            self.set_decimation(decimation)
+
+    def set_decimation(self, decimation):
+        """솎아내기 간격 변경 요청"""
+        self.sock.sendall(_LENGTH.pack(decimation))
+
+    def _fill(self, size):
+        """
+        버퍼에 size 바이트 이상 모일 때까지 수신
+        시간 초과(socket.timeout)가 나도 이미 받은 바이트는 버퍼에 남으므로 다시 호출하면 이어서 받음
+        """
+        while len(self._buffer) < size:
+            data = self.sock.recv(max(size - len(self._buffer), 65536))
+            if not data:
+                raise ConnectionError("서버 연결이 끊어졌습니다")
+            self._buffer += data
+
+    def _read_exact(self, size):
+        """정확히 size 바이트 수신"""
+        self._fill(size)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def read_frame(self):
+        """
+        프레임 하나 수신
+        프레임 전체가 모일 때까지 버퍼에서 꺼내지 않으므로, 도중에 시간 초과가 나도 다시 호출하면 스트림이 어긋나지 않음
+
+        Returns:
+            TELEMETRY_RECORD_DTYPE 배열
+        """
+        self._fill(_FRAME.size)
+        count, dropped = _FRAME.unpack_from(self._buffer)
+        frame = self._read_exact(_FRAME.size + count * TELEMETRY_RECORD_DTYPE.itemsize)
+        records = np.frombuffer(frame, dtype=TELEMETRY_RECORD_DTYPE, offset=_FRAME.size)
+        self.dropped += dropped
+        self._chunks.append(records)
+        return records
+
+    def series(self):
+        """
+        지금까지 받은 레코드를 필드별 배열로 복원
+
+        Returns:
+            필드 이름 → 배열 딕셔너리
+        """
+        if self._chunks:
+            records = np.concatenate(self._chunks)
+        else:
+            records = np.empty(0, dtype=TELEMETRY_RECORD_DTYPE)
+        self._chunks = [records]
+        return {name: records[name] for name in TELEMETRY_RECORD_DTYPE.names}
+
+    def close(self):
+        """연결 종료"""
+        self.sock.close()
+
+
+def main():
+    """참조 클라이언트 실행 진입점 (받은 값을 출력하고 선택적으로 .npz 저장)"""
+    parser = argparse.ArgumentParser(description='Attach to a Daisyworld telemetry server and print the received series.')
+    parser.add_argument('address', nargs='?', default=f'127.0.0.1:{TELEMETRY_PORT}',
+                        help='host:port or Unix socket path of the server')
+    parser.add_argument('--decimation', type=int, default=1, help='receive only every Nth step')
+    parser.add_argument('--duration', type=float, default=None, help='detach after N seconds')
+    parser.add_argument('--output', default=None, help='save the reconstructed series to this .npz file')
+    args = parser.parse_args()
+
+    client = TelemetryClient(parse_address(args.address), decimation=args.decimation)
+    start = time.monotonic()
+    received = 0
+    try:
+        while args.duration is None or time.monotonic() - start < args.duration:
+            try:
+                records = client.read_frame()
+            except socket.timeout:
+                continue
+            except ConnectionError:
+                print("Server closed the connection.")
+                break
+            received += len(records)
+            if len(records):
+                last = records[-1]
+                print(f"[step {last['time']}] {'DAY' if last['is_daytime'] else 'NIGHT'} | "
+                      f"T_atm={last['atmosphere_temp']:.2f} K | "
+                      f"black={last['black_daisy']:.4f} white={last['white_daisy']:.4f} | "
+                      f"{received:,} records, {client.dropped:,} dropped", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
+
+    if args.output:
+        np.savez(args.output, **client.series())
+        print(f"Series saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
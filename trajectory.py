@@ -0,0 +1,260 @@
+"""
+시뮬레이션 궤적 파일 저장/읽기 모듈
+청크 단위 열(column) 기반, 추가 전용(append-only) 바이너리 형식
+
+파일 구조:
+    [magic 8바이트][기록된 스텝 수 int64][헤더 길이 int64][JSON 헤더 (64바이트 정렬)]
+    [청크 0][청크 1]...
+각 청크는 (필드 수, chunk_steps) 형태의 float64 배열이며 필드별로 연속 저장된다.
+마지막 청크는 0으로 채워질 수 있으며 유효한 스텝 수는 헤더의 값으로 판단한다.
+"""
+import json
+import os
+import numpy as np
+from simulator import TRAJECTORY_FIELDS, simulation_constants
+
+
+TRAJECTORY_MAGIC = b'DWTRJ001'      # 파일 식별자
+TRAJECTORY_BUFFER_STEPS = 4096      # 한 번에 디스크에 쓰는 스텝 수 (청크 크기)
+TRAJECTORY_ALIGNMENT = 64           # 데이터 시작 위치 정렬 (바이트)
+_PREAMBLE_SIZE = 24                 # magic + 스텝 수 + 헤더 길이
+_NUM_STEPS_OFFSET = 8               # 스텝 수가 저장된 위치
+
+
+def _read_header(f):
+    """
+    파일 앞부분의 헤더 읽기
+
+    Returns:
+        (기록된 스텝 수, 데이터 시작 위치, 헤더 딕셔너리)
+    """
+    preamble = f.read(_PREAMBLE_SIZE)
+    if preamble[:8] != TRAJECTORY_MAGIC:
+        raise ValueError(f"Daisyworld 궤적 파일이 아닙니다: {f.name}")
+    num_steps = int(np.frombuffer(preamble[8:16], dtype='<i8')[0])
+    header_length = int(np.frombuffer(preamble[16:24], dtype='<i8')[0])
+    header = json.loads(f.read(header_length).decode('utf-8'))
+    return num_steps, _PREAMBLE_SIZE + header_length, header
+
+
+class TrajectoryWriter:
+    """
+    시뮬레이션 궤적을 스트리밍으로 기록하는 파일 작성기
+    buffer_steps 스텝을 메모리에 모은 뒤 한 번에 기록하여 쓰기 비용을 분산
+    """
+
+    def __init__(self, path, buffer_steps=TRAJECTORY_BUFFER_STEPS, constants=None, fields=TRAJECTORY_FIELDS):
+        """
+        궤적 파일 생성
+
+        Args:
+            path: 저장할 파일 경로
+            buffer_steps: 청크 크기 (스텝 수)
+            constants: 헤더에 기록할 상수 딕셔너리 (None이면 simulator.py의 상수)
+            fields: 기록할 필드 이름 목록
+        """
+        self.path = path
+        self.fields = tuple(fields)
+        self.chunk_steps = int(buffer_steps)
+        if constants is None:
+            constants = simulation_constants()
+
+        header = json.dumps({
+            'version': 1,
+            'fields': list(self.fields),
+            'chunk_steps': self.chunk_steps,
+            'dtype': '<f8',
+            'constants': constants,
+        }).encode('utf-8')
+        padding = -(_PREAMBLE_SIZE + len(header)) % TRAJECTORY_ALIGNMENT
+        header += b' ' * padding
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._file = open(path, 'wb')
+        self._file.write(TRAJECTORY_MAGIC)
+        self._file.write(np.int64(0).tobytes())
+        self._file.write(np.int64(len(header)).tobytes())
+        self._file.write(header)
+        self._file.flush()
+
+        self._buffer = np.zeros((len(self.fields), self.chunk_steps), dtype='<f8')
+        self._position = 0       # 버퍼 내 현재 위치
+        self.num_steps = 0       # 파일과 버퍼에 기록된 전체 스텝 수
+
+    @classmethod
+    def resume(cls, path, num_steps, pending):
+        """
+        체크포인트 시점부터 기존 궤적 파일에 이어서 기록
+        체크포인트 이후에 기록된 청크는 잘라내고, 체크포인트에 저장된 버퍼를 복원
+
+        Args:
+            path: 기존 궤적 파일 경로
+            num_steps: 체크포인트 시점의 전체 스텝 수 (TrajectoryWriter.num_steps)
+            pending: 체크포인트 시점에 파일에 쓰이지 않았던 버퍼 (pending()의 반환값)
+
+        Returns:
+            TrajectoryWriter 인스턴스
+        """
+        writer = cls.__new__(cls)
+        writer.path = path
+        writer._file = open(path, 'r+b')
+        _, data_offset, header = _read_header(writer._file)
+        writer.fields = tuple(header['fields'])
+        writer.chunk_steps = header['chunk_steps']
+
+        pending = np.asarray(pending, dtype='<f8').reshape(len(writer.fields), -1)
+        flushed_chunks = (num_steps - pending.shape[1]) // writer.chunk_steps
+        writer._file.truncate(data_offset + flushed_chunks * len(writer.fields) * writer.chunk_steps * 8)
+
+        writer._buffer = np.zeros((len(writer.fields), writer.chunk_steps), dtype='<f8')
+        writer._buffer[:, :pending.shape[1]] = pending
+        writer._position = pending.shape[1]
+        writer.num_steps = num_steps
+        writer._update_num_steps()
+        return writer
+
+    def pending(self):
+        """아직 파일에 쓰이지 않은 버퍼 데이터의 복사본 (체크포인트 저장용)"""
+        return self._buffer[:, :self._position].copy()
+
+    def record(self, values):
+        """
+        한 스텝 기록
+
+        Args:
+            values: fields 순서의 값 튜플
+        """
+        self._buffer[:, self._position] = values
+        self._position += 1
+        self.num_steps += 1
+        if self._position == self.chunk_steps:
+            self._write_chunk()
+
+    def extend(self, columns):
+        """
+        여러 스텝을 한 번에 기록
+
+        Args:
+            columns: 필드 이름 → (n,) 배열 딕셔너리 (DaisyworldSimulator.run()의 반환값)
+        """
+        data = np.array([columns[name] for name in self.fields], dtype='<f8')
+        total = data.shape[1]
+        offset = 0
+        while offset < total:
+            count = min(self.chunk_steps - self._position, total - offset)
+            self._buffer[:, self._position:self._position + count] = data[:, offset:offset + count]
+            self._position += count
+            self.num_steps += count
+            offset += count
+            if self._position == self.chunk_steps:
+                self._write_chunk()
+
+    def _write_chunk(self):
+        """버퍼를 청크 하나로 기록하고 헤더의 스텝 수 갱신"""
+        self._file.write(self._buffer.tobytes())
+        self._position = 0
+        self._update_num_steps()
+
+    def _update_num_steps(self):
+        """헤더의 기록된 스텝 수 갱신 (파일에 쓰인 스텝만)"""
+        self._file.seek(_NUM_STEPS_OFFSET)
+        self._file.write(np.int64(self.num_steps - self._position).tobytes())
+        self._file.seek(0, os.SEEK_END)
+        self._file.flush()
+
+    def close(self):
+        """버퍼에 남은 스텝을 0으로 채운 마지막 청크로 기록하고 파일 닫기"""
+        if self._file.closed:
+            return
+        if self._position > 0:
+            self._buffer[:, self._position:] = 0.0
+            self._file.write(self._buffer.tobytes())
+            self._position = 0
+        self._update_num_steps()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TrajectoryReader:
+    """
+    궤적 파일 읽기 (np.memmap 기반, 필요한 부분만 디스크에서 읽음)
+    """
+
+    def __init__(self, path):
+        """
+        궤적 파일 열기
+
+        Args:
+            path: 궤적 파일 경로
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self.num_steps, self._data_offset, header = _read_header(f)
+
+        self.fields = tuple(header['fields'])
+        self.chunk_steps = header['chunk_steps']
+        self.constants = header['constants']
+        self._field_index = {name: i for i, name in enumerate(self.fields)}
+
+        # 파일에 실제로 존재하는 완전한 청크만 매핑
+        chunk_bytes = len(self.fields) * self.chunk_steps * 8
+        available_chunks = (os.path.getsize(path) - self._data_offset) // chunk_bytes
+        num_chunks = min(-(-self.num_steps // self.chunk_steps), available_chunks)
+        self.num_steps = min(self.num_steps, num_chunks * self.chunk_steps)
+        if num_chunks > 0:
+            self._chunks = np.memmap(
+                path, dtype='<f8', mode='r', offset=self._data_offset,
+                shape=(num_chunks, len(self.fields), self.chunk_steps),
+            )
+        else:
+            self._chunks = np.zeros((0, len(self.fields), self.chunk_steps))
+
+    def __len__(self):
+        return self.num_steps
+
+    def column(self, name, start=0, stop=None):
+        """
+        필드의 구간 [start, stop)을 읽어 반환 (해당 구간의 청크만 읽음)
+
+        Args:
+            name: 필드 이름
+            start: 시작 인덱스
+            stop: 끝 인덱스 (None이면 끝까지)
+
+        Returns:
+            (stop - start,) float64 배열
+        """
+        start, stop, _ = slice(start, stop).indices(self.num_steps)
+        if stop <= start:
+            return np.zeros(0)
+        index = self._field_index[name]
+        first_chunk = start // self.chunk_steps
+        last_chunk = (stop - 1) // self.chunk_steps
+        block = self._chunks[first_chunk:last_chunk + 1, index, :].reshape(-1)
+        offset = first_chunk * self.chunk_steps
+        return np.array(block[start - offset:stop - offset])
+
+    def __getitem__(self, name):
+        return self.column(name)
+
+    def iter_chunks(self, name):
+        """
+        필드를 청크 단위 뷰로 순회 (복사 없음, 메모리 사용량 일정)
+
+        Args:
+            name: 필드 이름
+
+        Yields:
+            청크별 1차원 배열 뷰
+        """
+        index = self._field_index[name]
+        for chunk in range(self._chunks.shape[0]):
+            valid = min(self.chunk_steps, self.num_steps - chunk * self.chunk_steps)
+            yield self._chunks[chunk, index, :valid]
@@ -0,0 +1,438 @@
+"""
+오프라인 동영상 내보내기 모듈
+기록된 궤적 파일을 run_pygame_visualization과 같은 그리기 로직(PlanetRenderer)으로 오프스크린 표면에 다시 그려
+PNG 시퀀스 또는 인코더(ffmpeg) 파이프로 내보냄
+
+- 창 없이 SDL dummy 드라이버에서 실행 (pygame.display를 쓰지 않고 폰트 모듈만 초기화)
+- 프레임을 연속된 시간 구간으로 나누어 프로세스 풀에서 병렬로 그림
+  배경 밝기는 구간 시작값을 미리 계산해 넘기고, 데이지 레이어는 건너뛴 프레임의 데이지 변화만 차례로 반영하므로
+  각 작업은 앞 구간의 화면을 그리지 않고도 연속으로 그린 것과 같은 화면을 만듦
+- 인코더 파이프 모드는 작업 프로세스가 공유 메모리 슬롯에 원시 RGB 프레임을 쓰고 부모가 구간 순서대로 인코더에 전달
+  (프레임을 pickle로 주고받지 않으며, 진행 중인 구간 수를 슬롯 수로 제한해 메모리 사용량을 일정하게 유지)
+"""
+import argparse
+import collections
+import multiprocessing
+import os
+import shutil
+import struct
+import subprocess
+import time
+import zlib
+from collections import namedtuple
+from multiprocessing import shared_memory
+import numpy as np
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+from simulator import DaisyworldSimulator, NUM_DAISIES, DAY_NIGHT_CYCLE_DURATION
+from history import SimulationHistory
+from trajectory import TrajectoryReader
+from shared_ring import _attach
+from visualizer_pygame import (PlanetRenderer, generate_terrain, smooth_background_level, SCREEN_WIDTH,
+                               SCREEN_HEIGHT, PLANET_RADIUS_PX, CENTER_X, CENTER_Y)
+
+
+# 동영상 내보내기 설정
+VIDEO_FPS = 20                     # 동영상 초당 프레임 수 (실시간 창의 기본 시뮬레이션 속도와 같음)
+VIDEO_CHUNK_FRAMES = 16            # 작업 하나가 그리는 연속 프레임 수 (인코더 파이프 모드)
+VIDEO_PENDING_CHUNKS = 2           # 인코더 파이프 모드에서 프로세스당 미리 그려 둘 구간 수 (공유 메모리 슬롯 수)
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.mov', '.webm', '.avi')   # 인코더로 내보내는 출력 확장자
+VIDEO_PROGRESS_INTERVAL = 5.0      # 진행 상황 출력 주기 (초)
+VIDEO_READ_ROWS = 1 << 20          # 건너뛴 프레임의 데이지 변화를 반영할 때 한 번에 읽는 최대 궤적 행 수
+FRAME_BYTES = SCREEN_WIDTH * SCREEN_HEIGHT * 3   # 원시 RGB24 프레임 하나의 크기
+PNG_COMPRESSION_LEVEL = 1          # PNG zlib 압축 수준 (pygame.image.save의 최대 압축보다 약 4배 빠르고 크기는 비슷함)
+
+# 궤적 필드 → 화면 상태 속성 (PlanetRenderer가 읽는 SimulationSnapshot 속성 이름)
+FRAME_COLUMNS = {
+    'solar_intensity': 'solar_intensity',
+    'eccentricity': 'eccentricity',
+    'obliquity': 'obliquity',
+    'precession_angle': 'precession_angle',
+    'atmosphere_temp': 'temperature_atmosphere',
+    'ocean_temp': 'temperature_ocean',
+    'land_temp': 'temperature_land',
+    'black_daisy': 'area_black_daisy',
+    'white_daisy': 'area_white_daisy',
+    'o2': 'o2_concentration',
+    'co2': 'co2_concentration',
+    'ch4': 'ch4_concentration',
+    'h2o': 'h2o_concentration',
+    'greenhouse_effect': 'greenhouse_effect',
+}
+
+FrameState = namedtuple('FrameState', ('current_time', 'day_night_timer', 'is_daytime')
+                        + tuple(FRAME_COLUMNS.values()) + ('daisy_positions', 'daisy_order'))
+FrameState.__doc__ = """궤적 한 행을 PlanetRenderer가 그릴 수 있는 형태로 바꾼 화면 상태"""
+
+# 작업 프로세스별 그리기 상태 (_init_worker에서 설정, 여러 구간에 걸쳐 재사용)
+_WORKER = None
+
+
+def ffmpeg_command(output, fps=VIDEO_FPS, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+    """
+    표준 입력의 원시 RGB24 프레임을 H.264로 인코딩하는 ffmpeg 명령
+
+    Args:
+        output: 출력 동영상 파일 경로
+        fps: 초당 프레임 수
+        width: 프레임 너비
+        height: 프레임 높이
+
+    Returns:
+        subprocess에 넘길 인자 리스트
+    """
+    return [
+        'ffmpeg', '-y', '-loglevel', 'error',
+        '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+        '-c:v', 'libx264', '-pix_fmt', 'yuv420p', output,
+    ]
+
+
+def frame_rows(num_steps, start=0, stop=None, stride=1):
+    """
+    프레임별 궤적 행 번호
+
+    Args:
+        num_steps: 궤적의 스텝 수
+        start: 첫 행
+        stop: 끝 행 (포함하지 않음, None이면 끝까지)
+        stride: 프레임 사이의 스텝 간격
+
+    Returns:
+        range
+    """
+    if stride < 1:
+        raise ValueError(f"stride는 1 이상이어야 합니다: {stride}")
+    return range(*slice(start, stop, stride).indices(num_steps))
+
+
+def background_levels(solar_intensity, initial=255):
+    """
+    프레임별 배경 밝기의 시작값 (각 프레임을 그리기 직전의 값, PlanetRenderer와 같은 점진적 변화)
+
+    Args:
+        solar_intensity: (프레임 수,) 태양 강도 배열
+        initial: 첫 프레임 직전의 배경 밝기
+
+    Returns:
+        (프레임 수,) 배열
+    """
+    levels = np.empty(len(solar_intensity))
+    level = initial
+    for i, intensity in enumerate(solar_intensity.tolist()):
+        levels[i] = level
+        level = smooth_background_level(level, intensity)
+    return levels
+
+
+def write_png(path, rgb, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, level=PNG_COMPRESSION_LEVEL):
+    """
+    원시 RGB24 프레임을 PNG 파일로 저장 (필터 없음, 빠른 zlib 압축)
+
+    Args:
+        path: 저장할 파일 경로
+        rgb: 행 우선 RGB24 바이트열 (pygame.image.tobytes(surface, 'RGB'))
+        width: 프레임 너비
+        height: 프레임 높이
+        level: zlib 압축 수준
+    """
+    # 각 행 앞에 필터 종류 바이트(0 = 없음)를 붙임
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = np.frombuffer(rgb, dtype=np.uint8).reshape(height, width * 3)
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(rows.tobytes(), level)))
+        f.write(chunk(b'IEND', b''))
+
+
+def _init_worker(path, rows, terrain_points, daisy_positions, daisy_order, cycle_duration, png_directory,
+                 frame_buffer=None, slot_frames=0):
+    """
+    작업 프로세스 초기화 (궤적 파일 열기, 오프스크린 표면과 정적 레이어 준비)
+    frame_buffer는 인코더 파이프 모드에서 프레임을 써 넣을 버퍼 (공유 메모리 이름 또는 현재 프로세스의 bytearray)
+    """
+    global _WORKER
+    pygame.font.init()
+    shm = None
+    if isinstance(frame_buffer, str):
+        shm = _attach(frame_buffer)
+        frame_buffer = shm.buf
+    _WORKER = {
+        'reader': TrajectoryReader(path),
+        'rows': rows,
+        'renderer': PlanetRenderer(terrain_points),
+        'surface': pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)),
+        'daisy_positions': daisy_positions,
+        'daisy_order': daisy_order,
+        'cycle_duration': cycle_duration,
+        'png_directory': png_directory,
+        'position': 0,          # 데이지 레이어에 반영된 프레임 수
+        'shm': shm,             # 연결된 공유 메모리 (작업 프로세스가 끝날 때까지 유지)
+        'frames': frame_buffer,
+        'slot_bytes': slot_frames * FRAME_BYTES,
+    }
+
+
+def _read_frames(worker, names, first, last):
+    """프레임 구간 [first, last)에 해당하는 궤적 행만 필드별로 읽음 (메모리 맵)"""
+    rows = worker['rows'][first:last]
+    return {name: worker['reader'].column(name, rows.start, rows.stop)[::rows.step] for name in names}
+
+
+def _replay_daisies(worker, first):
+    """
+    이 작업 프로세스가 그리지 않은 앞 프레임들의 데이지 변화를 데이지 레이어에 차례로 반영
+    (원이 겹치는 부분은 그린 순서에 따라 달라지므로, 구간을 어떻게 나눠도 연속으로 그린 것과 같은 화면이 되도록 함)
+    """
+    renderer = worker['renderer']
+    if worker['position'] > first:
+        # 앞으로 되돌아가면 데이지 레이어를 처음부터 다시 만듦
+        renderer.daisy_states = None
+        worker['position'] = 0
+    block = max(1, VIDEO_READ_ROWS // worker['rows'].step)
+    for start in range(worker['position'], first, block):
+        columns = _read_frames(worker, ('black_daisy', 'white_daisy'), start, min(start + block, first))
+        for black, white in zip(columns['black_daisy'].tolist(), columns['white_daisy'].tolist()):
+            renderer.update_daisies(worker['daisy_positions'], worker['daisy_order'], black, white)
+    worker['position'] = first
+
+
+def _render_range(task):
+    """
+    연속된 프레임 구간 그리기
+
+    Args:
+        task: (첫 프레임 번호, 끝 프레임 번호, 첫 프레임 직전의 배경 밝기,
+               프레임 버퍼의 슬롯 번호 (PNG 모드면 None))
+
+    Returns:
+        (슬롯 번호, 그린 프레임 수)
+    """
+    first, last, level, slot = task
+    worker = _WORKER
+    renderer = worker['renderer']
+    surface = worker['surface']
+    _replay_daisies(worker, first)
+
+    columns = _read_frames(worker, ('time',) + tuple(FRAME_COLUMNS), first, last)
+    # time 행의 값은 그 스텝의 낮/밤 갱신(time + 1번째) 이후 상태
+    elapsed = columns['time'].astype(np.int64) + 1
+    timers = (elapsed % worker['cycle_duration']).tolist()
+    daytime = ((elapsed // worker['cycle_duration']) % 2 == 0).tolist()
+    values = [columns[name].tolist() for name in FRAME_COLUMNS]
+
+    renderer.reset(level)
+    for i, current_time in enumerate(elapsed.tolist()):
+        state = FrameState(current_time, timers[i], daytime[i], *(column[i] for column in values),
+                           daisy_positions=worker['daisy_positions'], daisy_order=worker['daisy_order'])
+        renderer.draw(surface, state)
+        rgb = pygame.image.tobytes(surface, 'RGB')
+        if worker['png_directory'] is not None:
+            write_png(os.path.join(worker['png_directory'], f'frame_{first + i:06d}.png'), rgb)
+        else:
+            # 원시 프레임은 pickle로 돌려보내지 않고 슬롯에 바로 기록 (부모가 그대로 인코더에 씀)
+            offset = slot * worker['slot_bytes'] + i * FRAME_BYTES
+            worker['frames'][offset:offset + FRAME_BYTES] = rgb
+    worker['position'] = last
+    return slot, last - first
+
+
+class _Progress:
+    """일정 주기로 진행 상황 출력"""
+
+    def __init__(self, total, interval):
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.start = time.perf_counter()
+        self._next = self.start + interval if interval else None
+
+    def advance(self, count):
+        self.done += count
+        now = time.perf_counter()
+        if self._next is not None and now >= self._next:
+            rate = self.done / (now - self.start)
+            print(f"[{self.done}/{self.total} frames] {rate:,.0f} frames/s", flush=True)
+            self._next = now + self.interval
+
+
+def export_video(path, output, fps=VIDEO_FPS, start=0, stop=None, stride=1, num_daisies=NUM_DAISIES, seed=0,
+                 processes=None, chunk_frames=VIDEO_CHUNK_FRAMES, encoder=None,
+                 progress_interval=VIDEO_PROGRESS_INTERVAL):
+    """
+    궤적 파일을 행성 화면 동영상으로 내보냄 (궤적 한 행 = 프레임 하나, stride로 솎아냄)
+
+    Args:
+        path: 궤적 파일 경로 (headless.py --trajectory로 기록)
+        output: PNG 시퀀스를 저장할 디렉토리, 또는 동영상 파일 경로 (VIDEO_EXTENSIONS, ffmpeg로 인코딩)
+        fps: 동영상 초당 프레임 수
+        start: 첫 궤적 행
+        stop: 끝 궤적 행 (포함하지 않음, None이면 끝까지)
+        stride: 프레임 사이의 스텝 간격
+        num_daisies: 데이지 개수 (데이지 위치/배정 순서는 seed로 DaisyworldSimulator와 같은 방식으로 생성)
+        seed: 데이지 위치/배정 순서와 지형의 난수 시드
+        processes: 프로세스 수 (None이면 CPU 코어 수, 1이면 현재 프로세스에서 순차 실행)
+        chunk_frames: 인코더 파이프 모드에서 작업 하나가 그리는 프레임 수
+        encoder: 원시 RGB24 프레임을 표준 입력으로 받는 인코더 명령 (None이면 ffmpeg_command(output, fps))
+        progress_interval: 진행 상황 출력 주기 (초, None이면 출력 안 함)
+
+    Returns:
+        내보낸 프레임 수
+    """
+    reader = TrajectoryReader(path)
+    rows = frame_rows(len(reader), start, stop, stride)
+    total = len(rows)
+    if total == 0:
+        raise ValueError(f"내보낼 프레임이 없습니다: {path}")
+    cycle_duration = int(reader.constants.get('DAY_NIGHT_CYCLE_DURATION', DAY_NIGHT_CYCLE_DURATION))
+
+    # 모든 작업 프로세스가 같은 지형과 데이지 배치를 그리도록 부모에서 한 번만 생성
+    layout = DaisyworldSimulator(planet_radius_px=PLANET_RADIUS_PX, center_x=CENTER_X, center_y=CENTER_Y,
+                                 history=SimulationHistory(capacity=1, index=False), num_daisies=num_daisies,
+                                 seed=seed)
+    terrain_points = generate_terrain(800, np.random.default_rng(seed))
+
+    # 구간별 배경 밝기 시작값 (프레임별 태양 강도만 읽어 순차 계산, 그리기보다 훨씬 가벼움)
+    levels = background_levels(reader.column('solar_intensity', rows.start, rows.stop)[::stride])
+
+    png_directory = None
+    if os.path.splitext(output)[1].lower() not in VIDEO_EXTENSIONS and encoder is None:
+        png_directory = output
+        os.makedirs(png_directory, exist_ok=True)
+    elif encoder is None:
+        encoder = ffmpeg_command(output, fps)
+
+    processes = processes or os.cpu_count() or 1
+    if png_directory is not None:
+        # PNG는 작업마다 파일로 바로 쓰므로 순서와 무관, 코어당 여러 구간으로 나눠 부하를 고르게 분산
+        chunk_frames = max(1, -(-total // (processes * 4)))
+    firsts = range(0, total, chunk_frames)
+    parallel = processes > 1 and len(firsts) > 1
+
+    # 인코더 파이프 모드: 구간별 슬롯을 순환하며 사용 (병렬이면 공유 메모리, 아니면 슬롯 하나)
+    window = processes * VIDEO_PENDING_CHUNKS if parallel else 1
+    shm = None
+    frame_buffer = None
+    if png_directory is None:
+        if parallel:
+            shm = shared_memory.SharedMemory(create=True, size=window * chunk_frames * FRAME_BYTES)
+            frame_buffer = shm.name
+        else:
+            frame_buffer = bytearray(chunk_frames * FRAME_BYTES)
+    tasks = [(first, min(first + chunk_frames, total), levels[first], None if png_directory else i % window)
+             for i, first in enumerate(firsts)]
+    initargs = (path, rows, terrain_points, layout.daisy_positions, layout.daisy_order, cycle_duration,
+                png_directory, frame_buffer, chunk_frames)
+    progress = _Progress(total, progress_interval)
+
+    pool = None
+    encoder_process = None
+    frames = None
+    try:
+        if not parallel:
+            _init_worker(*initargs)
+            results = map(_render_range, tasks)
+        else:
+            pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=initargs)
+            if png_directory is not None:
+                results = pool.imap_unordered(_render_range, tasks)
+            else:
+                results = _ordered_window(pool, tasks, window)
+
+        if png_directory is not None:
+            for _, count in results:
+                progress.advance(count)
+        else:
+            frames = memoryview(shm.buf if shm is not None else frame_buffer)
+            directory = os.path.dirname(output)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            encoder_process = subprocess.Popen(encoder, stdin=subprocess.PIPE)
+            closed_early = False
+            try:
+                for slot, count in results:
+                    offset = slot * chunk_frames * FRAME_BYTES
+                    encoder_process.stdin.write(frames[offset:offset + count * FRAME_BYTES])
+                    progress.advance(count)
+                encoder_process.stdin.close()
+            except BrokenPipeError:
+                closed_early = True
+            if encoder_process.wait() != 0 or closed_early:
+                raise RuntimeError(f"인코더가 비정상 종료되었습니다 (상태 {encoder_process.returncode}): {' '.join(encoder)}")
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if encoder_process is not None and encoder_process.poll() is None:
+            encoder_process.kill()
+            encoder_process.wait()
+        if frames is not None:
+            frames.release()
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+    return total
+
+
+def _ordered_window(pool, tasks, window):
+    """
+    작업 결과를 순서대로 돌려주되, 동시에 진행 중인 작업이 window개를 넘지 않도록 제출
+    (다음 작업은 앞 결과의 슬롯을 다 쓴 뒤, 즉 호출한 쪽이 다음 결과를 요청할 때 제출하므로 슬롯이 겹치지 않음,
+    Pool.imap은 인코더가 느려도 결과를 계속 쌓으므로 사용하지 않음)
+    """
+    pending = collections.deque()
+    tasks = iter(tasks)
+    for task in tasks:
+        pending.append(pool.apply_async(_render_range, (task,)))
+        if len(pending) >= window:
+            break
+    while pending:
+        yield pending.popleft().get()
+        task = next(tasks, None)
+        if task is not None:
+            pending.append(pool.apply_async(_render_range, (task,)))
+
+
+def main():
+    """동영상 내보내기 진입점"""
+    parser = argparse.ArgumentParser(description='Render a recorded Daisyworld trajectory to a PNG sequence or a video.')
+    parser.add_argument('trajectory', help='trajectory file written by headless.py --trajectory')
+    parser.add_argument('output', help='PNG output directory, or a video file (%s) encoded with ffmpeg'
+                        % ', '.join(VIDEO_EXTENSIONS))
+    parser.add_argument('--fps', type=int, default=VIDEO_FPS, help='video frame rate')
+    parser.add_argument('--start', type=int, default=0, help='first trajectory row')
+    parser.add_argument('--stop', type=int, default=None, help='last trajectory row (exclusive)')
+    parser.add_argument('--stride', type=int, default=1, help='trajectory rows per frame')
+    parser.add_argument('--daisies', type=int, default=NUM_DAISIES, help='number of daisies to draw')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the daisy layout and terrain')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--chunk-frames', type=int, default=VIDEO_CHUNK_FRAMES,
+                        help='consecutive frames per task when piping to the encoder')
+    args = parser.parse_args()
+
+    if os.path.splitext(args.output)[1].lower() in VIDEO_EXTENSIONS and shutil.which('ffmpeg') is None:
+        parser.error('ffmpeg not found on PATH (write a PNG sequence by giving a directory instead)')
+
+    start = time.perf_counter()
+    try:
+        frames = export_video(args.trajectory, args.output, fps=args.fps, start=args.start, stop=args.stop,
+                              stride=args.stride, num_daisies=args.daisies, seed=args.seed,
+                              processes=args.processes, chunk_frames=args.chunk_frames)
+    except ValueError as error:
+        parser.error(str(error))
+    elapsed = time.perf_counter() - start
+    print(f"{frames} frames in {elapsed:.1f} s ({frames / elapsed:,.0f} frames/s, "
+          f"{frames / elapsed / args.fps:.1f}x real time at {args.fps} FPS)")
+    print(f"Video saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
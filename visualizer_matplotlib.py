@@ -4,16 +4,50 @@ Matplotlib을 이용한 그래프 시각화 및 저장 모듈
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from datetime import datetime
+import multiprocessing
 import os
 from simulator import OPTIMAL_TEMPERATURE
+from history import SimulationHistory
+from shared_ring import SharedRingBuffer, SharedRingReader, SHARED_RING_CAPACITY
+import numpy as np
 
 
-def run_matplotlib_graphs(simulator):
+SAVE_GRAPH_POINTS = 3600           # 저장 그래프의 점 수 (그림 폭 12인치 × 300 DPI)
+GRAPH_FIELDS = ('black_daisy', 'white_daisy', 'temperature', 'co2', 'ch4', 'h2o')  # 실시간 그래프가 쓰는 필드
+GRAPH_HISTORY_CAPACITY = 1 << 19   # 그래프 프로세스가 유지하는 최근 샘플 수 (링 버퍼, 이보다 오래된 구간은 그래프에서 사라짐)
+
+
+def _envelope(history, name, num_points, scale=1.0):
     """
-    Matplotlib으로 실시간 그래프 표시
+    기록 인덱스에서 필드를 num_points개 구간의 최솟값/최댓값으로 조회하여
+    구간마다 (최솟값, 최댓값) 두 점을 잇는 선 데이터로 변환
+
+    Args:
+        history: SimulationHistory 또는 HistorySnapshot
+        name: 필드 이름
+        num_points: 구간 수 (보통 축의 픽셀 폭)
+        scale: 값에 곱할 배율
+
+    Returns:
+        (x 배열, y 배열)
+    """
+    times, mins, maxs, _ = history.query(name, num_points=num_points)
+    x = np.repeat(times, 2)
+    y = np.empty(len(x))
+    y[0::2] = mins
+    y[1::2] = maxs
+    return x, y * scale
+
+
+def create_live_graphs(simulator):
+    """
+    실시간 그래프 Figure와 애니메이션 콜백 생성
     
     Args:
-        simulator: DaisyworldSimulator 인스턴스
+        simulator: DaisyworldSimulator 인스턴스 (또는 history 속성을 가진 기록 공급원)
+    
+    Returns:
+        (fig, init, animate) - FuncAnimation에 넘기는 Figure와 초기화/갱신 함수
     """
     fig, (ax_population, ax_temperature, ax_greenhouse) = plt.subplots(3, 1, figsize=(10, 12))
     fig.suptitle('Daisyworld Real-time Statistics', fontsize=16, fontweight='bold')
@@ -54,6 +88,9 @@ def run_matplotlib_graphs(simulator):
     
     plt.tight_layout()
     
+    # 축의 픽셀 폭만큼의 구간으로 조회 (그리는 점의 수가 실행 시간과 무관하게 일정)
+    axis_width_px = int(ax_population.get_window_extent().width)
+    
     def init():
         """애니메이션 초기화"""
         line_black.set_data([], [])
@@ -66,9 +103,12 @@ def run_matplotlib_graphs(simulator):
     
     def animate(frame):
         """애니메이션 업데이트"""
-        if len(simulator.history_time) > 0:
-            # X축 범위 동적 조정
-            current_max = max(simulator.history_time) if simulator.history_time else 200
+        # 이 프로세스(스레드)만 기록을 쓰므로 복사 없이 현재 뷰와 인덱스를 그대로 읽음 (프레임 비용이 기록 길이와 무관)
+        history = simulator.history.local_snapshot()
+        history_time = history['time']
+        if len(history_time) > 0:
+            # X축 범위 동적 조정 (시간은 단조 증가하므로 마지막 값이 최대값)
+            current_max = history_time[-1]
             if current_max > 200:
                 ax_population.set_xlim(0, current_max + 10)
                 ax_temperature.set_xlim(0, current_max + 10)
@@ -76,28 +116,39 @@ def run_matplotlib_graphs(simulator):
                 # X축 범위가 변경되었으므로 figure를 다시 그림
                 fig.canvas.draw_idle()
             
-            line_black.set_data(simulator.history_time, simulator.history_black_daisy)
-            line_white.set_data(simulator.history_time, simulator.history_white_daisy)
-            line_temp.set_data(simulator.history_time, simulator.history_temperature)
+            # 피라미드 인덱스에서 픽셀 폭만큼의 최소/최대 구간만 조회
+            line_black.set_data(*_envelope(history, 'black_daisy', axis_width_px))
+            line_white.set_data(*_envelope(history, 'white_daisy', axis_width_px))
+            line_temp.set_data(*_envelope(history, 'temperature', axis_width_px))
             
             # 온실가스 데이터 업데이트
-            line_co2.set_data(simulator.history_time, simulator.history_co2)
-            line_ch4.set_data(simulator.history_time, simulator.history_ch4)
+            line_co2.set_data(*_envelope(history, 'co2', axis_width_px))
+            line_ch4.set_data(*_envelope(history, 'ch4', axis_width_px))
             # H2O는 값이 크므로 10으로 나눠서 표시
-            h2o_scaled = [h / 10 for h in simulator.history_h2o]
-            line_h2o.set_data(simulator.history_time, h2o_scaled)
+            line_h2o.set_data(*_envelope(history, 'h2o', axis_width_px, scale=0.1))
             
             # Y축 자동 조정 (온실가스)
-            if len(simulator.history_co2) > 10:
-                recent_data = min(100, len(simulator.history_co2))
-                max_co2 = max(simulator.history_co2[-recent_data:])
-                max_ch4 = max(simulator.history_ch4[-recent_data:])
-                max_h2o_scaled = max(h2o_scaled[-recent_data:]) if h2o_scaled else 0
+            if len(history_time) > 10:
+                recent_data = min(100, len(history_time))
+                max_co2 = history['co2'][-recent_data:].max()
+                max_ch4 = history['ch4'][-recent_data:].max()
+                max_h2o_scaled = history['h2o'][-recent_data:].max() / 10
                 y_max = max(max_co2, max_ch4, max_h2o_scaled) * 1.2
                 ax_greenhouse.set_ylim(0, y_max)
         
         return line_black, line_white, line_temp, line_co2, line_ch4, line_h2o
     
+    return fig, init, animate
+
+
+def run_matplotlib_graphs(simulator):
+    """
+    Matplotlib으로 실시간 그래프 표시
+    
+    Args:
+        simulator: DaisyworldSimulator 인스턴스 (또는 history 속성을 가진 기록 공급원)
+    """
+    fig, init, animate = create_live_graphs(simulator)
     anim = animation.FuncAnimation(
         fig, 
         animate, 
@@ -110,13 +161,105 @@ def run_matplotlib_graphs(simulator):
     plt.show()
 
 
-def save_graphs(simulator, output_dir='results'):
+class _RingHistorySource:
     """
-    시뮬레이션 결과 그래프를 파일로 저장
+    그래프 프로세스에서 공유 메모리 링의 새 샘플을 자체 기록 저장소(인덱스 포함)로 옮기는 기록 공급원
+    create_live_graphs에는 simulator 대신 전달 (history 속성만 사용)
+    자체 기록 저장소는 고정 용량 링 버퍼이므로 메모리가 실행 시간에 따라 늘지 않는 대신,
+    그래프에는 최근 capacity개 샘플 구간만 표시됨 (전체 구간은 시뮬레이터 쪽 기록/save_graphs로 확인)
+    """
+
+    def __init__(self, spec, capacity=GRAPH_HISTORY_CAPACITY):
+        """
+        Args:
+            spec: SharedRingBuffer.spec()의 값 (name, fields, capacity)
+            capacity: 그래프에 유지할 최근 샘플 수
+        """
+        self.reader = SharedRingReader(*spec)
+        self._history = SimulationHistory(capacity=capacity, ring=True, fields=self.reader.fields)
+
+    @property
+    def history(self):
+        """링에서 새 샘플을 가져온 뒤의 기록 저장소"""
+        times, values = self.reader.read()
+        if len(times):
+            self._history.extend(times, values)
+        return self._history
+
+    def close(self):
+        """링 연결 해제"""
+        self.reader.close()
+
+
+def _run_graph_process(spec, history_capacity):
+    """그래프 프로세스 진입점 (spawn으로 시작되므로 모듈 최상위 함수)"""
+    source = _RingHistorySource(spec, history_capacity)
+    try:
+        run_matplotlib_graphs(source)
+    finally:
+        source.close()
+
+
+def start_graph_process(simulator, capacity=SHARED_RING_CAPACITY, history_capacity=GRAPH_HISTORY_CAPACITY):
+    """
+    실시간 그래프를 별도 프로세스에서 실행
+    시뮬레이터에 공유 메모리 링을 구독시키고, 그래프 프로세스는 링에서 새 샘플만 읽음
+    (프레임마다 pickle/복사 전송이 없고, 그래프 그리기가 시뮬레이션/pygame과 GIL을 나누지 않음)
     
     Args:
         simulator: DaisyworldSimulator 인스턴스
+        capacity: 링 용량 (샘플 수)
+        history_capacity: 그래프 프로세스가 유지할 최근 샘플 수 (그래프의 표시 구간)
+    
+    Returns:
+        (process, ring) - 종료 시 process.terminate()와 ring.close()(구독 해제 후) 호출
+    """
+    ring = SharedRingBuffer(GRAPH_FIELDS, capacity)
+    simulator.subscribe(ring)
+    
+    # 지금까지의 기록을 먼저 넣어 그래프가 처음부터 이어지도록 함
+    snapshot = simulator.history.snapshot()
+    if len(snapshot['time']):
+        ring.extend(snapshot['time'], np.array([snapshot[name] for name in GRAPH_FIELDS]))
+    
+    process = multiprocessing.get_context('spawn').Process(
+        target=_run_graph_process, args=(ring.spec(), history_capacity), daemon=True)
+    process.start()
+    return process, ring
+
+
+def _draw_fan(ax, summary, name, color, label, scale=1.0):
+    """
+    앙상블 통계의 팬 차트 (바깥쪽 분위 쌍부터 안쪽으로 점점 진한 띠 + 중앙값 선)
+
+    Args:
+        ax: 그릴 축
+        summary: StreamingEnsembleStats.summary()의 결과
+        name: 필드 이름
+        color: 띠/선 색상
+        label: 범례 이름
+        scale: 값에 곱할 배율
+    """
+    times = summary['time']
+    fractions = summary['quantile_fractions']
+    quantiles = summary[f'{name}_quantiles'] * scale
+    num_bands = len(fractions) // 2
+    for i in range(num_bands):
+        band_label = f'{label} {fractions[i]:.0%}-{fractions[-1 - i]:.0%}' if i == 0 else None
+        ax.fill_between(times, quantiles[i], quantiles[-1 - i], color=color, alpha=0.15 + 0.15 * i,
+                        linewidth=0, label=band_label)
+    if len(fractions) % 2:
+        ax.plot(times, quantiles[num_bands], color=color, linewidth=1.5, label=f'{label} median')
+
+
+def save_graphs(simulator, output_dir='results', ensemble_stats=None):
+    """
+    시뮬레이션 결과 그래프를 파일로 저장
+    
+    Args:
+        simulator: DaisyworldSimulator 인스턴스 (ensemble_stats만 그릴 때는 None)
         output_dir: 저장할 디렉토리 경로
+        ensemble_stats: StreamingEnsembleStats (지정하면 앙상블 분위수 팬 차트를 함께 그림)
         
     Returns:
         저장된 파일 경로
@@ -130,11 +273,30 @@ def save_graphs(simulator, output_dir='results'):
     
     # Figure 생성 (3개 그래프)
     fig, (ax_population, ax_temperature, ax_greenhouse) = plt.subplots(3, 1, figsize=(12, 14))
-    fig.suptitle(f'Daisyworld Simulation Results\n{timestamp}', fontsize=16, fontweight='bold')
+    title = 'Daisyworld Simulation Results' if simulator is not None else 'Daisyworld Ensemble Results'
+    fig.suptitle(f'{title}\n{timestamp}', fontsize=16, fontweight='bold')
+    
+    # 앙상블 팬 차트 (단일 실행 선 아래에 그림)
+    if ensemble_stats is not None:
+        summary = ensemble_stats.summary()
+        _draw_fan(ax_population, summary, 'black_daisy', 'black', 'Black Daisy')
+        _draw_fan(ax_population, summary, 'white_daisy', 'lightblue', 'White Daisy')
+        _draw_fan(ax_temperature, summary, 'temperature', 'red', 'Planet Temp')
+        _draw_fan(ax_greenhouse, summary, 'co2', 'brown', 'CO2')
+        _draw_fan(ax_greenhouse, summary, 'ch4', 'orange', 'CH4')
+        _draw_fan(ax_greenhouse, summary, 'h2o', 'blue', 'H2O (÷10)', scale=0.1)
+    
+    if simulator is not None:
+        # 전체 기록을 그림 해상도만큼의 최소/최대 구간으로 조회 (원본 점을 모두 그리지 않음)
+        history = simulator.history
+        ax_population.plot(*_envelope(history, 'black_daisy', SAVE_GRAPH_POINTS), 'k-', linewidth=2, label='Black Daisy')
+        ax_population.plot(*_envelope(history, 'white_daisy', SAVE_GRAPH_POINTS), color='lightblue', linewidth=2, label='White Daisy')
+        ax_temperature.plot(*_envelope(history, 'temperature', SAVE_GRAPH_POINTS), 'r-', linewidth=2, label='Planet Temp')
+        ax_greenhouse.plot(*_envelope(history, 'co2', SAVE_GRAPH_POINTS), color='brown', linewidth=2, label='CO2')
+        ax_greenhouse.plot(*_envelope(history, 'ch4', SAVE_GRAPH_POINTS), color='orange', linewidth=2, label='CH4')
+        ax_greenhouse.plot(*_envelope(history, 'h2o', SAVE_GRAPH_POINTS, scale=0.1), color='blue', linewidth=2, label='H2O (÷10)')
     
     # 개체수 그래프
-    ax_population.plot(simulator.history_time, simulator.history_black_daisy, 'k-', linewidth=2, label='Black Daisy')
-    ax_population.plot(simulator.history_time, simulator.history_white_daisy, color='lightblue', linewidth=2, label='White Daisy')
     ax_population.set_xlabel('Time (steps)', fontsize=12)
     ax_population.set_ylabel('Population Area', fontsize=12)
     ax_population.set_title('Daisy Population Over Time', fontsize=13, fontweight='bold')
@@ -142,7 +304,6 @@ def save_graphs(simulator, output_dir='results'):
     ax_population.legend(loc='best')
     
     # 온도 그래프
-    ax_temperature.plot(simulator.history_time, simulator.history_temperature, 'r-', linewidth=2, label='Planet Temp')
     ax_temperature.axhline(y=OPTIMAL_TEMPERATURE, color='green', linestyle='--', alpha=0.5, linewidth=2, label='Optimal Temp')
     ax_temperature.set_xlabel('Time (steps)', fontsize=12)
     ax_temperature.set_ylabel('Temperature (K)', fontsize=12)
@@ -151,10 +312,6 @@ def save_graphs(simulator, output_dir='results'):
     ax_temperature.legend(loc='best')
     
     # 온실가스 그래프
-    ax_greenhouse.plot(simulator.history_time, simulator.history_co2, color='brown', linewidth=2, label='CO2')
-    ax_greenhouse.plot(simulator.history_time, simulator.history_ch4, color='orange', linewidth=2, label='CH4')
-    h2o_scaled = [h / 10 for h in simulator.history_h2o]
-    ax_greenhouse.plot(simulator.history_time, h2o_scaled, color='blue', linewidth=2, label='H2O (÷10)')
     ax_greenhouse.set_xlabel('Time (steps)', fontsize=12)
     ax_greenhouse.set_ylabel('Concentration (ppm)', fontsize=12)
     ax_greenhouse.set_title('Greenhouse Gases Over Time', fontsize=13, fontweight='bold')
@@ -164,16 +321,20 @@ def save_graphs(simulator, output_dir='results'):
     plt.tight_layout()
     
     # 파일 저장
-    filename = os.path.join(output_dir, f'daisyworld_simulation_{timestamp}.png')
+    prefix = 'daisyworld_simulation' if simulator is not None else 'daisyworld_ensemble'
+    filename = os.path.join(output_dir, f'{prefix}_{timestamp}.png')
     plt.savefig(filename, dpi=300, bbox_inches='tight')
     plt.close()
     
     print(f"\n{'='*60}")
     print(f"Graph saved: {filename}")
-    print(f"Total simulation steps: {simulator.current_time}")
-    print(f"Final temperature: {simulator.temperature_planet:.2f} K")
-    print(f"Final black daisy area: {simulator.area_black_daisy:.4f}")
-    print(f"Final white daisy area: {simulator.area_white_daisy:.4f}")
+    if simulator is not None:
+        print(f"Total simulation steps: {simulator.current_time}")
+        print(f"Final temperature: {simulator.temperature_planet:.2f} K")
+        print(f"Final black daisy area: {simulator.area_black_daisy:.4f}")
+        print(f"Final white daisy area: {simulator.area_white_daisy:.4f}")
+    if ensemble_stats is not None:
+        print(f"Ensemble observations per bin: {ensemble_stats.count.max():,}")
     print(f"{'='*60}\n")
     
     return filename
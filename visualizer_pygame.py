@@ -2,8 +2,9 @@
 Pygame을 이용한 행성 시각화 모듈
 """
 import pygame
-import random
-import math
+import numpy as np
+from simulator import DaisyStates, daisy_counts
+from sim_runner import capture_snapshot
 
 
 # Pygame 시각화 설정
@@ -12,7 +13,9 @@ SCREEN_HEIGHT = 800                # 화면 높이
 PLANET_RADIUS_PX = 350             # 행성 반지름 (픽셀)
 CENTER_X = SCREEN_WIDTH // 2       # 중심 X 좌표
 CENTER_Y = SCREEN_HEIGHT // 2      # 중심 Y 좌표
-FPS = 20                           # 초당 프레임 수
+FPS = 60                           # 초당 프레임 수
+TEXT_CACHE_SIZE = 512              # 렌더링된 텍스트 캐시 최대 개수 (넘으면 비움)
+ATMOSPHERE_THICKNESS = 30          # 대기층 두께 (픽셀)
 
 # 색상 정의 (RGB)
 COLOR_BLACK = (0, 0, 0)
@@ -27,141 +30,353 @@ COLOR_BARE_GROUND_OCEAN = (25, 70, 130)  # 바다 위 빈 땅
 COLOR_BARE_GROUND_LAND = (100, 140, 70)  # 육지 위 빈 땅
 COLOR_TEXT = (255, 255, 255)       # 텍스트 색상
 
+# 데이지 상태(DaisyStates.BARE / BLACK / WHITE)별 색상
+DAISY_PALETTE = (COLOR_BARE_GROUND_OCEAN, COLOR_BLACK_DAISY, COLOR_WHITE_DAISY)
+DAISY_PALETTE_ARRAY = np.array(DAISY_PALETTE, dtype=np.uint8)
+DAISY_RADIUS = 4                   # 데이지 반지름 (픽셀, 원 그리기 모드)
+DAISY_RENDER_MODE = 'auto'         # 'circles' (데이지마다 원), 'pixels' (픽셀 배열에 한 번에 기록), 'auto'
+DAISY_PIXEL_THRESHOLD = 5000       # auto 모드에서 이 개수보다 많으면 픽셀 모드 사용
+BACKGROUND_SMOOTHING = 0.1         # 프레임마다 배경 밝기가 목표값으로 이동하는 비율
 
-def generate_terrain(num_points=500):
+
+def generate_terrain(num_points, rng):
     """
     바다와 육지 지형 생성 (각 지점에 바다인지 육지인지 저장)
     
+    Args:
+        num_points: 지형 지점 개수
+        rng: np.random.Generator (같은 시드면 같은 지형)
+        
     Returns:
         list: 각 지점의 (x, y, is_ocean) 튜플 리스트
     """
-    terrain_points = []
-    for _ in range(num_points):
-        # 원 안의 랜덤한 위치 생성
-        angle = random.uniform(0, 2 * math.pi)
-        radius = random.uniform(0, PLANET_RADIUS_PX)
-        x = CENTER_X + int(radius * math.cos(angle))
-        y = CENTER_Y + int(radius * math.sin(angle))
+    # 각도, 반지름, 바다 여부를 한 번에 생성
+    samples = rng.random((3, num_points))
+    angle = samples[0] * 2 * np.pi
+    radius = samples[1] * PLANET_RADIUS_PX
+    x = CENTER_X + (radius * np.cos(angle)).astype(np.int64)
+    y = CENTER_Y + (radius * np.sin(angle)).astype(np.int64)
+    
+    # 70% 확률로 바다, 30% 확률로 육지
+    is_ocean = samples[2] < 0.7
+    return list(zip(x.tolist(), y.tolist(), is_ocean.tolist()))
+
+
+class TextCache:
+    """
+    (문자열, 색상)별 렌더링된 텍스트 캐시
+    고정된 제목/헤더는 한 번만 렌더링하고, 값이 바뀐 줄만 새로 렌더링
+    """
+    
+    def __init__(self, font, max_size=TEXT_CACHE_SIZE):
+        self.font = font
+        self.max_size = max_size
+        self._surfaces = {}
+    
+    def render(self, text, color):
+        """캐시된 텍스트 표면 반환 (없으면 렌더링 후 저장)"""
+        key = (text, color)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            if len(self._surfaces) >= self.max_size:
+                self._surfaces.clear()
+            surface = self.font.render(text, True, color)
+            self._surfaces[key] = surface
+        return surface
+
+
+def create_planet_layer(terrain_points):
+    """
+    변하지 않는 행성 요소(바다, 지형, 대기층)를 미리 합성한 투명 배경 표면 생성
+    
+    Args:
+        terrain_points: generate_terrain()의 반환값
         
-        # 70% 확률로 바다, 30% 확률로 육지
-        is_ocean = random.random() < 0.7
-        terrain_points.append((x, y, is_ocean))
+    Returns:
+        화면 크기의 SRCALPHA 표면
+    """
+    layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
     
-    return terrain_points
+    # 행성 기본 배경 (바다색)
+    pygame.draw.circle(layer, COLOR_OCEAN, (CENTER_X, CENTER_Y), PLANET_RADIUS_PX)
+    
+    # 지형 그리기 (바다와 육지)
+    for x, y, is_ocean in terrain_points:
+        color = COLOR_OCEAN if is_ocean else COLOR_LAND
+        pygame.draw.circle(layer, color, (x, y), 5)
+    
+    # 대기층 그리기 (반투명 원, 행성 위에 알파 합성)
+    atmosphere_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+    atmosphere_radius = PLANET_RADIUS_PX + ATMOSPHERE_THICKNESS
+    pygame.draw.circle(atmosphere_surface, COLOR_ATMOSPHERE, (CENTER_X, CENTER_Y), atmosphere_radius, ATMOSPHERE_THICKNESS)
+    layer.blit(atmosphere_surface, (0, 0))
+    return layer
 
 
-def run_pygame_visualization(simulator):
+def draw_daisy_circles(surface, positions, states, indices):
     """
-    Pygame으로 행성 시각화
+    데이지를 하나씩 원으로 그림 (데이지 수가 적을 때)
     
     Args:
-        simulator: DaisyworldSimulator 인스턴스
+        surface: 그릴 표면
+        positions: (N, 2) 데이지 위치 배열
+        states: (N,) 데이지 상태 배열 (DaisyStates.states)
+        indices: 그릴 데이지 인덱스 배열
+        
+    Returns:
+        갱신된 영역(Rect) 리스트
     """
-    pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption('Daisyworld Planet Simulator')
-    clock = pygame.time.Clock()
+    return [
+        pygame.draw.circle(surface, DAISY_PALETTE[state], (x, y), DAISY_RADIUS)
+        for (x, y), state in zip(positions[indices].tolist(), states[indices].tolist())
+    ]
+
+
+def draw_daisy_pixels(surface, positions, states, indices):
+    """
+    데이지 색상을 표면의 픽셀 배열에 벡터화하여 한 번에 기록 (데이지 한 개 = 픽셀 한 개)
+    10만~100만 개 데이지도 그리기 호출 없이 처리
     
-    # 지형 생성 (게임 시작 시 한 번만)
-    terrain_points = generate_terrain(800)
+    Args:
+        surface: 그릴 표면
+        positions: (N, 2) 데이지 위치 배열
+        states: (N,) 데이지 상태 배열 (DaisyStates.states)
+        indices: 그릴 데이지 인덱스 배열
+        
+    Returns:
+        갱신된 영역(Rect) 리스트 (바뀐 데이지를 모두 포함하는 사각형 하나)
+    """
+    if len(indices) == 0:
+        return []
+    x = positions[indices, 0]
+    y = positions[indices, 1]
+    pixels = pygame.surfarray.pixels3d(surface)
+    pixels[x, y] = DAISY_PALETTE_ARRAY[states[indices]]
+    del pixels   # 표면 잠금 해제
+    left, top = int(x.min()), int(y.min())
+    return [pygame.Rect(left, top, int(x.max()) - left + 1, int(y.max()) - top + 1)]
+
+
+def smooth_background_level(level, solar_intensity):
+    """
+    배경 밝기를 태양 강도에 맞춰 한 프레임만큼 점진적으로 이동
+    solar_intensity: 1.0 (낮, 흰색) → 0.0 (밤, 검은색)
     
-    # 폰트 설정
-    font_large = pygame.font.Font(None, 48)
-    font_small = pygame.font.Font(None, 32)
+    Args:
+        level: 현재 배경 밝기 (0~255, R=G=B)
+        solar_intensity: 태양 강도
     
-    # 현재 배경색 (점진적 변화를 위한 변수)
-    current_bg_r = 255
-    current_bg_g = 255
-    current_bg_b = 255
+    Returns:
+        다음 프레임의 배경 밝기
+    """
+    target_level = int(255 * solar_intensity)
+    return level + (target_level - level) * BACKGROUND_SMOOTHING
+
+
+class PlanetRenderer:
+    """
+    행성 화면 그리기 (창 표시와 오프스크린 동영상 내보내기가 같은 그리기 로직을 사용)
     
-    running = True
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+    정적인 행성 요소와 데이지는 미리 합성한 표면에 유지하고, 배경은 낮/밤 색조가 바뀔 때만 다시 만들며,
+    그 외 프레임에는 상태가 바뀐 데이지와 정보 텍스트 영역만 갱신(dirty rect)
+    """
+    
+    def __init__(self, terrain_points=None, seed=None):
+        """
+        Args:
+            terrain_points: generate_terrain()의 반환값 (None이면 새로 생성)
+            seed: 지형 생성 난수 시드 (terrain_points가 None일 때, None이면 매번 다른 지형)
+        """
+        # 지형 생성 및 정적 레이어 합성 (시작 시 한 번만)
+        if terrain_points is None:
+            terrain_points = generate_terrain(800, np.random.default_rng(seed))
+        self.planet_layer = create_planet_layer(terrain_points)
         
-        # 시뮬레이션 스텝 실행
-        simulator.step()
+        # 데이지 레이어 (행성 레이어 위에 데이지를 그려 둔 표면, 상태가 바뀐 데이지만 다시 그림)
+        self.daisy_layer = None
+        self.daisy_states = None
+        self.draw_daisies = None
         
-        # 태양 강도에 따라 배경색과 텍스트 색상 점진적으로 변경
-        # solar_intensity: 1.0 (낮, 흰색) → 0.0 (밤, 검은색)
-        target_bg_value = int(255 * simulator.solar_intensity)
+        # 폰트 설정 (렌더링된 텍스트는 캐시)
+        self.font_large = pygame.font.Font(None, 48)
+        self.text_cache = TextCache(pygame.font.Font(None, 32))
         
-        # 배경색을 목표값으로 부드럽게 이동 (각 RGB 채널)
-        transition_speed = 5  # 전환 속도 (값이 클수록 빠름)
-        current_bg_r += (target_bg_value - current_bg_r) * 0.1
-        current_bg_g += (target_bg_value - current_bg_g) * 0.1
-        current_bg_b += (target_bg_value - current_bg_b) * 0.1
+        # 배경 (배경색 + 행성 레이어 + 제목)은 색조가 바뀔 때만 다시 합성
+        self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.reset()
+    
+    def reset(self, background_level=255):
+        """
+        다음 프레임을 화면 전체를 새로 그리는 것으로 시작 (대상 표면이 바뀌었거나 이어지지 않는 시점으로 이동할 때)
+        
+        Args:
+            background_level: 현재 배경 밝기 (점진적 변화의 시작값, 0~255)
+        """
+        self.background_level = background_level
+        self.background_key = None
+        self.previous_rects = []
+    
+    def update_daisies(self, daisy_positions, daisy_order, area_black_daisy, area_white_daisy):
+        """
+        데이지 레이어를 데이지 면적에 맞게 갱신 (원이 겹치는 부분은 그린 순서에 따라 달라지므로
+        화면을 그리지 않고 건너뛴 상태도 이 메서드로 차례로 반영해야 연속으로 그린 것과 같은 화면이 됨)
         
-        background_color = (int(current_bg_r), int(current_bg_g), int(current_bg_b))
+        Args:
+            daisy_positions: (N, 2) 데이지 위치 배열
+            daisy_order: 데이지 색상 배정 순서
+            area_black_daisy: 검은 데이지 면적
+            area_white_daisy: 흰 데이지 면적
+        
+        Returns:
+            상태가 바뀐 데이지 인덱스 배열 (없으면 None)
+        """
+        # 데이지 배정 순서가 바뀌면 (시작, 체크포인트 복원) 데이지 레이어를 처음부터 그림
+        if self.daisy_states is None or self.daisy_states.order is not daisy_order:
+            self.daisy_states = DaisyStates(daisy_order)
+            num_daisies = len(self.daisy_states.order)
+            use_pixels = DAISY_RENDER_MODE == 'pixels' or (
+                DAISY_RENDER_MODE == 'auto' and num_daisies > DAISY_PIXEL_THRESHOLD)
+            self.draw_daisies = draw_daisy_pixels if use_pixels else draw_daisy_circles
+            self.daisy_layer = self.planet_layer.copy()
+            self.draw_daisies(self.daisy_layer, daisy_positions, self.daisy_states.states, np.arange(num_daisies))
+            self.background_key = None
+        
+        changed = self.daisy_states.update(*daisy_counts(area_black_daisy, area_white_daisy,
+                                                         len(self.daisy_states.order)))
+        if not changed:
+            return None
+        indices = np.concatenate(changed)
+        self.draw_daisies(self.daisy_layer, daisy_positions, self.daisy_states.states, indices)
+        return indices
+    
+    def draw(self, surface, state):
+        """
+        상태 하나를 표면에 그림 (이전 프레임이 그려진 같은 표면이어야 함)
+        
+        Args:
+            surface: 그릴 표면 (화면 크기)
+            state: 그릴 상태 (SimulationSnapshot 또는 같은 속성을 가진 객체)
+        
+        Returns:
+            (전체 갱신 여부, 갱신된 영역(Rect) 리스트)
+        """
+        # 태양 강도에 따라 배경색을 점진적으로 변경
+        self.background_level = smooth_background_level(self.background_level, state.solar_intensity)
+        level = int(self.background_level)
+        background_color = (level, level, level)
         
         # 텍스트 색상 (배경의 반전색으로 가독성 확보)
-        text_brightness = int(current_bg_r)
-        if text_brightness > 127:
+        if level > 127:
             text_color = COLOR_BLACK  # 밝은 배경에는 검은 텍스트
         else:
             text_color = COLOR_WHITE  # 어두운 배경에는 흰 텍스트
         
-        # 화면 그리기
-        screen.fill(background_color)
-        
-        # 행성 기본 배경 (바다색)
-        pygame.draw.circle(screen, COLOR_OCEAN, (CENTER_X, CENTER_Y), PLANET_RADIUS_PX)
-        
-        # 지형 그리기 (바다와 육지)
-        for x, y, is_ocean in terrain_points:
-            color = COLOR_OCEAN if is_ocean else COLOR_LAND
-            pygame.draw.circle(screen, color, (x, y), 5)
+        # 개수가 바뀐 만큼의 데이지만 색상 변경
+        changed = self.update_daisies(state.daisy_positions, state.daisy_order, state.area_black_daisy,
+                                      state.area_white_daisy)
+        full_redraw = (background_color, text_color) != self.background_key
+        background = self.background
+        daisy_rects = []
+        if changed is not None and not full_redraw:
+            daisy_rects = self.draw_daisies(background, state.daisy_positions, self.daisy_states.states, changed)
         
-        # 대기층 그리기 (반투명 원)
-        atmosphere_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        atmosphere_radius = PLANET_RADIUS_PX + 30
-        pygame.draw.circle(atmosphere_surface, COLOR_ATMOSPHERE, (CENTER_X, CENTER_Y), atmosphere_radius, 30)
-        screen.blit(atmosphere_surface, (0, 0))
-        
-        # 데이지 그리기
-        colors = simulator.get_daisy_colors(COLOR_BLACK_DAISY, COLOR_WHITE_DAISY, COLOR_BARE_GROUND_OCEAN)
-        for pos, color in zip(simulator.daisy_positions, colors):
-            pygame.draw.circle(screen, color, pos, 4)
+        # 색조가 바뀐 경우에만 배경을 다시 합성하고 화면 전체를 갱신
+        if full_redraw:
+            self.background_key = (background_color, text_color)
+            background.fill(background_color)
+            background.blit(self.daisy_layer, (0, 0))
+            title_text = self.font_large.render('Daisyworld Planet', True, text_color)
+            background.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 30))
+            surface.blit(background, (0, 0))
+        else:
+            # 이전 프레임의 텍스트 영역과 바뀐 데이지 영역만 배경으로 복원
+            for rect in self.previous_rects + daisy_rects:
+                surface.blit(background, rect, rect)
         
         # 정보 텍스트 그리기
-        title_text = font_large.render('Daisyworld Planet', True, text_color)
-        screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 30))
-        
         info_lines = [
-            f'Time: {simulator.current_time}',
-            f'Day/Night: {"DAY" if simulator.is_daytime else "NIGHT"} ({simulator.day_night_timer}/100)',
-            f'Solar Intensity: {simulator.solar_intensity:.2f}',
+            f'Time: {state.current_time}',
+            f'Day/Night: {"DAY" if state.is_daytime else "NIGHT"} ({state.day_night_timer}/100)',
+            f'Solar Intensity: {state.solar_intensity:.2f}',
             f'',
             f'=== Milankovitch Cycles ===',
-            f'Eccentricity: {simulator.eccentricity:.4f}',
-            f'Obliquity: {simulator.obliquity:.2f} deg',
-            f'Precession: {simulator.precession_angle:.1f} deg',
+            f'Eccentricity: {state.eccentricity:.4f}',
+            f'Obliquity: {state.obliquity:.2f} deg',
+            f'Precession: {state.precession_angle:.1f} deg',
             f'',
             f'=== Temperatures ===',
-            f'Atmosphere: {simulator.temperature_atmosphere:.2f} K',
-            f'Ocean: {simulator.temperature_ocean:.2f} K',
-            f'Land: {simulator.temperature_land:.2f} K',
+            f'Atmosphere: {state.temperature_atmosphere:.2f} K',
+            f'Ocean: {state.temperature_ocean:.2f} K',
+            f'Land: {state.temperature_land:.2f} K',
             f'',
             f'=== Daisies ===',
-            f'Black: {simulator.area_black_daisy:.3f}',
-            f'White: {simulator.area_white_daisy:.3f}',
+            f'Black: {state.area_black_daisy:.3f}',
+            f'White: {state.area_white_daisy:.3f}',
             f'',
             f'=== Atmosphere ===',
-            f'O2: {simulator.o2_concentration:.0f} ppm',
-            f'CO2: {simulator.co2_concentration:.2f} ppm',
-            f'CH4: {simulator.ch4_concentration:.3f} ppm',
-            f'H2O: {simulator.h2o_concentration:.1f} ppm',
-            f'GH Effect: {simulator.greenhouse_effect:.3f}'
+            f'O2: {state.o2_concentration:.0f} ppm',
+            f'CO2: {state.co2_concentration:.2f} ppm',
+            f'CH4: {state.ch4_concentration:.3f} ppm',
+            f'H2O: {state.h2o_concentration:.1f} ppm',
+            f'GH Effect: {state.greenhouse_effect:.3f}'
         ]
         
         y_offset = SCREEN_HEIGHT - 750
+        text_rects = []
         for line in info_lines:
-            text = font_small.render(line, True, text_color)
-            screen.blit(text, (20, y_offset))
+            if line:
+                text_rects.append(surface.blit(self.text_cache.render(line, text_color), (20, y_offset)))
             y_offset += 35
         
-        pygame.display.flip()
-        clock.tick(FPS)
+        rects = self.previous_rects + daisy_rects + text_rects
+        self.previous_rects = text_rects
+        return full_redraw, rects
+
+
+def run_pygame_visualization(simulator, runner=None, max_frames=None, fps=FPS):
+    """
+    Pygame으로 행성 시각화 (그리기는 PlanetRenderer, 화면에는 바뀐 영역만 반영)
+    
+    Args:
+        simulator: DaisyworldSimulator 인스턴스
+        runner: SimulationRunner (지정하면 실행 스레드의 최신 스냅샷을 그림,
+                None이면 프레임마다 한 스텝씩 직접 진행)
+        max_frames: 이 프레임 수를 그린 뒤 종료 (None이면 창을 닫을 때까지, 벤치마크용)
+        fps: 초당 최대 프레임 수 (None이면 제한 없음)
+    
+    Returns:
+        그린 프레임 수
+    """
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption('Daisyworld Planet Simulator')
+    clock = pygame.time.Clock()
+    renderer = PlanetRenderer()
+    
+    frames = 0
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        
+        # 그릴 상태 가져오기 (실행 스레드가 있으면 스냅샷만 읽음)
+        if runner is not None:
+            state = runner.latest()
+        else:
+            simulator.step()
+            state = capture_snapshot(simulator)
+        
+        full_redraw, rects = renderer.draw(screen, state)
+        if full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        frames += 1
+        if max_frames is not None and frames >= max_frames:
+            running = False
+        if fps:
+            clock.tick(fps)
     
     pygame.quit()
+    return frames
@@ -0,0 +1,204 @@
+"""
+가정(what-if) 분기 실행 모듈
+실행 중인 시뮬레이터의 현재 상태에서 섭동(파라미터 변경, CO2 주입, 광도 변화 등)을 적용한 여러 미래를
+fork로 시작한 작업 프로세스에서 병렬로 실행하고, 결과를 하나의 비교 표로 수집
+
+작업 프로세스는 fork 시점의 부모 메모리(상태, 기록 저장소)를 쓰기 시 복사(copy-on-write)로 공유하므로
+분기마다 앞선 구간을 다시 실행하거나 시뮬레이터/기록을 복사하지 않음
+"""
+import argparse
+import contextlib
+import gc
+import multiprocessing
+import os
+import time
+import numpy as np
+from simulator import DaisyworldSimulator, PARAMETER_NAMES, STATE_FLOAT_FIELDS
+from sweep import SweepResult, summarize_trajectory, SWEEP_FIELDS, SWEEP_TRAJECTORY_POINTS
+from checkpoint import load_checkpoint
+
+
+WHATIF_DEFAULT_STEPS = 20000       # 분기당 기본 스텝 수
+
+# fork된 작업 프로세스가 물려받는 실행 대상 (run_branches 실행 중에만 설정)
+_FORK_SIMULATOR = None
+_FORK_BRANCHES = None
+_FORK_TASK = None
+
+
+def _validate(perturbation):
+    """섭동 딕셔너리의 키 확인 (파라미터 이름 또는 실수형 상태 변수)"""
+    unknown = set(perturbation) - set(PARAMETER_NAMES) - set(STATE_FLOAT_FIELDS)
+    if unknown:
+        raise ValueError(f"알 수 없는 파라미터/상태 변수: {', '.join(sorted(unknown))}")
+
+
+@contextlib.contextmanager
+def _perturbed(simulator, perturbation):
+    """
+    섭동을 적용한 상태로 전환하고, 끝나면 원래 상태/파라미터로 되돌림
+    (같은 작업 프로세스가 여러 분기를 차례로 실행하므로 분기마다 원래 상태에서 시작)
+    """
+    state = simulator.get_state()
+    params = simulator.params
+    simulator.params = dict(params, **{name: value for name, value in perturbation.items() if name in params})
+    for name, value in perturbation.items():
+        if name in STATE_FLOAT_FIELDS:
+            setattr(simulator, name, float(value))
+    try:
+        yield simulator
+    finally:
+        simulator.params = params
+        simulator.set_state(state)
+
+
+def run_branch(simulator, perturbation, num_steps=WHATIF_DEFAULT_STEPS, fields=SWEEP_FIELDS,
+               trajectory_points=SWEEP_TRAJECTORY_POINTS):
+    """
+    섭동 하나를 적용하여 현재 상태에서 실행 (시뮬레이터 상태와 기록은 바뀌지 않음)
+
+    Args:
+        simulator: DaisyworldSimulator 인스턴스
+        perturbation: 파라미터 이름 또는 상태 변수 → 값 딕셔너리 (예: {'co2_concentration': 600.0})
+        num_steps: 실행할 스텝 수
+        fields: 수집할 필드 목록
+        trajectory_points: 다운샘플 궤적 길이
+
+    Returns:
+        (요약 통계 딕셔너리, (len(fields), trajectory_points) 궤적 배열)
+    """
+    with _perturbed(simulator, perturbation):
+        # record=False이므로 구독자(기록 저장소, 궤적 파일)에 전달하지 않음
+        trajectory = simulator.run(num_steps, record=False)
+    return summarize_trajectory(trajectory, fields, trajectory_points)
+
+
+def _run_fork_task(index):
+    """작업 프로세스의 분기 실행 (시뮬레이터와 섭동은 fork로 물려받고 번호만 전달)"""
+    num_steps, fields, trajectory_points = _FORK_TASK
+    return run_branch(_FORK_SIMULATOR, _FORK_BRANCHES[index], num_steps, fields, trajectory_points)
+
+
+class WhatIfResult(SweepResult):
+    """분기 결과 표 (분기별 섭동 값 + 요약 통계 열, 다운샘플 궤적, 시간축은 분기 시작 시점 기준)"""
+
+    def __init__(self, perturbations, summaries, trajectories, fields, num_steps, elapsed, start_time):
+        super().__init__(perturbations, summaries, trajectories, fields, num_steps, elapsed)
+        self.start_time = start_time
+        self.trajectory_time = self.trajectory_time + start_time
+
+    def delta(self, column, reference=0):
+        """
+        기준 분기 대비 차이
+
+        Args:
+            column: 결과 표의 열 이름 (예: 'temperature_mean')
+            reference: 기준 분기 번호 (control=True면 0번이 섭동 없는 분기)
+
+        Returns:
+            (분기 수,) 배열
+        """
+        values = self.table[column]
+        return values - values[reference]
+
+
+def run_branches(simulator, perturbations, num_steps=WHATIF_DEFAULT_STEPS, processes=None, control=True,
+                 fields=SWEEP_FIELDS, trajectory_points=SWEEP_TRAJECTORY_POINTS):
+    """
+    현재 상태에서 섭동별 분기를 fork 작업 프로세스에서 병렬 실행
+
+    Args:
+        simulator: DaisyworldSimulator 인스턴스 (상태와 기록은 바뀌지 않음)
+        perturbations: 섭동 딕셔너리 리스트 (파라미터 이름 또는 실수형 상태 변수 → 값)
+        num_steps: 분기당 스텝 수
+        processes: 프로세스 수 (None이면 CPU 코어 수, 1이거나 fork를 쓸 수 없으면 현재 프로세스에서 순차 실행)
+        control: True면 섭동 없는 분기를 0번으로 추가
+        fields: 수집할 필드 목록
+        trajectory_points: 다운샘플 궤적 길이
+
+    Returns:
+        WhatIfResult
+    """
+    global _FORK_SIMULATOR, _FORK_BRANCHES, _FORK_TASK
+    perturbations = [dict(perturbation) for perturbation in perturbations]
+    for perturbation in perturbations:
+        _validate(perturbation)
+    if control:
+        perturbations.insert(0, {})
+
+    trajectory_points = min(trajectory_points, num_steps)
+    fields = tuple(fields)
+    processes = processes or os.cpu_count() or 1
+    start_time = simulator.current_time
+
+    start = time.perf_counter()
+    if processes == 1 or len(perturbations) <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        results = [run_branch(simulator, perturbation, num_steps, fields, trajectory_points)
+                   for perturbation in perturbations]
+    else:
+        _FORK_SIMULATOR, _FORK_BRANCHES, _FORK_TASK = simulator, perturbations, (num_steps, fields, trajectory_points)
+        # 부모 객체를 GC 추적 대상에서 빼서 작업 프로세스의 GC가 공유 페이지를 건드려 복사되지 않도록 함
+        gc.freeze()
+        try:
+            chunksize = max(1, len(perturbations) // (processes * 4))
+            with multiprocessing.get_context('fork').Pool(processes) as pool:
+                results = pool.map(_run_fork_task, range(len(perturbations)), chunksize=chunksize)
+        finally:
+            gc.unfreeze()
+            _FORK_SIMULATOR = _FORK_BRANCHES = _FORK_TASK = None
+    elapsed = time.perf_counter() - start
+
+    summaries = [summary for summary, _ in results]
+    trajectories = np.stack([trajectory for _, trajectory in results])
+    return WhatIfResult(perturbations, summaries, trajectories, fields, num_steps, elapsed, start_time)
+
+
+def _parse_branch(text):
+    """'NAME=VALUE[,NAME=VALUE...]' 형식의 명령행 인자 분해"""
+    perturbation = {}
+    for item in text.split(','):
+        name, _, value = item.partition('=')
+        if not value:
+            raise argparse.ArgumentTypeError(f"잘못된 형식: {text}")
+        perturbation[name.strip()] = float(value)
+    return perturbation
+
+
+def main():
+    """가정 분기 실행 진입점"""
+    parser = argparse.ArgumentParser(description='Fork what-if branches from a Daisyworld state and compare them.')
+    parser.add_argument('--checkpoint', default=None, help='start from this checkpoint (default: a fresh planet)')
+    parser.add_argument('--warmup', type=int, default=0, help='steps to run before branching')
+    parser.add_argument('--branch', action='append', type=_parse_branch, default=[], metavar='NAME=VALUE[,...]',
+                        help='one perturbed branch: parameter names or state fields (repeatable)')
+    parser.add_argument('--steps', type=int, default=WHATIF_DEFAULT_STEPS, help='steps per branch')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--no-control', action='store_true', help='do not add an unperturbed control branch')
+    parser.add_argument('--output', default='results/whatif.npz', help='output .npz file')
+    args = parser.parse_args()
+
+    if not args.branch:
+        parser.error('at least one --branch is required')
+    for perturbation in args.branch:
+        try:
+            _validate(perturbation)
+        except ValueError as error:
+            parser.error(str(error))
+
+    simulator = load_checkpoint(args.checkpoint, resume_trajectory=False) if args.checkpoint else DaisyworldSimulator()
+    if args.warmup:
+        simulator.run(args.warmup)
+
+    result = run_branches(simulator, args.branch, num_steps=args.steps, processes=args.processes,
+                          control=not args.no_control)
+    result.save(args.output)
+    print(f"{len(result)} branches x {result.num_steps} steps from step {result.start_time} "
+          f"in {result.elapsed:.1f} s")
+    for i in range(len(result)):
+        print(f"  branch {i}: T_mean={result.table['temperature_mean'][i]:.2f} K "
+              f"black={result.table['black_daisy_mean'][i]:.4f} white={result.table['white_daisy_mean'][i]:.4f}")
+    print(f"What-if results saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()